@@ -1,10 +1,14 @@
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from pydantic import BaseModel, Field
 
 class PDFConfig(BaseModel):
     ocr_enabled: bool = Field(default=True)
     language: str = Field(...)
     dpi: int = Field(default=300, ge=72, le=1200)
+    parallel_ocr: bool = Field(default=False)
+    ocr_workers: int = Field(default=2, ge=1)
+    ocr_queue_size: int = Field(default=4, ge=1)
+    parallel_ocr_use_gpu: bool = Field(default=False)
 
 class ImageConfig(BaseModel):
     ocr_language: str = Field(...)
@@ -13,10 +17,16 @@ class ImageConfig(BaseModel):
 class StructuredConfig(BaseModel):
     schema_validation: bool = Field(default=True)
 
+class CacheConfig(BaseModel):
+    enabled: bool = Field(default=True)
+    cache_dir: str = Field(default="extraction_cache")
+    max_size_mb: int = Field(default=512, ge=1)
+
 class ProcessorConfig(BaseModel):
     pdf: PDFConfig
     image: ImageConfig
     structured: StructuredConfig
+    cache: Optional[CacheConfig] = None
 
 def validate_config(config: Dict[str, Any]) -> ProcessorConfig:
     """Validate configuration using Pydantic models."""
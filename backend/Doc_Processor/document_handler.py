@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Dict, Any, List, Union
+from typing import Dict, Any, List, Optional, Union, Callable, ContextManager
 import magic
 import logging
 from concurrent.futures import ThreadPoolExecutor
@@ -8,6 +8,7 @@ from functools import partial
 from .processors.pdf_processor import PDFProcessor
 from .processors.image_processor import ImageProcessor
 from .processors.structured_processor import StructuredProcessor
+from .extraction_cache import ExtractionCache
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -27,30 +28,76 @@ class DocumentHandler:
         'application/msword': StructuredProcessor,  # .doc
     }
 
+    # PDF settings that change how extraction is scheduled, not its output
+    RUNTIME_ONLY_PDF_SETTINGS = ('parallel_ocr', 'ocr_workers', 'ocr_queue_size', 'parallel_ocr_use_gpu')
 
-    
     def __init__(
         self,
         config: Dict[str, Any],
-        max_workers: int = 4
+        max_workers: int = 4,
+        ocr_slot: Optional[Callable[[], ContextManager]] = None
     ):
+        """
+        Args:
+            config: Processor configurations by type, plus optional 'cache'
+            max_workers: Workers for batch processing
+            ocr_slot: Context manager factory the processors hold around OCR
+                work; cache hits and text-only documents never take it
+        """
         self.config = self._prepare_config(config)
         self.max_workers = max_workers
+        self.ocr_slot = ocr_slot
+        self.cache = self._initialize_cache(config.get('cache'))
         
     def _prepare_config(self, config: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
         if not all(key in config for key in ['pdf', 'image', 'structured']):
             raise ValueError("Missing processor configurations")
         return config
+
+    def _initialize_cache(self, cache_config: Optional[Dict[str, Any]]) -> Optional[ExtractionCache]:
+        if not cache_config or not cache_config.get('enabled', True):
+            return None
+        return ExtractionCache(
+            cache_dir=cache_config.get('cache_dir', 'extraction_cache'),
+            max_size_bytes=int(cache_config.get('max_size_mb', 512)) * 1024 * 1024
+        )
+
+    def get_cache_key(self, file_hash: str) -> str:
+        """Cache key for a document hash under this handler's processor config"""
+        processor_config = {k: v for k, v in self.config.items() if k != 'cache'}
+        processor_config['pdf'] = {
+            k: v for k, v in processor_config['pdf'].items()
+            if k not in self.RUNTIME_ONLY_PDF_SETTINGS
+        }
+        return ExtractionCache.make_key(file_hash, processor_config)
     
     def process_document(
         self,
         file_path: Union[str, Path],
-        batch_mode: bool = False
+        batch_mode: bool = False,
+        file_hash: Optional[str] = None,
+        page_callback: Optional[Callable[[Dict[str, Any]], None]] = None
     ) -> Dict[str, Any]:
         try:
             path = Path(file_path)
             if not path.exists():
                 raise FileNotFoundError(f"Document not found: {path}")
+
+            cache_key = None
+            if self.cache:
+                file_hash = file_hash or ExtractionCache.hash_file(path)
+                cache_key = self.get_cache_key(file_hash)
+                cached = self.cache.get(cache_key)
+                if cached:
+                    logger.info(f"Extraction cache hit for {path}")
+                    return {
+                        **cached['result'],
+                        'file_path': str(path),
+                        'file_hash': file_hash,
+                        'cache_key': cache_key,
+                        'cache_hit': True,
+                        'annotations': cached.get('annotations', {})
+                    }
             
             mime_type = self._get_mime_type(path)
             mime_type = mime_type.strip()
@@ -65,14 +112,28 @@ class DocumentHandler:
                 raise ValueError(f"Unsupported document type: {mime_type}")
             
             config_key = self._get_config_key(mime_type)
-            processor = processor_class(self.config[config_key])
-            result = processor.process(path)
+            processor = processor_class(self.config[config_key], ocr_slot=self.ocr_slot)
+            if page_callback is not None and isinstance(processor, PDFProcessor):
+                # Only PDFs are processed page by page
+                result = processor.process(path, page_callback=page_callback)
+            else:
+                result = processor.process(path)
+
+            if self.cache:
+                self.cache.put(cache_key, {
+                    'mime_type': mime_type,
+                    'result': result,
+                    'status': 'success'
+                })
             
             return {
                 'file_path': str(path),
                 'mime_type': mime_type,
                 'result': result,
-                'status': 'success'
+                'status': 'success',
+                'file_hash': file_hash,
+                'cache_key': cache_key,
+                'cache_hit': False
             }
             
         except Exception as e:
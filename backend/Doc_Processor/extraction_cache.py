@@ -0,0 +1,171 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Any, Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class ExtractionCache:
+    """
+    Content-addressed on-disk cache of document extraction results.
+
+    Entries are keyed by the SHA-256 of the document bytes combined with the
+    processor configuration, so a re-upload of an identical file skips MIME
+    sniffing and OCR. The cache directory is kept under ``max_size_bytes`` by
+    evicting least-recently-used entries.
+    """
+
+    HASH_CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, cache_dir: Union[str, Path], max_size_bytes: int = 512 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.max_size_bytes = max_size_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = Lock()
+
+    @classmethod
+    def hash_file(cls, file_path: Union[str, Path]) -> str:
+        """Compute the SHA-256 of a file without reading it into memory at once"""
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(cls.HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def make_key(file_hash: str, processor_config: Dict[str, Any]) -> str:
+        """Combine the content hash and processor configuration into a cache key"""
+        config_json = json.dumps(processor_config, sort_keys=True, default=str)
+        return hashlib.sha256(f"{file_hash}:{config_json}".encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a cached entry
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            Entry with 'result' and 'annotations', or None on a miss
+        """
+        path = self._entry_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            # Touch the entry so eviction is least-recently-used
+            os.utime(path, None)
+            return entry
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cache entry {key}: {str(e)}")
+            self._remove(path)
+            return None
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        """Store an extraction result"""
+        try:
+            self._write(key, {
+                "result": self._to_serializable(result),
+                "annotations": {},
+                "created_at": time.time(),
+            })
+            self._evict()
+        except Exception as e:
+            logger.warning(f"Failed to cache extraction result {key}: {str(e)}")
+
+    def annotate(self, key: str, **annotations: Any) -> bool:
+        """
+        Attach extra data to an existing entry, e.g. the collection the
+        document was ingested into.
+
+        Returns:
+            True if the entry was updated
+        """
+        try:
+            with self._lock:
+                entry = self.get(key)
+                if entry is None:
+                    return False
+                entry["annotations"].update(self._to_serializable(annotations))
+                self._write(key, entry)
+                return True
+        except Exception as e:
+            logger.warning(f"Failed to annotate cache entry {key}: {str(e)}")
+            return False
+
+    def invalidate(self, key: str) -> None:
+        """Remove a single entry"""
+        self._remove(self._entry_path(key))
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _write(self, key: str, entry: Dict[str, Any]) -> None:
+        # A unique temp file per write, so concurrent writers of the same
+        # key never share one; the rename makes the last complete write win
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=f"{key}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, self._entry_path(key))
+        except BaseException:
+            self._remove(Path(tmp_path))
+            raise
+
+    def _remove(self, path: Path) -> None:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _evict(self) -> None:
+        with self._lock:
+            entries = []
+            total_size = 0
+            for path in self.cache_dir.glob("*.json"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total_size += stat.st_size
+
+            if total_size <= self.max_size_bytes:
+                return
+
+            for _, size, path in sorted(entries):
+                self._remove(path)
+                total_size -= size
+                logger.info(f"Evicted extraction cache entry: {path.stem}")
+                if total_size <= self.max_size_bytes:
+                    break
+
+    @classmethod
+    def _to_serializable(cls, value: Any) -> Any:
+        """Convert processor output (numpy values, PyMuPDF rects) to JSON types"""
+        if isinstance(value, dict):
+            return {str(k): cls._to_serializable(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [cls._to_serializable(v) for v in value]
+        if isinstance(value, np.ndarray):
+            return value.tolist()
+        if isinstance(value, np.generic):
+            return value.item()
+        if isinstance(value, (str, int, float, bool)) or value is None:
+            return value
+        if isinstance(value, Path):
+            return str(value)
+        try:
+            # PyMuPDF Rect/IRect and similar sequence-like objects
+            return [cls._to_serializable(v) for v in value]
+        except TypeError:
+            return str(value)
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from contextlib import nullcontext
+from typing import Dict, Any, Optional, Callable, ContextManager
 import logging
 from pathlib import Path
 
@@ -9,8 +10,19 @@ logger = logging.getLogger(__name__)
 class BaseProcessor(ABC):
     """Abstract base class for document processors."""
     
-    def __init__(self, config: Optional[Dict[str, Any]] = None):
+    def __init__(
+        self,
+        config: Optional[Dict[str, Any]] = None,
+        ocr_slot: Optional[Callable[[], ContextManager]] = None
+    ):
+        """
+        Args:
+            config: Processor configuration
+            ocr_slot: Context manager factory held around OCR work, so callers
+                can cap concurrent OCR without throttling text-only documents
+        """
         self.config = config or {}
+        self.ocr_slot = ocr_slot or nullcontext
         self._validate_config()
         
     @abstractmethod
@@ -1,17 +1,20 @@
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Callable, ContextManager
 import cv2
 import numpy as np
-from paddleocr import PaddleOCR
 from .base_processor import BaseProcessor
+from .ocr_registry import OCREngineRegistry
 
 class ImageProcessor(BaseProcessor):
-    def __init__(self, config: Dict[str, Any] = None):
-        super().__init__(config)
-        self.ocr = PaddleOCR(
-            use_angle_cls=True,
-            lang=self.config.get('ocr_language', 'en'),
-            show_log=False
+    def __init__(
+        self,
+        config: Dict[str, Any] = None,
+        ocr_slot: Optional[Callable[[], ContextManager]] = None
+    ):
+        super().__init__(config, ocr_slot)
+        self.ocr = OCREngineRegistry.get_engine(
+            language=self.config.get('ocr_language', 'en'),
+            use_angle_cls=True
         )
     
     def _validate_config(self) -> None:
@@ -29,7 +32,8 @@ class ImageProcessor(BaseProcessor):
             if self.config['preprocessing_steps']:
                 image = self._preprocess_image(image)
             
-            results = self.ocr.ocr(image)
+            with self.ocr_slot():
+                results = self.ocr.ocr(image)
             
             text_results = []
             for line in results[0]:
@@ -0,0 +1,180 @@
+import os
+import time
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from threading import Lock
+from typing import Dict, Any, Optional, Tuple
+
+import numpy as np
+from paddleocr import PaddleOCR
+
+logger = logging.getLogger(__name__)
+
+EngineKey = Tuple[str, bool]
+
+
+@dataclass
+class OCREngineMetrics:
+    """Load and usage metrics for a cached OCR engine"""
+    loads: int = 0
+    load_time_seconds: float = 0.0
+    warmups: int = 0
+    warmup_time_seconds: float = 0.0
+    hits: int = 0
+    evictions: int = 0
+    last_used: float = 0.0
+
+
+class SharedOCREngine:
+    """
+    PaddleOCR model shared between processors.
+
+    The underlying predictor is not safe for concurrent inference, so calls
+    to ``ocr`` are serialized per engine.
+    """
+
+    def __init__(self, engine: PaddleOCR):
+        self.engine = engine
+        self._lock = Lock()
+
+    def ocr(self, image, *args, **kwargs):
+        with self._lock:
+            return self.engine.ocr(image, *args, **kwargs)
+
+
+class OCREngineRegistry:
+    """
+    Process-wide, lazily initialized registry of PaddleOCR engines.
+
+    Engines are keyed by language and angle classification setting, reused
+    across processors, requests and threads, and evicted least-recently-used
+    once more than ``max_size`` engines are loaded.
+    """
+
+    max_size: int = int(os.environ.get("OCR_ENGINE_CACHE_SIZE", 2))
+    use_gpu: bool = os.environ.get("OCR_USE_GPU", "1") == "1"
+    enable_mkldnn: bool = True
+
+    _engines: "OrderedDict[EngineKey, SharedOCREngine]" = OrderedDict()
+    _key_locks: Dict[EngineKey, Lock] = {}
+    _metrics: Dict[EngineKey, OCREngineMetrics] = {}
+    _lock = Lock()
+
+    @classmethod
+    def configure(
+        cls,
+        max_size: Optional[int] = None,
+        use_gpu: Optional[bool] = None,
+        enable_mkldnn: Optional[bool] = None
+    ) -> None:
+        """Update registry settings (engine settings apply to new loads only)"""
+        with cls._lock:
+            if max_size is not None:
+                if max_size < 1:
+                    raise ValueError("max_size must be at least 1")
+                cls.max_size = max_size
+            if use_gpu is not None:
+                cls.use_gpu = use_gpu
+            if enable_mkldnn is not None:
+                cls.enable_mkldnn = enable_mkldnn
+            cls._evict_locked()
+
+    @classmethod
+    def get_engine(cls, language: str = "en", use_angle_cls: bool = True) -> SharedOCREngine:
+        """
+        Get the OCR engine for the given settings, loading it on first use.
+
+        Args:
+            language: OCR language code
+            use_angle_cls: Whether to enable the text angle classifier
+
+        Returns:
+            Shared OCR engine
+        """
+        key = (language, use_angle_cls)
+        with cls._lock:
+            engine = cls._engines.get(key)
+            if engine is not None:
+                cls._engines.move_to_end(key)
+                metrics = cls._metrics[key]
+                metrics.hits += 1
+                metrics.last_used = time.time()
+                return engine
+            key_lock = cls._key_locks.setdefault(key, Lock())
+
+        # Load outside the registry lock so other keys aren't blocked, while
+        # the per-key lock stops concurrent callers loading the same model twice
+        with key_lock:
+            with cls._lock:
+                engine = cls._engines.get(key)
+                if engine is not None:
+                    cls._engines.move_to_end(key)
+                    cls._metrics[key].hits += 1
+                    return engine
+
+            start = time.perf_counter()
+            engine = SharedOCREngine(
+                PaddleOCR(
+                    use_angle_cls=use_angle_cls,
+                    lang=language,
+                    use_gpu=cls.use_gpu,
+                    enable_mkldnn=cls.enable_mkldnn,
+                    show_log=False,
+                )
+            )
+            load_time = time.perf_counter() - start
+            logger.info(f"Loaded OCR engine {key} in {load_time:.2f}s")
+
+            with cls._lock:
+                metrics = cls._metrics.setdefault(key, OCREngineMetrics())
+                metrics.loads += 1
+                metrics.load_time_seconds += load_time
+                metrics.last_used = time.time()
+                cls._engines[key] = engine
+                cls._evict_locked()
+            return engine
+
+    @classmethod
+    def warm_up(cls, language: str = "en", use_angle_cls: bool = True) -> float:
+        """
+        Load an engine and run one inference so the first real page is fast.
+
+        Returns:
+            Warm-up time in seconds, including any model load
+        """
+        start = time.perf_counter()
+        engine = cls.get_engine(language, use_angle_cls)
+        engine.ocr(np.full((64, 256, 3), 255, dtype=np.uint8))
+        elapsed = time.perf_counter() - start
+
+        with cls._lock:
+            metrics = cls._metrics.setdefault((language, use_angle_cls), OCREngineMetrics())
+            metrics.warmups += 1
+            metrics.warmup_time_seconds += elapsed
+        return elapsed
+
+    @classmethod
+    def get_metrics(cls) -> Dict[str, Dict[str, Any]]:
+        """Get metrics for every engine key seen by this process"""
+        with cls._lock:
+            return {
+                f"{language}:{'cls' if angle_cls else 'nocls'}": {
+                    **asdict(metrics),
+                    "loaded": (language, angle_cls) in cls._engines,
+                }
+                for (language, angle_cls), metrics in cls._metrics.items()
+            }
+
+    @classmethod
+    def clear(cls) -> None:
+        """Drop all loaded engines"""
+        with cls._lock:
+            cls._engines.clear()
+
+    @classmethod
+    def _evict_locked(cls) -> None:
+        while len(cls._engines) > cls.max_size:
+            key, _ = cls._engines.popitem(last=False)
+            cls._metrics[key].evictions += 1
+            logger.info(f"Evicted OCR engine {key}")
@@ -1,16 +1,22 @@
 import gc
 import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import ExitStack
 from pathlib import Path
+from threading import Lock
 import torch
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Callable, ContextManager
 import fitz
 import numpy as np
 import cv2
-from paddleocr import PaddleOCR
 from PIL import Image
 import io
 import logging
+import time
 from .base_processor import BaseProcessor
+from .ocr_registry import OCREngineRegistry, SharedOCREngine
 from tqdm.auto import tqdm
 
 import warnings
@@ -21,22 +27,109 @@ print("Torch CUDA available: ", torch.cuda.is_available())
 logger = logging.getLogger(__name__)
 
 
+# Worker-side state for the page-parallel OCR pool. Each worker process builds
+# its own PDFProcessor (and therefore its own PaddleOCR model) exactly once.
+_worker_processor: Optional["PDFProcessor"] = None
+
+# Pools are expensive to spawn (one model load per worker), so they are kept
+# alive across documents and keyed by the settings that affect the OCR model.
+_ocr_pools: Dict[tuple, ProcessPoolExecutor] = {}
+_ocr_pools_lock = Lock()
+
+
+def _init_ocr_worker(config: Dict[str, Any], use_gpu: bool) -> None:
+    """Initialize the OCR model inside a pool worker process."""
+    global _worker_processor
+    # Set explicitly; the registry default follows OCR_USE_GPU, which is on
+    OCREngineRegistry.configure(use_gpu=use_gpu)
+    _worker_processor = PDFProcessor({**config, "parallel_ocr": False})
+
+
+def _ocr_worker_task(
+    samples: bytes, width: int, height: int, page_num: int
+) -> Dict[str, Any]:
+    """Run OCR on a rasterized page inside a pool worker process."""
+    img_np = np.frombuffer(samples, dtype=np.uint8).reshape(height, width, 3)
+    return _worker_processor._ocr_image(img_np, page_num)
+
+
+def _get_ocr_pool(config: Dict[str, Any], workers: int, use_gpu: bool) -> ProcessPoolExecutor:
+    """Get or create the shared OCR process pool for the given settings."""
+    key = (config.get("language", "en"), config.get("enable_deskew", False), workers, use_gpu)
+    with _ocr_pools_lock:
+        pool = _ocr_pools.get(key)
+        if pool is None:
+            logger.info(f"Starting OCR pool with {workers} workers")
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_ocr_worker,
+                initargs=(dict(config), use_gpu),
+            )
+            _ocr_pools[key] = pool
+        return pool
+
+
+def _discard_ocr_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken OCR pool so the next _get_ocr_pool starts a fresh one."""
+    with _ocr_pools_lock:
+        for key, cached in list(_ocr_pools.items()):
+            if cached is pool:
+                del _ocr_pools[key]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def page_progress_event(
+    page_result: Dict[str, Any], total_pages: int, pages_done: int, elapsed: float
+) -> Dict[str, Any]:
+    """Progress event for a finished page, as passed to ``page_callback``"""
+    return {
+        "type": "page",
+        "page": page_result.get("page", 0) + 1,
+        "total_pages": total_pages,
+        "pages_done": pages_done,
+        "source": page_result.get("source", "error" if "error" in page_result else None),
+        "confidence": page_result.get("confidence"),
+        "elapsed_seconds": round(elapsed, 3),
+        "text": page_result.get("text", ""),
+        "error": page_result.get("error"),
+    }
+
+
+def shutdown_ocr_pools(wait_for_workers: bool = True) -> None:
+    """Shut down all OCR worker pools"""
+    with _ocr_pools_lock:
+        for pool in _ocr_pools.values():
+            pool.shutdown(wait=wait_for_workers)
+        _ocr_pools.clear()
+
+
 class PDFProcessor(BaseProcessor):
-    def __init__(self, config: Dict[str, Any] = None):
-        super().__init__(config)
-        self.ocr = self._initialize_ocr()
+    def __init__(
+        self,
+        config: Dict[str, Any] = None,
+        ocr_slot: Optional[Callable[[], ContextManager]] = None
+    ):
+        super().__init__(config, ocr_slot)
+        self.parallel_ocr = self.config.get("parallel_ocr", False)
+        # In parallel mode the OCR models live in the worker processes
+        self.ocr = None if self.parallel_ocr else self._initialize_ocr()
         self.max_workers = min(32, (os.cpu_count() or 1) + 4)
+        self.ocr_workers = self.config.get("ocr_workers", max(1, (os.cpu_count() or 2) // 2))
+        # Each worker loads its own model; on a GPU they would all share one device
+        self.parallel_use_gpu = self.config.get("parallel_ocr_use_gpu", False)
+        if self.parallel_ocr and self.parallel_use_gpu and self.ocr_workers > 1:
+            logger.warning("GPU OCR runs in a single worker process, ignoring ocr_workers")
+            self.ocr_workers = 1
+        self.ocr_queue_size = self.config.get("ocr_queue_size", self.ocr_workers * 2)
         self.chunk_size = config.get("chunk_size", 10)  # Process pages in chunks
         self.save_processed_files = config.get("save_processed_files", True)
         self.save_processed_files_dir = config.get("save_processed_files_dir", "processed_files")
 
-    def _initialize_ocr(self) -> PaddleOCR:
-        return PaddleOCR(
+    def _initialize_ocr(self) -> SharedOCREngine:
+        return OCREngineRegistry.get_engine(
+            language=self.config.get("language", "en"),
             use_angle_cls=True,
-            lang=self.config.get("language", "en"),
-            use_gpu= True,
-            enable_mkldnn=True,
-            show_log=False,
         )
 
     def _validate_config(self) -> None:
@@ -49,22 +142,35 @@ class PDFProcessor(BaseProcessor):
         if not 72 <= self.config["dpi"] <= 600:
             raise ValueError("DPI must be between 72 and 600")
 
-    def process(self, file_path: Path) -> Dict[str, Any]:
+        if self.config.get("parallel_ocr"):
+            if self.config.get("ocr_workers", 1) < 1:
+                raise ValueError("ocr_workers must be at least 1")
+            if self.config.get("ocr_queue_size", 1) < 1:
+                raise ValueError("ocr_queue_size must be at least 1")
+
+    def process(
+        self,
+        file_path: Path,
+        page_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Extract text from every page, with OCR for scanned pages
+
+        Args:
+            file_path: PDF to process
+            page_callback: Called with a ``page_progress_event`` as each page
+                finishes (in completion order when OCR runs in parallel)
+        """
         try:
             print("Processing PDF file:", file_path)
             logger.info(f"Processing PDF file: {file_path}")
             doc = fitz.open(str(file_path))
-            total_pages = len(doc)
-            pages_content = []
+            report = self._page_reporter(len(doc), page_callback)
 
-            for page_num in tqdm(range(total_pages)):
-                try:
-                    result = self._process_page(doc[page_num], page_num)
-                    pages_content.append(result)
-                    gc.collect()
-                except Exception as e:
-                    logger.error(f"Page {page_num} failed: {str(e)}")
-                    pages_content.append(self._create_error_page(page_num, str(e)))
+            if self.parallel_ocr:
+                pages_content = self._process_pages_parallel(doc, report)
+            else:
+                pages_content = self._process_pages_sequential(doc, report)
             
             # self._save_content({"content": pages_content}, self.save_processed_files_dir, file_path.stem)
             
@@ -92,6 +198,147 @@ class PDFProcessor(BaseProcessor):
     #     print(f"Text saved to: {text_file}")
         
 
+    def _page_reporter(
+        self, total_pages: int, page_callback: Optional[Callable[[Dict[str, Any]], None]]
+    ) -> Callable[[Dict[str, Any]], None]:
+        """Wrap a page callback with page counting and timing; errors in it are logged only"""
+        start = time.perf_counter()
+        pages_done = 0
+
+        def report(page_result: Dict[str, Any]) -> None:
+            nonlocal pages_done
+            pages_done += 1
+            if page_callback is None:
+                return
+            try:
+                page_callback(page_progress_event(
+                    page_result, total_pages, pages_done, time.perf_counter() - start
+                ))
+            except Exception as e:
+                logger.warning(f"Page progress callback failed: {str(e)}")
+
+        return report
+
+    def _process_pages_sequential(
+        self, doc, report: Callable[[Dict[str, Any]], None] = lambda page: None
+    ) -> List[Dict[str, Any]]:
+        pages_content = []
+        for page_num in tqdm(range(len(doc))):
+            try:
+                result = self._process_page(doc[page_num], page_num)
+                pages_content.append(result)
+                gc.collect()
+            except Exception as e:
+                logger.error(f"Page {page_num} failed: {str(e)}")
+                pages_content.append(self._create_error_page(page_num, str(e)))
+            report(pages_content[-1])
+        return pages_content
+
+    def _process_pages_parallel(
+        self, doc, report: Callable[[Dict[str, Any]], None] = lambda page: None
+    ) -> List[Dict[str, Any]]:
+        """
+        Process pages with OCR fanned out to a pool of worker processes.
+
+        Native-text pages are handled inline. Scanned pages are rasterized here
+        and handed to the pool, with at most ``ocr_queue_size`` pages in flight
+        so rasterized images don't pile up in memory. If a worker dies (e.g.
+        killed for running out of memory) the pool is replaced and each page
+        it was holding is retried once on the new pool. Results are returned
+        in page order with the same layout as the sequential path.
+
+        The OCR slot is taken at the first scanned page and held until the
+        pool has returned every page, so native-text documents never wait
+        for it.
+        """
+        total_pages = len(doc)
+        pages_content: List[Optional[Dict[str, Any]]] = [None] * total_pages
+        pool = _get_ocr_pool(self.config, self.ocr_workers, self.parallel_use_gpu)
+        # future -> (page number, attempt, pool it was submitted to)
+        pending = {}
+        slot = ExitStack()
+        holding_slot = False
+
+        def replace_pool(broken: ProcessPoolExecutor) -> None:
+            nonlocal pool
+            if pool is broken:
+                logger.warning("OCR pool broke, starting a new one")
+                _discard_ocr_pool(broken)
+                pool = _get_ocr_pool(self.config, self.ocr_workers, self.parallel_use_gpu)
+
+        def submit(page_num: int, attempt: int) -> None:
+            pix = doc[page_num].get_pixmap(dpi=self.config.get("dpi", 300), alpha=False)
+            try:
+                args = (pix.samples, pix.width, pix.height, page_num)
+                try:
+                    future = pool.submit(_ocr_worker_task, *args)
+                except BrokenProcessPool:
+                    replace_pool(pool)
+                    future = pool.submit(_ocr_worker_task, *args)
+                pending[future] = (page_num, attempt, pool)
+            finally:
+                del pix
+
+        def collect(futures) -> None:
+            for future in futures:
+                page_num, attempt, submitted_to = pending.pop(future)
+                page = doc[page_num]
+                try:
+                    result = future.result()
+                except BrokenProcessPool as e:
+                    replace_pool(submitted_to)
+                    error = str(e)
+                    if attempt == 0:
+                        logger.warning(f"OCR worker died on page {page_num}, retrying")
+                        try:
+                            submit(page_num, attempt + 1)
+                            continue
+                        except Exception as retry_error:
+                            error = str(retry_error)
+                    logger.error(f"OCR failed for page {page_num}: {error}")
+                    result = self._create_error_page(page_num, error)
+                except Exception as e:
+                    logger.error(f"OCR failed for page {page_num}: {str(e)}")
+                    result = self._create_error_page(page_num, str(e))
+                if "error" not in result:
+                    result["dimensions"] = page.rect.round()
+                pages_content[page_num] = result
+                report(result)
+
+        with slot:
+            for page_num in tqdm(range(total_pages)):
+                page = doc[page_num]
+                try:
+                    text = page.get_text().strip()
+                    if text:
+                        pages_content[page_num] = self._create_page_content(text, "native", page_num, page)
+                        report(pages_content[page_num])
+                        continue
+                    if not self.config.get("ocr_enabled"):
+                        pages_content[page_num] = self._create_page_content("", "none", page_num, page)
+                        report(pages_content[page_num])
+                        continue
+
+                    if not holding_slot:
+                        slot.enter_context(self.ocr_slot())
+                        holding_slot = True
+
+                    if len(pending) >= self.ocr_queue_size:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        collect(done)
+
+                    submit(page_num, 0)
+                except Exception as e:
+                    logger.error(f"Page {page_num} failed: {str(e)}")
+                    pages_content[page_num] = self._create_error_page(page_num, str(e))
+                    report(pages_content[page_num])
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(done)
+
+        return pages_content
+
     def _process_page(self, page, page_num: int) -> Dict[str, Any]:
         text = page.get_text().strip()
         if text:
@@ -104,16 +351,29 @@ class PDFProcessor(BaseProcessor):
 
     def _perform_ocr(self, page, page_num: int) -> Dict[str, Any]:
         try:
-            pix = page.get_pixmap(dpi=self.config.get("dpi", 300))
-            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-            img_np = np.array(img)
+            with self.ocr_slot():
+                pix = page.get_pixmap(dpi=self.config.get("dpi", 300))
+                img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+                img_np = np.array(img)
+                del pix, img
+
+                result = self._ocr_image(img_np, page_num)
+            if "error" not in result:
+                result["dimensions"] = page.rect.round()
+            return result
+        finally:
+            gc.collect()
+
+    def _ocr_image(self, img_np: np.ndarray, page_num: int) -> Dict[str, Any]:
+        """Run OCR on a rasterized page image (page dimensions are added by the caller)"""
+        try:
             processed_img = self._preprocess_image(img_np)
 
             results = self.ocr.ocr(processed_img)
-            del pix, img, img_np, processed_img
+            del img_np, processed_img
 
             if not results or not results[0]:
-                return self._create_page_content("", "ocr", page_num, page)
+                return {"text": "", "source": "ocr", "page": page_num}
 
             text_blocks = []
             full_text = []
@@ -137,9 +397,8 @@ class PDFProcessor(BaseProcessor):
                 "text_blocks": text_blocks,
                 "source": "ocr",
                 "page": page_num,
-                "dimensions": page.rect.round(),
                 "confidence": (
-                    np.mean([b["confidence"] for b in text_blocks])
+                    float(np.mean([b["confidence"] for b in text_blocks]))
                     if text_blocks
                     else 0
                 ),
@@ -147,8 +406,6 @@ class PDFProcessor(BaseProcessor):
         except Exception as e:
             logger.error(f"OCR failed for page {page_num}: {str(e)}")
             return self._create_error_page(page_num, str(e))
-        finally:
-            gc.collect()
 
     def _preprocess_image(self, image: np.ndarray) -> np.ndarray:
         try:
@@ -0,0 +1,259 @@
+import re
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import tiktoken
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TextChunk:
+    """A token-bounded piece of a contract section"""
+    chunk_id: str
+    text: str
+    section: str
+    section_number: Optional[str]
+    chunk_index: int
+    start_char: int
+    end_char: int
+    tokens: int
+    content_hash: str
+
+    def to_document(self) -> str:
+        """Text stored in the vector DB (section title gives retrieval context)"""
+        return f"content: {self.section} \n {self.text}"
+
+
+class ContractChunker:
+    """
+    Deterministic, LLM-free contract chunker.
+
+    Splits text into sections using heading and numbering heuristics
+    (numbered clauses, ARTICLE/SECTION/SCHEDULE headings, all-caps titles,
+    WHEREAS recitals and signature blocks), then packs each section's
+    paragraphs into chunks of at most ``chunk_size`` tokens with
+    ``chunk_overlap`` tokens carried between neighbouring chunks.
+
+    Chunk ids are derived from the section title and chunk text, so the same
+    text always produces the same ids.
+    """
+
+    # "1. DEFINITIONS", "12.3 Governing Law", "4) Term"
+    NUMBERED_HEADING = re.compile(r'^\s*(\d+(?:\.\d+)*)[\.\)]?\s+([A-Za-z][^\n]{0,100})$')
+    # "ARTICLE IV - PAYMENT", "Section 5", "SCHEDULE A"
+    KEYWORD_HEADING = re.compile(
+        r'^\s*(ARTICLE|SECTION|SCHEDULE|EXHIBIT|ANNEX|APPENDIX|CLAUSE)\s+([\dIVXLC]+|[A-Z])\b[\s\.:\-]*(.*)$',
+        re.IGNORECASE
+    )
+    # "(a) Confidential Information" style lettered headings
+    LETTERED_HEADING = re.compile(r'^\s*\(?([A-Z])[\.\)]\s+([A-Z][A-Z\s\'\-]+)$')
+    SPECIAL_HEADING = re.compile(r'^\s*(WHEREAS|RECITALS|SIGNATORIES|IN WITNESS WHEREOF)\b', re.IGNORECASE)
+    SENTENCE_SPLIT = re.compile(r'(?<=[\.;:])\s+')
+
+    MAX_HEADING_WORDS = 12
+    INTRODUCTION = "Introduction"
+
+    def __init__(
+        self,
+        chunk_size: int = 512,
+        chunk_overlap: int = 50,
+        encoding_name: str = "cl100k_base"
+    ):
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        if not 0 <= chunk_overlap < chunk_size:
+            raise ValueError("chunk_overlap must be between 0 and chunk_size")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.encoding = tiktoken.get_encoding(encoding_name)
+
+    def count_tokens(self, text: str) -> int:
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    def chunk(self, text: str) -> List[TextChunk]:
+        """
+        Split contract text into section-aware, token-bounded chunks
+
+        Args:
+            text: Full contract text
+
+        Returns:
+            Chunks in document order
+        """
+        chunks: List[TextChunk] = []
+        seen_ids: Dict[str, int] = {}
+
+        for title, number, start, end in self.split_sections(text):
+            for span_start, span_end, tokens in self._pack_section(text, start, end):
+                chunk_text = text[span_start:span_end].strip()
+                if not chunk_text:
+                    continue
+
+                content_hash = hashlib.sha1(f"{title}\n{chunk_text}".encode("utf-8")).hexdigest()
+                chunk_id = content_hash[:16]
+                # Identical boilerplate can repeat, keep ids unique but stable
+                seen_ids[chunk_id] = seen_ids.get(chunk_id, 0) + 1
+                if seen_ids[chunk_id] > 1:
+                    chunk_id = f"{chunk_id}_{seen_ids[chunk_id]}"
+
+                chunks.append(TextChunk(
+                    chunk_id=chunk_id,
+                    text=chunk_text,
+                    section=title,
+                    section_number=number,
+                    chunk_index=len(chunks),
+                    start_char=span_start,
+                    end_char=span_end,
+                    tokens=tokens,
+                    content_hash=content_hash
+                ))
+
+        logger.info(f"Chunked {len(text)} characters into {len(chunks)} chunks")
+        return chunks
+
+    def split_sections(self, text: str) -> List[Tuple[str, Optional[str], int, int]]:
+        """
+        Find section boundaries
+
+        Returns:
+            List of (title, section number, start offset, end offset); the
+            heading line is included in its section's span
+        """
+        headings: List[Tuple[int, str, Optional[str]]] = []
+        offset = 0
+        for line in text.splitlines(keepends=True):
+            heading = self._match_heading(line.strip())
+            if heading:
+                headings.append((offset, *heading))
+            offset += len(line)
+
+        sections = []
+        if not headings or headings[0][0] > 0:
+            first = headings[0][0] if headings else len(text)
+            if text[:first].strip():
+                sections.append((self.INTRODUCTION, None, 0, first))
+
+        for i, (start, title, number) in enumerate(headings):
+            end = headings[i + 1][0] if i + 1 < len(headings) else len(text)
+            sections.append((title, number, start, end))
+
+        return sections
+
+    def _match_heading(self, line: str) -> Optional[Tuple[str, Optional[str]]]:
+        if not line or len(line) > 120:
+            return None
+
+        match = self.SPECIAL_HEADING.match(line)
+        if match:
+            return match.group(1).upper(), None
+
+        match = self.KEYWORD_HEADING.match(line)
+        if match:
+            keyword, number, title = match.groups()
+            if len(title.split()) <= self.MAX_HEADING_WORDS:
+                label = f"{keyword.upper()} {number}"
+                return (f"{label} {title.strip()}".strip(), number)
+
+        match = self.NUMBERED_HEADING.match(line)
+        if match:
+            number, title = match.groups()
+            title = title.strip()
+            # Clause text that merely starts with a number is not a heading
+            if (
+                len(title.split()) <= self.MAX_HEADING_WORDS
+                and not title.endswith((".", ",", ";"))
+                and (title.isupper() or title.istitle() or len(title.split()) <= 4)
+            ):
+                return f"{number} {title}", number
+
+        match = self.LETTERED_HEADING.match(line)
+        if match:
+            return f"{match.group(1)} {match.group(2).strip()}", match.group(1)
+
+        letters = [c for c in line if c.isalpha()]
+        if (
+            len(letters) >= 3
+            and line.isupper()
+            and len(line.split()) <= self.MAX_HEADING_WORDS
+        ):
+            return line, None
+
+        return None
+
+    def _pack_section(self, text: str, start: int, end: int) -> List[Tuple[int, int, int]]:
+        """Pack a section's units into (start, end, tokens) chunk spans"""
+        units = self._split_units(text, start, end, self.chunk_size)
+        spans = []
+        current: List[Tuple[int, int, int]] = []
+        current_tokens = 0
+
+        for unit in units:
+            unit_tokens = unit[2]
+            if current and current_tokens + unit_tokens > self.chunk_size:
+                spans.append((current[0][0], current[-1][1], current_tokens))
+                # Carry trailing units into the next chunk as overlap
+                carried: List[Tuple[int, int, int]] = []
+                carried_tokens = 0
+                for prev in reversed(current):
+                    if carried_tokens + prev[2] > self.chunk_overlap:
+                        break
+                    carried.insert(0, prev)
+                    carried_tokens += prev[2]
+                if carried_tokens + unit_tokens > self.chunk_size:
+                    carried, carried_tokens = [], 0
+                current, current_tokens = carried, carried_tokens
+            current.append(unit)
+            current_tokens += unit_tokens
+
+        if current:
+            spans.append((current[0][0], current[-1][1], current_tokens))
+        return spans
+
+    def _split_units(self, text: str, start: int, end: int, limit: int) -> List[Tuple[int, int, int]]:
+        """
+        Split a span into units of at most ``limit`` tokens, preferring
+        paragraph, then line, then sentence, then word boundaries
+        """
+        for pattern in (r'\n\s*\n', r'\n', self.SENTENCE_SPLIT.pattern, r'\s+'):
+            pieces = self._split_span(text, start, end, pattern)
+            if len(pieces) > 1:
+                units = []
+                for piece_start, piece_end in pieces:
+                    tokens = self.count_tokens(text[piece_start:piece_end])
+                    if tokens <= limit:
+                        units.append((piece_start, piece_end, tokens))
+                    else:
+                        units.extend(self._split_units(text, piece_start, piece_end, limit))
+                return units
+
+        tokens = self.count_tokens(text[start:end])
+        if tokens <= limit:
+            return [(start, end, tokens)] if text[start:end].strip() else []
+        return self._split_by_tokens(text, start, end, limit)
+
+    def _split_span(self, text: str, start: int, end: int, pattern: str) -> List[Tuple[int, int]]:
+        pieces = []
+        piece_start = start
+        for match in re.finditer(pattern, text[start:end]):
+            piece_end = start + match.start()
+            if text[piece_start:piece_end].strip():
+                pieces.append((piece_start, piece_end))
+            piece_start = start + match.end()
+        if text[piece_start:end].strip():
+            pieces.append((piece_start, end))
+        return pieces
+
+    def _split_by_tokens(self, text: str, start: int, end: int, limit: int) -> List[Tuple[int, int, int]]:
+        """Last resort for unbroken text: fixed token windows mapped back to offsets"""
+        units = []
+        tokens = self.encoding.encode(text[start:end], disallowed_special=())
+        offset = start
+        for i in range(0, len(tokens), limit):
+            window = tokens[i:i + limit]
+            length = len(self.encoding.decode(window))
+            units.append((offset, min(offset + length, end), len(window)))
+            offset += length
+        return units
@@ -2,10 +2,15 @@
 import sys
 import json
 import argparse
-from typing import Optional, Dict, Any
+from contextlib import nullcontext
+from typing import Optional, Dict, Any, Callable, List
+from contract_analyzer.analysis_cache import AnalysisCache, CachedAnalysis
 from contract_analyzer.database import VectorDB
 from contract_analyzer.agents.agent_manager import AgentManager
+from contract_analyzer.agents.prompt_executor import PromptExecutor, run_agent
+from contract_analyzer.agents.response_cache import LLMResponseCache
 from contract_analyzer.config import Config
+from contract_analyzer.context_assembler import context_budget
 from contract_analyzer.agents.template.contract_analyst import (
     ContractAnalystTemplate,
     AnalysisScope,
@@ -33,81 +38,103 @@ logger = logging.getLogger(__name__)
 vector_db = VectorDB()
 
 
-def perform_contract_review(
-    content: str, agent_manager: AgentManager, collection_name: str
-) -> Optional[Dict[str, Any]]:
-    try:
-        agent = agent_manager.create_agent(
-            "contract_analyst", model_type=Config._current_model_type
-        )
-        initial_content = ''
-        analysis_prompt = ContractAnalystTemplate.create_analysis_prompt(
-            initial_content, AnalysisScope.COMPREHENSIVE
-        )
-        
-        # logger.info(f"Contract Review Prompt: {analysis_prompt}")
+def _scoped_vector_db(collection_name: str) -> VectorDB:
+    """Per-request view of the vector DB bound to one collection"""
+    vec = vector_db.scoped(collection_name)
+    if vec is None:
+        raise ValueError(f"Failed to set collection: {collection_name[:200]}")
+    logger.info(f"Collection set to: {collection_name}")
+    return vec
 
-        if vector_db.set_active_collection(collection_name):
-            logger.info(f"Collection set to: {collection_name}")
-        else:
-            raise ValueError(f"Failed to set collection: {collection_name[:200]}")
-        
-        content = vector_db.get_context(analysis_prompt, num_results=5)
 
-        analysis_prompt = ContractAnalystTemplate.create_analysis_prompt(
-            content, AnalysisScope.COMPREHENSIVE
+def _log_context_usage(templates: Dict[str, str], vec: VectorDB) -> None:
+    """Log how much of its context budget each prompt used"""
+    for name, stats in zip(templates, vec.last_context_stats):
+        logger.info(
+            f"{name} context: {stats.tokens}/{stats.budget} tokens "
+            f"({stats.budget_used:.0%}), {stats.chunks_used} chunks"
         )
-        
-        result = agent.run(analysis_prompt)
-        
-        print("Completed Comprehensive Analysis")
-        
-        # logger.info(f"Contract Review Result: {result.content}")
 
-        extarct_key_prompt = ContractAnalystTemplate.extract_key_terms(initial_content)
 
-        content = vector_db.get_context(extarct_key_prompt, num_results=5)
+# Receives (task name, generated text, attempt number) while a model
+# streams its answer
+TokenCallback = Callable[[str, str, int], None]
 
-        extarct_key_prompt = ContractAnalystTemplate.extract_key_terms(content)
 
-        key_terms = agent.run(extarct_key_prompt)
-        
-        print("Completed Key Term Extraction")
+def _task_tokens(on_token: Optional[TokenCallback], task: str) -> Optional[Callable[[str], None]]:
+    """Bind a token callback to a single-prompt task"""
+    if on_token is None:
+        return None
+    return lambda delta: on_token(task, delta, 1)
 
-        analyze_obg_prompt = ContractAnalystTemplate.analyze_obligations(initial_content)
 
-        content = vector_db.get_context(analyze_obg_prompt, num_results=5)
+def _contract_review_templates(initial_content: str = '') -> Dict[str, str]:
+    """Contract review prompts keyed by context budget name"""
+    return {
+        "contract_review": ContractAnalystTemplate.create_analysis_prompt(
+            initial_content, AnalysisScope.COMPREHENSIVE
+        ),
+        "key_terms": ContractAnalystTemplate.extract_key_terms(initial_content),
+        "obligations": ContractAnalystTemplate.analyze_obligations(initial_content),
+        "parties": ContractAnalystTemplate.create_party_extraction_prompt(initial_content),
+    }
+
 
-        analyze_obg_prompt = ContractAnalystTemplate.analyze_obligations(content)
+def perform_contract_review(
+    content: str,
+    agent_manager: AgentManager,
+    collection_name: str,
+    on_token: Optional[TokenCallback] = None
+) -> Optional[Dict[str, Any]]:
+    try:
+        def create_agent():
+            return agent_manager.create_agent(
+                "contract_analyst", model_type=Config._current_model_type
+            )
 
-        obligations = agent.run(analyze_obg_prompt)
+        initial_content = ''
+        vec = _scoped_vector_db(collection_name)
+
+        # Each prompt's template doubles as its retrieval query; fetch all
+        # four contexts in one batched call, each packed into its budget
+        templates = _contract_review_templates(initial_content)
+        contexts = vec.get_contexts(
+            list(templates.values()),
+            n_results=8,
+            max_tokens=[context_budget(template, name) for name, template in templates.items()],
+        )
+        _log_context_usage(templates, vec)
 
-        print("Completed Obligations Analysis")
-        
-        party_extract_prompt = ContractAnalystTemplate.create_party_extraction_prompt(
-            initial_content
+        analysis_prompt = ContractAnalystTemplate.create_analysis_prompt(
+            contexts[0], AnalysisScope.COMPREHENSIVE
         )
 
-        content = vector_db.get_context(party_extract_prompt, num_results=5)
+        extarct_key_prompt = ContractAnalystTemplate.extract_key_terms(contexts[1])
 
+        analyze_obg_prompt = ContractAnalystTemplate.analyze_obligations(contexts[2])
+        
         party_extract_prompt = ContractAnalystTemplate.create_party_extraction_prompt(
-            content
+            contexts[3]
         )
 
-        parties = agent.run(party_extract_prompt)
+        # The four prompts are independent, so run them concurrently
+        responses = PromptExecutor(create_agent, on_token=on_token).run_all({
+            "Contract Review": analysis_prompt,
+            "Key Terms": extarct_key_prompt,
+            "Obligations": analyze_obg_prompt,
+            "Parties": party_extract_prompt,
+        })
         
-        print("Completed Parties Extraction")
+        print("Completed Contract Review")
         
         # logger.info(f"Key Terms: {key_terms.content}")
         
         # logging.INFO(f"Contract Review completed successfully")
 
-        return {
-            "Contract Review": result.content,
-            "Key Terms": key_terms.content,
-            "Obligations": obligations.content,
-            "Parties": parties.content,
-        }
+        return _record_failed_tasks(
+            {name: response.content if response else None for name, response in responses.items()},
+            responses
+        )
     except Exception as e:
         logger.error(f"Contract review failed: {str(e)}")
         return None
@@ -140,47 +167,65 @@ def perform_contract_review(
 #     }
 
 
+def _legal_research_prompt(content: str) -> str:
+    return LegalResearcherTemplate.create_research_prompt(
+        context=content,
+        scope=ResearchScope.COMPREHENSIVE,
+        domain=ResearchDomain.CONTRACT_LAW,
+    )
+
+
 def perform_legal_research(
-    content: str, agent_manager: AgentManager
+    content: str,
+    agent_manager: AgentManager,
+    collection_name: Optional[str] = None,
+    on_token: Optional[TokenCallback] = None
 ) -> Optional[Dict[str, Any]]:
     agent = agent_manager.create_agent(
         "legal_researcher", model_type=Config._current_model_type
     )
 
-    prompt = LegalResearcherTemplate.create_research_prompt(
-        context=content,
-        scope=ResearchScope.COMPREHENSIVE,
-        domain=ResearchDomain.CONTRACT_LAW,
-    )
+    prompt = _legal_research_prompt(content)
 
-    result = agent.run(prompt)
+    result = run_agent(agent, prompt, on_token=_task_tokens(on_token, "Legal Research"))
     return {"Legal Research": result.content} if result else None
 
 
+def _risk_prompts(content: str) -> Dict[str, str]:
+    return {
+        category.value: RiskAssessmentTemplate.get_risk_prompt(content, category)
+        for category in [
+            RiskCategory.LEGAL,
+            RiskCategory.FINANCIAL,
+            RiskCategory.OPERATIONAL,
+            RiskCategory.COMPLIANCE,
+        ]
+    }
+
+
 def perform_risk_assessment(
-    content: str, agent_manager: AgentManager
+    content: str,
+    agent_manager: AgentManager,
+    collection_name: Optional[str] = None,
+    on_token: Optional[TokenCallback] = None
 ) -> Optional[Dict[str, Any]]:
 
-    agent = agent_manager.create_agent(
-        "risk_assessor", model_type=Config._current_model_type
-    )
+    def create_agent():
+        return agent_manager.create_agent(
+            "risk_assessor", model_type=Config._current_model_type
+        )
 
     prompt = RiskAssessmentTemplate.create_assessment_prompt(
         context=content, risk_level=RiskLevel.HIGH
     )
 
-    # Get detailed risk analysis by categories
-    results = {}
-    for category in [
-        RiskCategory.LEGAL,
-        RiskCategory.FINANCIAL,
-        RiskCategory.OPERATIONAL,
-        RiskCategory.COMPLIANCE,
-    ]:
-        category_prompt = RiskAssessmentTemplate.get_risk_prompt(content, category)
-        category_result = agent.run(category_prompt)
-        if category_result:
-            results[category.value] = category_result.content
+    # Get detailed risk analysis by categories, all categories at once
+    responses = PromptExecutor(create_agent, on_token=on_token).run_all(_risk_prompts(content))
+    results = _record_failed_tasks({
+        category: category_result.content
+        for category, category_result in responses.items()
+        if category_result and category_result.content
+    }, responses)
             
     
 
@@ -204,57 +249,70 @@ def perform_risk_assessment(
     return results
 
 
-def perform_contract_summary(
-    content: str, agent_manager: AgentManager
-) -> Optional[Dict[str, Any]]:
-    agent = agent_manager.create_agent(
-        "contract_summarizer", model_type=Config._current_model_type
-    )
-
-    # Get initial context
-    prompt = ContractSummaryTemplate.create_summary_prompt(context=content)
-    result = agent.run(prompt)
-
-    # Extract core details
-    prompt_parties = ContractSummaryTemplate.extract_details_prompt(content, "parties")
-    parties_result = agent.run(prompt_parties)
+def _summary_prompts(content: str) -> Dict[str, str]:
+    return {
+        "summary": ContractSummaryTemplate.create_summary_prompt(context=content),
+        "overview": ContractSummaryTemplate.extract_details_prompt(content, "parties"),
+        "obligations": ContractSummaryTemplate.extract_details_prompt(
+            content, "obligations"
+        ),
+        "deadlines": ContractSummaryTemplate.extract_details_prompt(content, "deadlines"),
+        "penalties": ContractSummaryTemplate.extract_details_prompt(
+            content, "penalties"
+        ),
+    }
 
-    prompt_obligations = ContractSummaryTemplate.extract_details_prompt(
-        content, "obligations"
-    )
-    obligations_result = agent.run(prompt_obligations)
 
-    prompt_dates = ContractSummaryTemplate.extract_details_prompt(content, "deadlines")
-    dates_result = agent.run(prompt_dates)
+def perform_contract_summary(
+    content: str,
+    agent_manager: AgentManager,
+    collection_name: Optional[str] = None,
+    on_token: Optional[TokenCallback] = None
+) -> Optional[Dict[str, Any]]:
+    def create_agent():
+        return agent_manager.create_agent(
+            "contract_summarizer", model_type=Config._current_model_type
+        )
 
-    prompt_penalties = ContractSummaryTemplate.extract_details_prompt(
-        content, "penalties"
-    )
-    penalties_result = agent.run(prompt_penalties)
+    # Summary and core detail extraction don't depend on each other
+    responses = PromptExecutor(create_agent, on_token=on_token).run_all(_summary_prompts(content))
 
     # Format extracted data
     extracted_data = {
-        "summary": result.content if result else "",
-        "overview": parties_result.content if parties_result else "",
-        "obligations": obligations_result.content if obligations_result else "",
-        "deadlines": dates_result.content if dates_result else "",
-        "penalties": penalties_result.content if penalties_result else "",
+        key: response.content if response else ""
+        for key, response in responses.items()
     }
 
     summary = ContractSummaryTemplate.format_summary(extracted_data)
-    return {"Contract Summary": summary}
+    return _record_failed_tasks({"Contract Summary": summary}, responses)
+
+
+def _custom_analysis_prompt(content: str, custom_query: str) -> str:
+    return f"""Analyze the following document based on the custom query:
+
+Document:
+{content}
+
+Query: {custom_query}
+
+"""
 
 
 def perform_custom_analysis(
-    content: str, custom_query: str, agent_manager: AgentManager, collection_name: str
+    content: str,
+    custom_query: str,
+    agent_manager: AgentManager,
+    collection_name: str,
+    on_token: Optional[TokenCallback] = None
 ) -> Optional[Dict[str, Any]]:
     
-    if vector_db.set_active_collection(collection_name):
-        logger.info(f"Collection set to: {collection_name}")
-    else:
-        raise ValueError(f"Failed to set collection: {collection_name[:200]}")
+    vec = _scoped_vector_db(collection_name)
     
-    content = vector_db.get_context(custom_query)
+    template = _custom_analysis_prompt("", custom_query)
+    content = vec.get_context(
+        custom_query, num_results=8, max_tokens=context_budget(template, "custom")
+    )
+    _log_context_usage({"custom": template}, vec)
 
     agent = agent_manager.create_agent(
         "custom_analyst",
@@ -262,19 +320,18 @@ def perform_custom_analysis(
         model_type=Config._current_model_type,
     )
 
-    prompt = f"""Analyze the following document based on the custom query:
-
-Document:
-{content}
-
-Query: {custom_query}
-
-"""
+    prompt = _custom_analysis_prompt(content, custom_query)
 
-    result = agent.run(prompt)
+    result = run_agent(agent, prompt, on_token=_task_tokens(on_token, "Custom Analysis"))
     return {"Custom Analysis": result.content} if result else None
 
-def perform_information_extraction(content: str, agent_manager: AgentManager, collection_name: str) -> Optional[Dict[str, Any]]:
+def perform_information_extraction(
+    content: str,
+    agent_manager: AgentManager,
+    collection_name: str,
+    on_group_complete: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+    on_token: Optional[TokenCallback] = None
+) -> Optional[Dict[str, Any]]:
     """
     Perform information extraction on contract content
     
@@ -282,35 +339,36 @@ def perform_information_extraction(content: str, agent_manager: AgentManager, co
         content: Contract content to analyze
         agent_manager: Agent manager instance
         collection_name: Name of the vector DB collection
+        on_group_complete: Optional callback receiving each field group's
+            partial results as soon as that group finishes
+        on_token: Optional callback receiving (field group, text, attempt)
+            as each group's answer is generated
         
     Returns:
         Dictionary containing extracted information
     """
     try:
         # Create agent
-        agent = agent_manager.create_agent(
-            "extract_information", 
-            model_type=Config._current_model_type
-        )
-        
-        # Set vector DB collection
-        if vector_db.set_active_collection(collection_name):
-            logger.info(f"Collection set to: {collection_name}")
-        else:
-            raise ValueError(f"Failed to set collection: {collection_name[:200]}")
+        def create_agent():
+            return agent_manager.create_agent(
+                "extract_information", 
+                model_type=Config._current_model_type
+            )
+
+        # Bind a vector DB view to this request's collection
+        vec = _scoped_vector_db(collection_name)
             
         # Initialize extraction processor
         processor = ExtractionProcessor()
         
-        vector_db.set_active_collection(collection_name)
-
-        print("Collection set to: ", collection_name)
-        
         # Process extractions
         processor.process_extractions(
             content=content,
-            vec=vector_db,
-            agent=agent,
+            vec=vec,
+            agent=None,
+            agent_factory=create_agent,
+            on_group_complete=on_group_complete,
+            on_token=on_token,
         )
         
         # Get results in proper format
@@ -335,41 +393,177 @@ def perform_information_extraction(content: str, agent_manager: AgentManager, co
             }
         }
 
+def _dispatch_analysis(
+    content: str,
+    analysis_type: str,
+    custom_query: Optional[str],
+    collection_name: Optional[str],
+    agent_manager: AgentManager,
+    on_token: Optional[TokenCallback] = None,
+    on_group_complete: Optional[Callable[[str, Dict[str, Any]], None]] = None
+) -> Optional[Dict[str, Any]]:
+    if analysis_type == "Information Extraction":
+        if not collection_name:
+            raise ValueError("Collection name required for Information Extraction")
+        return perform_information_extraction(
+            content, agent_manager, collection_name,
+            on_group_complete=on_group_complete, on_token=on_token
+        )
+    elif analysis_type == "Contract Review":
+        return perform_contract_review(content, agent_manager, collection_name, on_token=on_token)
+    elif analysis_type == "Legal Research":
+        return perform_legal_research(content, agent_manager, collection_name, on_token=on_token)
+    elif analysis_type == "Risk Assessment":
+        return perform_risk_assessment(content, agent_manager, collection_name, on_token=on_token)
+    elif analysis_type == "Contract Summary":
+        return perform_contract_summary(content, agent_manager, collection_name, on_token=on_token)
+    elif analysis_type == "Custom Analysis":
+        return perform_custom_analysis(
+            content, custom_query, agent_manager, collection_name, on_token=on_token
+        )
+    else:
+        raise ValueError(f"Unsupported analysis type: {analysis_type}")
+
+def _analysis_templates(analysis_type: str, custom_query: Optional[str]) -> List[str]:
+    """The prompt templates an analysis type runs, rendered without context"""
+    if analysis_type == "Information Extraction":
+        processor = ExtractionProcessor()
+        return [
+            processor._build_extraction_prompt("", fields)
+            for fields in processor.contract_sections.values()
+        ]
+    elif analysis_type == "Contract Review":
+        return list(_contract_review_templates().values())
+    elif analysis_type == "Legal Research":
+        return [_legal_research_prompt("")]
+    elif analysis_type == "Risk Assessment":
+        return list(_risk_prompts("").values())
+    elif analysis_type == "Contract Summary":
+        return list(_summary_prompts("").values())
+    elif analysis_type == "Custom Analysis":
+        return [_custom_analysis_prompt("", custom_query)]
+    return []
+
+def analysis_cache_key(
+    content: str,
+    analysis_type: str,
+    custom_query: Optional[str] = None,
+    collection_name: Optional[str] = None
+) -> str:
+    """Result cache key of an analysis on the current model"""
+    return AnalysisCache.make_key(
+        collection_name=collection_name,
+        analysis_type=analysis_type,
+        model_type=Config._current_model_type.value,
+        custom_query=custom_query,
+        content=content,
+        prompts=_analysis_templates(analysis_type, custom_query),
+    )
+
+def get_cached_analysis(
+    content: str,
+    analysis_type: str,
+    custom_query: Optional[str] = None,
+    collection_name: Optional[str] = None
+) -> Optional[CachedAnalysis]:
+    """Cached result of an analysis, or None if it has to run"""
+    return AnalysisCache.get(
+        analysis_cache_key(content, analysis_type, custom_query, collection_name)
+    )
+
+def _record_failed_tasks(result: Dict[str, Any], responses: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Name the prompts that produced no answer in ``failed_tasks``
+
+    Args:
+        result: Analysis result built from the responses
+        responses: Task name to agent response, from PromptExecutor.run_all
+
+    Returns:
+        The result, with ``failed_tasks`` if any prompt failed
+    """
+    failed = [
+        name for name, response in responses.items()
+        if response is None or not getattr(response, "content", None)
+    ]
+    if failed:
+        logger.warning(f"Prompts without an answer: {', '.join(failed)}")
+        result["failed_tasks"] = failed
+    return result
+
+def _is_cacheable(result: Dict[str, Any]) -> bool:
+    """Failed and partial analyses are reported as results; never cache those"""
+    if "error" in result or result.get("failed_tasks"):
+        return False
+    return not any(
+        isinstance(value, dict) and value.get("status") == "failed"
+        for value in result.values()
+    )
+
 def perform_analysis(
     content: str, 
     analysis_type: str, 
     custom_query: Optional[str] = None, 
-    collection_name: Optional[str] = None
+    collection_name: Optional[str] = None,
+    progress_callback: Optional[Callable[..., None]] = None,
+    stream_tokens: bool = False,
+    use_cache: bool = True
 ) -> Optional[Dict[str, Any]]:
     """
     Perform analysis based on type
+
+    Results are cached per collection, analysis type, model, custom query,
+    content and prompt templates; ``use_cache=False`` runs the analysis
+    again, bypassing memoized agent responses as well, and replaces the
+    cached result.
+
+    With ``stream_tokens`` the models stream their answers and every piece
+    of text is reported to ``progress_callback`` as a ``type="token"`` event
+    tagged with its sub-task (e.g. "Key Terms") and attempt number, which
+    goes up when a sub-task is retried; Information Extraction also
+    reports each field group's parsed fields as a ``type="partial"`` event.
     """
+    cache_key = analysis_cache_key(content, analysis_type, custom_query, collection_name)
+    if use_cache:
+        cached = AnalysisCache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Using cached {analysis_type} result ({cached.age_seconds:.0f}s old)")
+            if progress_callback:
+                progress_callback(
+                    stage="llm", progress=1.0, message=f"Loaded cached {analysis_type}",
+                    type="cache", age_seconds=round(cached.age_seconds, 1)
+                )
+            return cached.result
+
     agent_manager = AgentManager()
 
+    on_token = None
+    on_group_complete = None
+    if stream_tokens and progress_callback:
+        def on_token(task: str, delta: str, attempt: int) -> None:
+            progress_callback(type="token", task=task, attempt=attempt, delta=delta)
+
+        def on_group_complete(group: str, fields: Dict[str, Any]) -> None:
+            progress_callback(type="partial", task=group, fields=fields)
+
     try:
         result = None
+        if progress_callback:
+            progress_callback(stage="llm", progress=0.0, message=f"Running {analysis_type}")
         
-        if analysis_type == "Information Extraction":
-            if not collection_name:
-                raise ValueError("Collection name required for Information Extraction")
-            result = perform_information_extraction(content, agent_manager, collection_name)
-        elif analysis_type == "Contract Review":
-            result = perform_contract_review(content, agent_manager, collection_name)
-        elif analysis_type == "Legal Research":
-            result = perform_legal_research(content, agent_manager, collection_name)
-        elif analysis_type == "Risk Assessment":
-            result = perform_risk_assessment(content, agent_manager, collection_name)
-        elif analysis_type == "Contract Summary":
-            result = perform_contract_summary(content, agent_manager, collection_name)
-        elif analysis_type == "Custom Analysis":
-            result = perform_custom_analysis(content, custom_query, agent_manager, collection_name)
-        else:
-            raise ValueError(f"Unsupported analysis type: {analysis_type}")
+        # A refreshed analysis asks the model again instead of replaying answers
+        with nullcontext() if use_cache else LLMResponseCache.refresh():
+            result = _dispatch_analysis(
+                content, analysis_type, custom_query, collection_name, agent_manager,
+                on_token=on_token, on_group_complete=on_group_complete
+            )
 
         # Ensure result is JSON serializable
         if result:
             try:
                 json.dumps(result)  # Test JSON serialization
+                if _is_cacheable(result):
+                    AnalysisCache.set(cache_key, collection_name, result)
                 return result
             except (TypeError, json.JSONDecodeError) as e:
                 logger.error(f"JSON serialization failed: {str(e)}")
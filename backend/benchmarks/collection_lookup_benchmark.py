@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Measure how collection existence checks scale with the number of collections.
+
+Compares the old ``name in client.list_collections()`` scan with a direct
+``get_collection`` lookup and with the VectorResources handle cache.
+
+Usage (from the backend directory):
+    python -m benchmarks.collection_lookup_benchmark [--sizes 10 100 1000 10000 100000]
+"""
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from contract_analyzer.config import Config
+from contract_analyzer.vector_resources import VectorResources
+
+
+def time_lookups(lookup, names: list, repeats: int) -> float:
+    """Average milliseconds per lookup"""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for name in names:
+            lookup(name)
+    return (time.perf_counter() - start) * 1000 / (repeats * len(names))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark collection existence checks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000, 100000])
+    parser.add_argument("--lookups", type=int, default=50, help="Names looked up per size")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--scan-limit", type=int, default=10000,
+                        help="Skip the list_collections scan above this many collections")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as db_dir:
+        Config.CHROMA_DB_PATH = Path(db_dir)
+        client = VectorResources.get_client()
+        names: list = []
+
+        print(f"{'collections':>12} {'list scan ms':>13} {'get ms':>9} {'cached ms':>10}")
+        for size in sorted(args.sizes):
+            while len(names) < size:
+                name = f"contract_{len(names):06d}"
+                VectorResources.cache_collection(client.create_collection(name=name))
+                names.append(name)
+
+            sample = random.sample(names, min(args.lookups, len(names)))
+
+            if size <= args.scan_limit:
+                scan_ms = time_lookups(
+                    lambda n: n in {c.name if hasattr(c, "name") else c for c in client.list_collections()},
+                    sample[:5], 1
+                )
+                scan = f"{scan_ms:13.3f}"
+            else:
+                scan = f"{'skipped':>13}"
+
+            get_ms = time_lookups(lambda n: client.get_collection(name=n), sample, args.repeats)
+            VectorResources.invalidate_collection()
+            # First pass fills the cache, later passes are hits
+            time_lookups(VectorResources.get_collection, sample, 1)
+            cached_ms = time_lookups(VectorResources.get_collection, sample, args.repeats)
+
+            print(f"{size:>12} {scan} {get_ms:9.3f} {cached_ms:10.4f}")
+
+        VectorResources.shutdown()
+
+
+if __name__ == "__main__":
+    main()
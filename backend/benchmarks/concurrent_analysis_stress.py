@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Stress concurrent retrieval across contracts and check for cross-contamination.
+
+Ingests synthetic contracts whose every clause carries a contract marker,
+then runs many concurrent analyses that each retrieve context from their
+own contract. Any retrieved chunk carrying another contract's marker is
+counted as contamination.
+
+``--legacy`` switches to the old pattern of calling set_active_collection on
+one shared VectorDB, which shows the race the scoped views remove.
+
+Usage (from the backend directory):
+    python -m benchmarks.concurrent_analysis_stress [--contracts 20] [--analyses 400] [--workers 16]
+"""
+import argparse
+import random
+import re
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from contract_analyzer.config import Config
+from contract_analyzer.vector_resources import VectorResources
+
+MARKER = re.compile(r"CONTRACT-(\d{4})")
+QUERIES = [
+    "Who are the parties to the agreement?",
+    "What are the payment terms?",
+    "How can the agreement be terminated?",
+    "Which law governs the agreement?",
+]
+
+
+def make_contract(index: int) -> str:
+    marker = f"CONTRACT-{index:04d}"
+    return "\n\n".join([
+        f"1. PARTIES\nThis agreement {marker} is made between Supplier {index} and Customer {index}.",
+        f"2. PAYMENT\nUnder {marker} the Customer pays {index * 100} USD within 30 days of invoice.",
+        f"3. TERM AND TERMINATION\n{marker} runs for {index % 5 + 1} years and either party may terminate on notice.",
+        f"4. GOVERNING LAW\n{marker} is governed by the laws of jurisdiction {index}.",
+    ])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Concurrent analysis stress test")
+    parser.add_argument("--contracts", type=int, default=20)
+    parser.add_argument("--analyses", type=int, default=400)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--legacy", action="store_true",
+                        help="Share one VectorDB and switch its active collection per analysis")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as db_dir:
+        Config.CHROMA_DB_PATH = Path(db_dir)
+        from contract_analyzer.database import VectorDB
+
+        vector_db = VectorDB()
+        names = [f"stress_contract_{i:04d}" for i in range(args.contracts)]
+        for i, name in enumerate(names):
+            vec = vector_db.scoped(name, create=True)
+            if vec is None or not vec.add_documents(make_contract(i)):
+                raise RuntimeError(f"Failed to ingest {name}")
+
+        def analysis(contract_index: int):
+            start = time.perf_counter()
+            if args.legacy:
+                vector_db.set_active_collection(names[contract_index])
+                vec = vector_db
+            else:
+                vec = vector_db.scoped(names[contract_index])
+            foreign = 0
+            for query in QUERIES:
+                context = vec.get_context(query, num_results=2) or ""
+                foreign += sum(1 for m in MARKER.findall(context) if int(m) != contract_index)
+            return foreign, time.perf_counter() - start
+
+        rng = random.Random(0)
+        jobs = [rng.randrange(args.contracts) for _ in range(args.analyses)]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            results = list(pool.map(analysis, jobs))
+        elapsed = time.perf_counter() - start
+
+        contaminated = sum(1 for foreign, _ in results if foreign)
+        latencies = sorted(latency * 1000 for _, latency in results)
+        print(f"mode:           {'legacy shared active_collection' if args.legacy else 'scoped views'}")
+        print(f"analyses:       {len(results)} ({len(results) * len(QUERIES)} queries, {args.workers} workers)")
+        print(f"throughput:     {len(results) / elapsed:.1f} analyses/sec")
+        print(f"latency p50/95: {statistics.median(latencies):.1f} / {latencies[int(len(latencies) * 0.95) - 1]:.1f} ms")
+        print(f"contaminated:   {contaminated}")
+
+        VectorResources.shutdown()
+        if contaminated and not args.legacy:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
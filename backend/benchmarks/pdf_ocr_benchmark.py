@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Compare sequential and page-parallel OCR throughput of PDFProcessor.
+
+Usage (from the backend directory):
+    python -m benchmarks.pdf_ocr_benchmark <file.pdf> [--workers 4] [--dpi 300]
+"""
+import argparse
+import time
+from pathlib import Path
+
+import fitz
+
+from Doc_Processor.processors.pdf_processor import PDFProcessor, shutdown_ocr_pools
+
+
+def run_mode(file_path: Path, config: dict, parallel: bool) -> tuple[float, list]:
+    processor = PDFProcessor({**config, "parallel_ocr": parallel})
+    doc = fitz.open(str(file_path))
+    try:
+        if parallel:
+            # Spawn the pool and load the worker models outside the timed run
+            warmup = fitz.open()
+            for _ in range(processor.ocr_workers):
+                warmup.new_page()
+            processor._process_pages_parallel(warmup)
+            warmup.close()
+        start = time.perf_counter()
+        if parallel:
+            pages = processor._process_pages_parallel(doc)
+        else:
+            pages = processor._process_pages_sequential(doc)
+        return time.perf_counter() - start, pages
+    finally:
+        doc.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark PDF OCR modes")
+    parser.add_argument("file", type=Path, help="PDF file to process")
+    parser.add_argument("--workers", type=int, default=2, help="OCR worker processes")
+    parser.add_argument("--queue-size", type=int, default=None, help="Max pages in flight")
+    parser.add_argument("--dpi", type=int, default=300)
+    parser.add_argument("--language", default="en")
+    args = parser.parse_args()
+
+    config = {
+        "ocr_enabled": True,
+        "language": args.language,
+        "dpi": args.dpi,
+        "ocr_workers": args.workers,
+        "ocr_queue_size": args.queue_size or args.workers * 2,
+    }
+
+    try:
+        seq_time, seq_pages = run_mode(args.file, config, parallel=False)
+        par_time, par_pages = run_mode(args.file, config, parallel=True)
+    finally:
+        shutdown_ocr_pools()
+
+    total = len(seq_pages)
+    ocr_pages = sum(1 for p in seq_pages if p.get("source") == "ocr")
+    mismatched = sum(
+        1 for a, b in zip(seq_pages, par_pages) if a.get("text") != b.get("text")
+    )
+
+    print(f"Pages: {total} ({ocr_pages} OCR, {total - ocr_pages} native/other)")
+    print(f"Sequential: {seq_time:8.2f}s  {total / seq_time:6.2f} pages/sec")
+    print(
+        f"Parallel:   {par_time:8.2f}s  {total / par_time:6.2f} pages/sec "
+        f"({args.workers} workers)"
+    )
+    print(f"Speedup:    {seq_time / par_time:6.2f}x")
+    print(f"Pages with differing text: {mismatched}")
+
+
+if __name__ == "__main__":
+    main()
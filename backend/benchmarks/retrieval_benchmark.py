@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Compare dense, hybrid (BM25 + vector, RRF) and reranked retrieval on a folder
+of contracts.
+
+Every contract is ingested into its own collection. Each detected section
+heading becomes a query (e.g. "Governing Law") whose relevant chunks are the
+chunks of that section. Headings are stripped from the indexed text, since
+stored chunks normally start with their section title and the queries would
+otherwise match it verbatim. Reports recall@k, MRR and per-query latency.
+
+Chroma, the query embedding cache and the analysis cache all live in a
+temporary directory for the run.
+
+Usage (from the backend directory):
+    python -m benchmarks.retrieval_benchmark ["../Sample Agreements"] [--k 5] [--rerank]
+"""
+import argparse
+import re
+import statistics
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import List
+
+from contract_analyzer.config import Config
+from contract_analyzer.vector_resources import VectorResources
+from Doc_Processor.processors.text_chunker import ContractChunker, TextChunk
+
+
+def load_text(path: Path) -> str:
+    suffix = path.suffix.lower()
+    if suffix == ".txt":
+        return path.read_text(encoding="utf-8", errors="ignore")
+    if suffix == ".docx":
+        from docx import Document
+        return "\n".join(paragraph.text for paragraph in Document(str(path)).paragraphs)
+    if suffix == ".pdf":
+        import fitz
+        with fitz.open(str(path)) as doc:
+            return "\n".join(page.get_text() for page in doc)
+    return ""
+
+
+def heading_query(section: str) -> str:
+    """Section title without its number/keyword prefix"""
+    query = re.sub(r"^(ARTICLE|SECTION|SCHEDULE|EXHIBIT|ANNEX|APPENDIX|CLAUSE)\s+\S+\s*", "", section, flags=re.I)
+    query = re.sub(r"^[\dA-Z]{1,3}(\.\d+)*[\.\)]?\s+", "", query)
+    return query.strip(" .:-").lower()
+
+
+class BodyOnlyChunk(TextChunk):
+    """Chunk indexed without its section title"""
+
+    def to_document(self) -> str:
+        return self.text
+
+
+class HeadingFreeChunker(ContractChunker):
+    """Chunker whose chunks carry neither the section title nor the heading line"""
+
+    def chunk(self, text: str) -> List[TextChunk]:
+        chunks = []
+        for chunk in super().chunk(text):
+            lines = chunk.text.strip().split("\n")
+            query = heading_query(chunk.section)
+            if query and lines and query in lines[0].lower():
+                lines = lines[1:]
+            body = "\n".join(lines).strip()
+            if body:
+                chunks.append(BodyOnlyChunk(**{**asdict(chunk), 'text': body}))
+        return chunks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark hybrid retrieval")
+    parser.add_argument("corpus", type=Path, nargs="?", default=Path("../Sample Agreements"))
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--rerank", action="store_true", help="Also time cross-encoder reranking")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as db_dir:
+        Config.CHROMA_DB_PATH = Path(db_dir)
+        Config.QUERY_EMBEDDING_CACHE_PATH = Path(db_dir) / "query_embeddings.sqlite"
+        Config.ANALYSIS_CACHE_PATH = Path(db_dir) / "analysis_results.sqlite"
+        from contract_analyzer.analysis_cache import AnalysisCache
+        from contract_analyzer.database import VectorDB
+
+        vector_db = VectorDB()
+        vector_db.chunker = HeadingFreeChunker(
+            chunk_size=Config.PROCESSOR_CONFIG.chunk_size,
+            chunk_overlap=Config.PROCESSOR_CONFIG.chunk_overlap,
+            encoding_name=Config.ENCODING_NAME
+        )
+        cases = []
+        for i, path in enumerate(sorted(args.corpus.iterdir())):
+            try:
+                text = load_text(path)
+            except ImportError as e:
+                print(f"Skipping {path.name}: {e}")
+                continue
+            if not text.strip():
+                continue
+            vec = vector_db.scoped(f"bench_{i:03d}", create=True)
+            vec.add_documents(text)
+            stored = vec.get_documents()
+            sections = {}
+            for doc_id, metadata in zip(stored['ids'], stored['metadatas']):
+                sections.setdefault(metadata.get('section', ''), set()).add(doc_id)
+            for section, ids in sections.items():
+                query = heading_query(section)
+                if len(query) >= 4 and section != "Introduction":
+                    cases.append((vec, query, ids))
+
+        print(f"{len(cases)} section queries\n")
+        modes = [("vector", False), ("hybrid", False)]
+        if args.rerank:
+            modes.append(("hybrid", True))
+
+        print(f"{'mode':<16} {'recall@' + str(args.k):>9} {'MRR':>6} {'p50 ms':>8} {'p95 ms':>8}")
+        for mode, rerank in modes:
+            Config.RETRIEVAL_MODE = mode
+            Config.RERANK_ENABLED = rerank
+            hits_at_k, reciprocal_ranks, latencies = 0, [], []
+            for vec, query, relevant in cases:
+                start = time.perf_counter()
+                hits = vec._retrieve([query], args.k)[0]
+                latencies.append((time.perf_counter() - start) * 1000)
+                ranks = [rank for rank, hit in enumerate(hits, 1) if hit['id'] in relevant]
+                hits_at_k += bool(ranks)
+                reciprocal_ranks.append(1.0 / ranks[0] if ranks else 0.0)
+            latencies.sort()
+            label = f"{mode}{'+rerank' if rerank else ''}"
+            print(
+                f"{label:<16} {hits_at_k / len(cases):9.3f} {statistics.mean(reciprocal_ranks):6.3f} "
+                f"{statistics.median(latencies):8.2f} {latencies[int(len(latencies) * 0.95) - 1]:8.2f}"
+            )
+
+        AnalysisCache.shutdown()
+        VectorResources.shutdown()
+
+
+if __name__ == "__main__":
+    main()
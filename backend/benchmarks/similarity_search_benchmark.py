@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Measure corpus-wide similar-contract search against the fingerprint index.
+
+Fills a temporary fingerprint collection with random unit vectors and times
+top-k queries as the corpus grows. For small corpora it also times the old
+approach of querying one collection per contract.
+
+Usage (from the backend directory):
+    python -m benchmarks.similarity_search_benchmark [--sizes 1000 10000 50000]
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from contract_analyzer.config import Config
+from contract_analyzer.fingerprint_index import ContractFingerprintIndex
+from contract_analyzer.vector_resources import VectorResources
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark similar-contract search")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--dim", type=int, default=384, help="Embedding dimension")
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--per-collection-limit", type=int, default=200,
+                        help="Largest corpus to time with one query per collection")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as db_dir:
+        Config.CHROMA_DB_PATH = Path(db_dir)
+        client = VectorResources.get_client()
+        index = ContractFingerprintIndex()
+
+        print(f"{'contracts':>10} {'index query ms':>15} {'per-collection ms':>18}")
+        for size in sorted(args.sizes):
+            existing = index.count()
+            if size > existing:
+                vectors = rng.normal(size=(size - existing, args.dim)).astype(np.float32)
+                index.upsert_many(
+                    [f"contract_{i:06d}" for i in range(existing, size)],
+                    vectors.tolist(),
+                    [{'collection_name': f"contract_{i:06d}"} for i in range(existing, size)]
+                )
+
+            queries = rng.normal(size=(args.queries, args.dim)).astype(np.float32)
+            start = time.perf_counter()
+            for query in queries:
+                matches = index.query(query.tolist(), top_k=args.top_k)
+            index_ms = (time.perf_counter() - start) * 1000 / args.queries
+            assert len(matches) == min(args.top_k, size)
+
+            per_collection = f"{'skipped':>18}"
+            if size <= args.per_collection_limit:
+                collections = []
+                for i in range(size):
+                    collection = client.get_or_create_collection(name=f"per_contract_{i:06d}")
+                    collection.upsert(ids=["0"], embeddings=[rng.normal(size=args.dim).tolist()])
+                    collections.append(collection)
+                start = time.perf_counter()
+                for collection in collections:
+                    collection.query(query_embeddings=[queries[0].tolist()], n_results=1)
+                per_collection = f"{(time.perf_counter() - start) * 1000:18.1f}"
+
+            print(f"{size:>10} {index_ms:15.2f} {per_collection}")
+
+        VectorResources.shutdown()
+
+
+if __name__ == "__main__":
+    main()
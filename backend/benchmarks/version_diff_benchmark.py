@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Benchmark version comparison on long contracts.
+
+Builds a synthetic contract of ``--pages`` pages and a second version with
+a few edited, added and removed sections, stores both in a VersionStore
+and times ``ContractVersionManager.compare_versions`` cold and cached.
+
+``--legacy-pages`` runs the old character-level SequenceMatcher/ndiff
+comparison on a shorter contract for reference; it grows quadratically,
+so it is not run at full size.
+
+Usage (from the backend directory):
+    python -m benchmarks.version_diff_benchmark [--pages 500] [--edit-rate 0.02] [--legacy-pages 20]
+"""
+import argparse
+import difflib
+import random
+import tempfile
+import time
+from datetime import datetime
+
+from contract_analyzer.version_control import ContractVersion, ContractVersionManager
+from contract_analyzer.version_store import VersionStore
+
+LINES_PER_PAGE = 50
+LINES_PER_SECTION = 20
+WORDS = (
+    "party agreement shall provide services payment invoice days notice term "
+    "termination breach liability indemnify confidential information law court "
+    "consent assign obligation warranty material written period fees customer supplier"
+).split()
+
+
+def make_contract(pages: int, rng: random.Random) -> list:
+    """Sections as (header, lines)"""
+    sections = []
+    for index in range((pages * LINES_PER_PAGE) // (LINES_PER_SECTION + 1)):
+        header = f"SECTION {index + 1} {rng.choice(WORDS).upper()} TERMS"
+        lines = [
+            f"{index + 1}.{line + 1} " + " ".join(rng.choice(WORDS) for _ in range(12)) + "."
+            for line in range(LINES_PER_SECTION)
+        ]
+        sections.append((header, lines))
+    return sections
+
+
+def revise(sections: list, edit_rate: float, rng: random.Random) -> list:
+    """Edit a few lines in some sections, drop some and add new ones"""
+    revised = []
+    for header, lines in sections:
+        roll = rng.random()
+        if roll < edit_rate / 4:
+            continue
+        lines = list(lines)
+        if roll < edit_rate:
+            for _ in range(rng.randint(1, 3)):
+                line = rng.randrange(len(lines))
+                words = lines[line].split()
+                words[rng.randrange(1, len(words))] = rng.choice(WORDS).upper()
+                lines[line] = " ".join(words)
+        revised.append((header, lines))
+        if roll > 1 - edit_rate / 4:
+            revised.append((f"{header} ADDENDUM", [f"Added clause {rng.choice(WORDS)}."]))
+    return revised
+
+
+def render(sections: list) -> str:
+    return "\n".join(f"{header}\n" + "\n".join(lines) for header, lines in sections) + "\n"
+
+
+def legacy_compare(manager: ContractVersionManager, old: str, new: str) -> float:
+    """The previous ndiff + character-level SequenceMatcher comparison"""
+    for _ in difflib.ndiff(old.splitlines(keepends=True), new.splitlines(keepends=True)):
+        pass
+    old_sections = {s.name: s for s in manager._extract_sections(old)}
+    new_sections = {s.name: s for s in manager._extract_sections(new)}
+    for name in old_sections.keys() & new_sections.keys():
+        difflib.SequenceMatcher(None, old_sections[name].content, new_sections[name].content).ratio()
+    return difflib.SequenceMatcher(None, old, new).ratio()
+
+
+class StoreBackedVersions:
+    """The VersionDatabaseManager lookups compare_versions needs, without a vector DB"""
+
+    def __init__(self, store: VersionStore):
+        self.version_store = store
+
+    def get_contract_version(self, contract_id: str, version_number: int):
+        return self.version_store.load(contract_id, version_number)
+
+
+def store_version(manager: ContractVersionManager, store: VersionStore, number: int, content: str) -> None:
+    version = ContractVersion(
+        version_id=f"bench_v{number}",
+        content=content,
+        version_number=number,
+        timestamp=datetime.now().isoformat(),
+        author="benchmark",
+        changes={},
+        comments="",
+        status="draft",
+        previous_version=f"bench_v{number - 1}" if number > 1 else None
+    )
+    store.save("bench", number, content, manager._version_to_metadata(version))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark contract version comparison")
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--edit-rate", type=float, default=0.02,
+                        help="Fraction of sections edited (a quarter as many are added and removed)")
+    parser.add_argument("--legacy-pages", type=int, default=20,
+                        help="Contract length for the legacy comparison, 0 to skip")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    sections = make_contract(args.pages, rng)
+    old, new = render(sections), render(revise(sections, args.edit_rate, rng))
+
+    with tempfile.TemporaryDirectory() as store_dir:
+        store = VersionStore(store_dir)
+        manager = ContractVersionManager(StoreBackedVersions(store))
+        store_version(manager, store, 1, old)
+        store_version(manager, store, 2, new)
+
+        start = time.perf_counter()
+        diff = manager.compare_versions("bench", 1, 2)
+        cold = time.perf_counter() - start
+        start = time.perf_counter()
+        manager.compare_versions("bench", 1, 2)
+        cached = time.perf_counter() - start
+
+    print(f"contract:        {args.pages} pages, {len(old.splitlines())} lines, {len(old) / 1e6:.1f}M chars")
+    print(f"sections:        {len(sections)} ({len(diff.section_changes)} changed)")
+    print(f"lines +/-:       {len(diff.additions)} / {len(diff.deletions)}")
+    print(f"similarity:      {diff.similarity_score:.4f}")
+    print(f"compare cold:    {cold * 1000:.1f} ms")
+    print(f"compare cached:  {cached * 1000:.1f} ms (includes loading both versions)")
+
+    if args.legacy_pages:
+        rng = random.Random(args.seed)
+        small = make_contract(args.legacy_pages, rng)
+        small_old, small_new = render(small), render(revise(small, args.edit_rate, rng))
+        start = time.perf_counter()
+        legacy_compare(manager, small_old, small_new)
+        legacy = time.perf_counter() - start
+        start = time.perf_counter()
+        manager.diff_engine.compare(small_old, small_new)
+        engine = time.perf_counter() - start
+        print(f"legacy at {args.legacy_pages} pages: {legacy * 1000:.1f} ms (section engine {engine * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
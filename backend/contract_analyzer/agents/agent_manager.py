@@ -7,6 +7,7 @@ from enum import Enum
 from phi.agent import Agent
 from ..config import Config, ModelType
 from ..error_handler import handle_errors, ErrorCategory
+from .response_cache import MemoizedAgent
 
 logger = logging.getLogger(__name__)
 
@@ -54,6 +55,9 @@ class AgentManager:
             template_name: Name of template to use
             custom_instructions: Optional additional instructions
             model_type: Optional specific model to use
+
+        Agents answer repeated prompts from the LLM response cache, see
+        MemoizedAgent.
         """
         try:
             template = self._templates.get(template_name)
@@ -63,8 +67,8 @@ class AgentManager:
             if not template:
                 raise ValueError(f"Template {template_name} not found")
 
-            # Get instructions
-            instructions = template.instructions
+            # Get instructions, without adding custom ones to the template
+            instructions = list(template.instructions)
             if custom_instructions:
                 instructions.extend(custom_instructions)
 
@@ -73,7 +77,7 @@ class AgentManager:
             model = Config.get_model_instance(model_type)
 
             # Create agent
-            agent = Agent(
+            agent = MemoizedAgent(
                 name=template.name,
                 role=template.role.value,
                 instructions=instructions,
@@ -0,0 +1,256 @@
+# prompt_executor.py
+from typing import Dict, Optional, Callable, Any
+from concurrent.futures import ThreadPoolExecutor, Future, FIRST_COMPLETED, wait
+from contextvars import copy_context
+from dataclasses import dataclass, field
+from threading import Event
+import logging
+import time
+from phi.agent import Agent
+
+from ..config import Config
+from ..error_handler import AgentError
+from ..jobs import StageLimiter
+
+logger = logging.getLogger(__name__)
+
+
+def run_agent(
+    agent: Agent,
+    prompt: str,
+    on_token: Optional[Callable[[str], None]] = None,
+    cancelled: Optional[Event] = None
+) -> Any:
+    """
+    Run a prompt on an agent, optionally streaming its output
+
+    Args:
+        agent: Agent to run
+        prompt: Prompt text
+        on_token: Called with each piece of text as the model generates it;
+            when given, the model runs in streaming mode
+        cancelled: When given, the model runs in streaming mode and the
+            run stops at the next piece of text once the event is set
+
+    Returns:
+        The agent's response; when streamed, its content is the full text
+
+    Raises:
+        TimeoutError: The run was cancelled
+    """
+    if on_token is None and cancelled is None:
+        return agent.run(prompt)
+
+    parts = []
+    stream = agent.run(prompt, stream=True)
+    try:
+        for chunk in stream:
+            if cancelled is not None and cancelled.is_set():
+                raise TimeoutError("Prompt cancelled")
+            delta = getattr(chunk, "content", chunk)
+            if not isinstance(delta, str) or not delta:
+                continue
+            parts.append(delta)
+            if on_token is None:
+                continue
+            try:
+                on_token(delta)
+            except Exception as e:
+                logger.error(f"Token callback failed: {str(e)}")
+    finally:
+        # Closing the generator ends the request to the model server
+        close = getattr(stream, "close", None)
+        if close is not None:
+            close()
+
+    # The streamed chunks only carry deltas, keep the whole answer on the response
+    response = agent.run_response
+    response.content = "".join(parts)
+    return response
+
+
+@dataclass
+class _Attempt:
+    """One attempt at a prompt, shared with the worker running it"""
+    name: str
+    number: int
+    # Set by the worker once it holds an llm slot; the timeout runs from here
+    started_at: Optional[float] = None
+    # Set when the attempt timed out; the worker stops at its next token
+    abandoned: Event = field(default_factory=Event)
+
+
+class PromptExecutor:
+    """
+    Dispatches independent prompts concurrently.
+
+    Each prompt runs on its own agent from ``agent_factory`` so runs don't
+    share agent state. Every call also holds a slot of the process-wide
+    "llm" stage, so the total number of in-flight requests stays within the
+    Ollama server's ``OLLAMA_NUM_PARALLEL`` across all analyses.
+
+    An attempt's timeout starts once it holds its llm slot, so time spent
+    queued behind other prompts doesn't count. A timed-out attempt is
+    streamed and stops at its next token; its retry is only submitted once
+    it has stopped, so the two never compete for a slot.
+    """
+
+    # How often to check whether queued attempts have started
+    START_POLL_SECONDS = 0.5
+
+    def __init__(
+        self,
+        agent_factory: Callable[[], Optional[Agent]],
+        max_parallel: Optional[int] = None,
+        timeout: Optional[float] = None,
+        retries: int = 0,
+        on_token: Optional[Callable[[str, str, int], None]] = None
+    ):
+        """
+        Args:
+            agent_factory: Creates a fresh agent for each prompt attempt
+            max_parallel: Maximum prompts in flight (defaults to the llm stage limit)
+            timeout: Seconds an attempt may run, once it holds an llm slot,
+                before giving up on it
+            retries: Extra attempts after a failure or timeout
+            on_token: Streams the models' output; called with (task name,
+                text, attempt number) as each task generates it. A retried
+                task streams again under the next attempt number; text of
+                an attempt that timed out is dropped
+        """
+        self.agent_factory = agent_factory
+        self.max_parallel = max_parallel or Config.JOB_CONFIG.stage_limits.get("llm", 1)
+        self.timeout = timeout
+        self.retries = retries
+        self.on_token = on_token
+
+    def run_all(
+        self,
+        prompts: Dict[str, str],
+        on_complete: Optional[Callable[[str, Any], None]] = None,
+        raise_errors: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Run all prompts and return their responses.
+
+        Args:
+            prompts: Mapping of task name to prompt text
+            on_complete: Called with (name, response) as each task finishes
+            raise_errors: Raise the last error of a task that exhausted its
+                attempts; otherwise its response is None
+
+        Returns:
+            Mapping of task name to agent response, in the order of ``prompts``
+        """
+        if not prompts:
+            return {}
+
+        workers = max(1, min(self.max_parallel, len(prompts)))
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prompt")
+        results: Dict[str, Any] = {}
+        errors: Dict[str, Exception] = {}
+        attempts = {name: 0 for name in prompts}
+        pending: Dict[Future, _Attempt] = {}
+
+        def submit(name: str) -> None:
+            attempts[name] += 1
+            attempt = _Attempt(name=name, number=attempts[name])
+            # Run in a copy of the caller's context so flags like
+            # LLMResponseCache.refresh() apply to the prompt
+            future = executor.submit(copy_context().run, self._run_prompt, attempt, prompts[name])
+            pending[future] = attempt
+
+        def finish(name: str, response: Any) -> None:
+            results[name] = response
+            if on_complete:
+                try:
+                    on_complete(name, response)
+                except Exception as e:
+                    logger.error(f"Completion callback failed for {name}: {str(e)}")
+
+        def fail(name: str, error: Exception) -> None:
+            if attempts[name] <= self.retries:
+                logger.warning(f"Retrying prompt {name} after error: {str(error)}")
+                submit(name)
+            else:
+                errors[name] = error
+                finish(name, None)
+
+        def timed_out(name: str) -> TimeoutError:
+            return TimeoutError(f"Prompt {name} timed out after {self.timeout}s")
+
+        try:
+            for name in prompts:
+                submit(name)
+
+            while pending:
+                wait_timeout = None
+                if self.timeout:
+                    now = time.monotonic()
+                    waits = [
+                        attempt.started_at + self.timeout - now
+                        for attempt in pending.values()
+                        if attempt.started_at is not None and not attempt.abandoned.is_set()
+                    ]
+                    if any(attempt.started_at is None for attempt in pending.values()):
+                        waits.append(self.START_POLL_SECONDS)
+                    if waits:
+                        wait_timeout = max(0.0, min(waits))
+                done, _ = wait(pending, timeout=wait_timeout, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    attempt = pending.pop(future)
+                    try:
+                        # A timed-out attempt that still finished has a complete answer
+                        finish(attempt.name, future.result())
+                    except Exception as e:
+                        fail(attempt.name, timed_out(attempt.name) if attempt.abandoned.is_set() else e)
+
+                if not self.timeout:
+                    continue
+                now = time.monotonic()
+                for future, attempt in list(pending.items()):
+                    if (
+                        attempt.started_at is None
+                        or attempt.abandoned.is_set()
+                        or attempt.started_at + self.timeout > now
+                    ):
+                        continue
+                    attempt.abandoned.set()
+                    if attempts[attempt.name] > self.retries:
+                        # Out of attempts, don't wait for the worker to stop
+                        del pending[future]
+                        errors[attempt.name] = timed_out(attempt.name)
+                        finish(attempt.name, None)
+                    else:
+                        # Retried once the worker has stopped (see above)
+                        logger.warning(f"Prompt {attempt.name} timed out, stopping it before retrying")
+        finally:
+            executor.shutdown(wait=False)
+
+        if errors and raise_errors:
+            raise next(iter(errors.values()))
+
+        return {name: results.get(name) for name in prompts}
+
+    def _run_prompt(self, attempt: _Attempt, prompt: str) -> Any:
+        name = attempt.name
+        agent = self.agent_factory()
+        if agent is None:
+            raise AgentError(f"Agent creation failed for task: {name}")
+
+        on_token = None
+        if self.on_token is not None:
+            def on_token(delta: str) -> None:
+                if not attempt.abandoned.is_set():
+                    self.on_token(name, delta, attempt.number)
+
+        with StageLimiter.limit("llm"):
+            attempt.started_at = time.monotonic()
+            logger.info(f"Running prompt: {name} (attempt {attempt.number})")
+            return run_agent(
+                agent,
+                prompt,
+                on_token=on_token,
+                cancelled=attempt.abandoned if self.timeout else None
+            )
@@ -0,0 +1,184 @@
+# response_cache.py
+from typing import Dict, Any, Optional, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+import hashlib
+import json
+import logging
+
+from phi.agent import Agent, RunResponse
+
+from ..config import Config
+from ..disk_cache import DiskCache
+
+logger = logging.getLogger(__name__)
+
+# Set while a caller wants fresh answers, e.g. a refreshed analysis
+_refreshing: ContextVar[bool] = ContextVar("llm_response_cache_refreshing", default=False)
+
+
+class LLMResponseCache:
+    """
+    Process-wide persistent store of agent responses.
+
+    Responses are kept in a DiskCache at ``Config.LLM_RESPONSE_CACHE_PATH``,
+    bounded by ``LLM_RESPONSE_CACHE_MB`` with least-recently-used eviction.
+    Keys cover everything that shapes the answer: model id and options,
+    the agent's name, role, description and instructions, and the prompt.
+
+    A sampled answer is one draw among many, so the cache is only used in
+    deterministic mode (``Config.LLM_DETERMINISTIC``). Inside ``refresh()``
+    cached answers are ignored and replaced by the new ones; the flag is a
+    context variable, so it follows work handed to threads started with a
+    copy of the context (see PromptExecutor).
+    """
+
+    _lock = Lock()
+    _store: Optional[DiskCache] = None
+    hits = 0
+    misses = 0
+
+    @classmethod
+    def _get_store(cls) -> Optional[DiskCache]:
+        if not Config.LLM_RESPONSE_CACHE_PATH:
+            return None
+        with cls._lock:
+            if cls._store is None:
+                cls._store = DiskCache(
+                    Config.LLM_RESPONSE_CACHE_PATH,
+                    max_size_bytes=Config.LLM_RESPONSE_CACHE_MB * 1024 * 1024
+                )
+            return cls._store
+
+    @staticmethod
+    def make_key(agent: Agent, prompt: str) -> str:
+        """Cache key of a prompt sent to an agent"""
+        model = agent.model
+        material = {
+            'model': getattr(model, 'id', None),
+            'options': getattr(model, 'options', None) or {},
+            'name': agent.name,
+            'role': agent.role,
+            'description': agent.description,
+            'instructions': agent.instructions,
+            'prompt': prompt
+        }
+        blob = json.dumps(material, sort_keys=True, default=str)
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def enabled(cls) -> bool:
+        return bool(Config.LLM_RESPONSE_CACHE_PATH) and Config.LLM_DETERMINISTIC
+
+    @staticmethod
+    @contextmanager
+    def refresh():
+        """Skip cached answers for runs in this context, storing the new ones"""
+        token = _refreshing.set(True)
+        try:
+            yield
+        finally:
+            _refreshing.reset(token)
+
+    @staticmethod
+    def refreshing() -> bool:
+        return _refreshing.get()
+
+    @classmethod
+    def get(cls, key: str) -> Optional[str]:
+        """Cached response text, or None"""
+        store = cls._get_store()
+        if store is None:
+            return None
+        try:
+            blob = store.get(key)
+        except Exception as e:
+            logger.error(f"Failed to read cached response: {str(e)}")
+            blob = None
+        with cls._lock:
+            if blob is None:
+                cls.misses += 1
+                return None
+            cls.hits += 1
+        return blob.decode("utf-8")
+
+    @classmethod
+    def set(cls, key: str, content: str) -> None:
+        store = cls._get_store()
+        if store is None or not content:
+            return
+        try:
+            store.set(key, content.encode("utf-8"))
+        except Exception as e:
+            logger.error(f"Failed to cache response: {str(e)}")
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        store = cls._get_store()
+        with cls._lock:
+            lookups = cls.hits + cls.misses
+            stats = {
+                'hits': cls.hits,
+                'misses': cls.misses,
+                'hit_rate': round(cls.hits / lookups, 3) if lookups else 0.0,
+                'enabled': cls.enabled(),
+                'deterministic': Config.LLM_DETERMINISTIC
+            }
+        if store is not None:
+            stats.update(store.stats())
+        return stats
+
+    @classmethod
+    def clear(cls) -> None:
+        store = cls._get_store()
+        if store is not None:
+            store.clear()
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """Close the store; it is reopened on next use"""
+        with cls._lock:
+            if cls._store is not None:
+                cls._store.close()
+                cls._store = None
+
+
+class MemoizedAgent(Agent):
+    """
+    Agent whose text prompts are answered from LLMResponseCache when the
+    same model, options and instructions have answered them before, in
+    deterministic mode only.
+
+    Only plain ``run(prompt)`` calls, streamed or not, are memoized; calls
+    with images, message lists or other run options go to the model.
+    A cached answer is streamed back as a single chunk.
+    """
+
+    def run(self, message: Optional[Any] = None, *, stream: bool = False, **kwargs: Any):
+        if kwargs or not isinstance(message, str) or not LLMResponseCache.enabled():
+            return super().run(message, stream=stream, **kwargs)
+
+        key = LLMResponseCache.make_key(self, message)
+        content = None if LLMResponseCache.refreshing() else LLMResponseCache.get(key)
+        if content is not None:
+            logger.info(f"Using cached response for {self.name}")
+            self.run_response = RunResponse(content=content, model=getattr(self.model, 'id', None))
+            return iter([self.run_response]) if stream else self.run_response
+
+        if stream:
+            return self._run_stream_and_cache(key, message)
+
+        response = super().run(message, stream=False)
+        if response is not None and isinstance(response.content, str):
+            LLMResponseCache.set(key, response.content)
+        return response
+
+    def _run_stream_and_cache(self, key: str, message: str) -> Iterator[RunResponse]:
+        parts = []
+        for chunk in super().run(message, stream=True):
+            if isinstance(chunk.content, str):
+                parts.append(chunk.content)
+            yield chunk
+        # Only a stream read to the end is a complete answer
+        LLMResponseCache.set(key, "".join(parts))
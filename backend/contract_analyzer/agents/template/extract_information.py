@@ -1,17 +1,37 @@
 import re
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Callable
 from dataclasses import dataclass
 from datetime import datetime
 from tqdm.auto import tqdm
 import pandas as pd
 import json
 
+from ..prompt_executor import PromptExecutor
+from ...config import Config
+from ...tokens import count_tokens, truncate_to_tokens
+
 
 class ExtractionProcessor:
     """Enhanced processor for contract information extraction with section tracking"""
 
-    def __init__(self):
+    # Chunks retrieved per field group before packing into the token budget
+    RETRIEVAL_RESULTS = 8
+    # Groups whose fields live in the preamble and use the document head
+    PREAMBLE_GROUPS = {"Contract Metadata"}
+
+    def __init__(
+        self,
+        max_parallel: Optional[int] = None,
+        group_timeout: Optional[float] = 300.0,
+        group_retries: int = 1,
+        context_window: Optional[int] = None,
+    ):
         self.results = []
+        self.max_parallel = max_parallel
+        self.group_timeout = group_timeout
+        self.group_retries = group_retries
+        self.context_window = context_window or Config.MODEL_CONTEXT_TOKENS
+        self.prompt_stats: Dict[str, Dict[str, Any]] = {}
         self.contract_sections = {
             "Contract Metadata": [
                 "Contract Name",
@@ -169,20 +189,113 @@ class ExtractionProcessor:
             list(self.extraction_types.items()), columns=["Term", "Terms"]
         )
 
-    def process_extractions(self, content, vec, agent) -> None:
-        """Process all extractions"""
+    def process_extractions(
+        self,
+        content,
+        vec,
+        agent,
+        agent_factory: Optional[Callable[[], Any]] = None,
+        on_group_complete: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+        on_token: Optional[Callable[[str, str, int], None]] = None,
+    ) -> None:
+        """
+        Process all extractions
+
+        Field groups are dispatched concurrently when ``agent_factory`` is
+        given (one agent per group, ``agent`` may then be None); a single
+        shared ``agent`` runs them one at a time. ``on_group_complete`` receives each group's parsed fields
+        as soon as it finishes, and ``on_token`` each group's raw model
+        output as it is generated. Results are stored in group order once
+        all groups are done.
+        """
+        contexts = self._retrieve_group_contexts(vec)
+        prompts = {}
         for key, value in self.contract_sections.items():
-            if key == "Contract Metadata":
-                context = content[:3000]
-            else:
-                context = content
+            prompts[key] = self._build_group_prompt(key, value, content, contexts.get(key))
+
+        executor = PromptExecutor(
+            agent_factory or (lambda: agent),
+            max_parallel=self.max_parallel if agent_factory else 1,
+            timeout=self.group_timeout,
+            retries=self.group_retries,
+            on_token=on_token,
+        )
 
-            response = agent.run(self._build_extraction_prompt(context, value))
-            self._store_result([response.content])
+        parsed_groups: Dict[str, Dict[str, str]] = {}
 
-            # break
+        def group_complete(key: str, response: Any) -> None:
+            parsed_groups[key] = (
+                self._parse_response([response.content]) if response else {}
+            )
+            if on_group_complete:
+                on_group_complete(key, parsed_groups[key])
+
+        executor.run_all(prompts, on_complete=group_complete, raise_errors=False)
+
+        for key, value in self.contract_sections.items():
+            self._store_parsed(parsed_groups.get(key, {}))
             self.check_results(value)
 
+    def _retrieve_group_contexts(self, vec) -> Dict[str, Optional[str]]:
+        """
+        Retrieve every group's context in one batched vector DB call.
+
+        Each group is queried with its name and field names and its chunks
+        are packed into the group's token budget; groups in
+        ``PREAMBLE_GROUPS`` use the document head instead.
+        """
+        queries = {
+            group: f"{group}: " + ", ".join(field.strip() for field in fields)
+            for group, fields in self.contract_sections.items()
+            if group not in self.PREAMBLE_GROUPS
+        }
+        if vec is None or not queries:
+            return {}
+        contexts = vec.get_contexts(
+            list(queries.values()),
+            n_results=self.RETRIEVAL_RESULTS,
+            max_tokens=[self._context_budget(self.contract_sections[group]) for group in queries],
+        )
+        for group, stats in zip(queries, getattr(vec, "last_context_stats", [])):
+            self.prompt_stats[group] = {"retrieval": stats.to_dict()}
+        return dict(zip(queries, contexts))
+
+    def _context_budget(self, fields: List) -> int:
+        """Tokens left for context once the template and response reserve fit"""
+        available = (
+            self.context_window
+            - Config.RESPONSE_TOKEN_RESERVE
+            - count_tokens(self._build_extraction_prompt("", fields))
+        )
+        return max(0, min(Config.CONTEXT_TOKEN_BUDGETS.get("extraction", available), available))
+
+    def _build_group_prompt(
+        self, group: str, fields: List, content: str, context: Optional[str]
+    ) -> str:
+        """
+        Build a group's prompt from the chunks relevant to its fields.
+
+        Retrieved context already fits the group's token budget; the
+        document head (preamble groups) or full text (retrieval fallback)
+        is truncated to it.
+        """
+        budget = self._context_budget(fields)
+
+        if group in self.PREAMBLE_GROUPS:
+            context = content[:3000]
+
+        if not context:
+            context = content
+
+        context = truncate_to_tokens(context, budget)
+        prompt = self._build_extraction_prompt(context, fields)
+        self.prompt_stats.setdefault(group, {}).update({
+            "prompt_tokens": count_tokens(prompt),
+            "context_tokens": count_tokens(context),
+            "context_budget": budget,
+        })
+        return prompt
+
     def _build_extraction_prompt(self, context: str, value: List) -> str:
         """Build extraction prompt"""
         return f"""From the following text {context}
@@ -248,8 +361,10 @@ class ExtractionProcessor:
 
     def _store_result(self, response: Any) -> None:
         """Store extraction result with section information"""
-        parsed_response = self._parse_response(response)
+        self._store_parsed(self._parse_response(response))
 
+    def _store_parsed(self, parsed_response: Dict[str, Any]) -> None:
+        """Store already parsed extraction fields"""
         for key, value in parsed_response.items():
             if value == None or value == "":
                 value = "Not Found"
@@ -0,0 +1,151 @@
+# analysis_cache.py
+from typing import List, Dict, Any, Optional
+from dataclasses import dataclass
+from threading import Lock
+import hashlib
+import json
+import logging
+import time
+
+from .config import Config
+from .disk_cache import DiskCache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedAnalysis:
+    """An analysis result read from the cache"""
+    result: Dict[str, Any]
+    created_at: float
+
+    @property
+    def age_seconds(self) -> float:
+        return max(0.0, time.time() - self.created_at)
+
+
+class AnalysisCache:
+    """
+    Process-wide persistent cache of analysis results.
+
+    Results are stored in a DiskCache at ``Config.ANALYSIS_CACHE_PATH``,
+    bounded by size with LRU eviction and expiring after
+    ``DatabaseConfig.cache_ttl_minutes``. Entries are tagged with their
+    collection, so re-ingesting or deleting a collection drops every
+    analysis of it with ``invalidate``.
+    """
+
+    _lock = Lock()
+    _store: Optional[DiskCache] = None
+
+    @classmethod
+    def _get_store(cls) -> Optional[DiskCache]:
+        if not Config.ANALYSIS_CACHE_PATH:
+            return None
+        with cls._lock:
+            if cls._store is None:
+                cls._store = DiskCache(
+                    Config.ANALYSIS_CACHE_PATH,
+                    max_size_bytes=Config.ANALYSIS_CACHE_MB * 1024 * 1024,
+                    default_ttl_seconds=Config.DATABASE_CONFIG.cache_ttl_minutes * 60
+                )
+            return cls._store
+
+    @staticmethod
+    def collection_tag(collection_name: str) -> str:
+        """Tag of a collection's entries; matches VectorDB's sanitized names"""
+        return "".join(c if c.isalnum() else "_" for c in collection_name)
+
+    @staticmethod
+    def make_key(
+        collection_name: Optional[str],
+        analysis_type: str,
+        model_type: str,
+        custom_query: Optional[str],
+        content: str,
+        prompts: List[str]
+    ) -> str:
+        """
+        Cache key of one analysis
+
+        Args:
+            collection_name: Collection the analysis retrieves from
+            analysis_type: Analysis type, e.g. "Contract Summary"
+            model_type: Model the analysis runs on
+            custom_query: Query of a custom analysis
+            content: Document content sent with the request
+            prompts: The analysis' prompt templates, so editing a template
+                invalidates its cached results
+
+        Returns:
+            Hex digest
+        """
+        digest = hashlib.sha256()
+        for part in (
+            collection_name or "",
+            analysis_type,
+            model_type,
+            " ".join((custom_query or "").split()),
+            hashlib.sha256(content.encode("utf-8")).hexdigest(),
+            *(hashlib.sha256(prompt.encode("utf-8")).hexdigest() for prompt in prompts)
+        ):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    @classmethod
+    def get(cls, key: str) -> Optional[CachedAnalysis]:
+        """Cached result, or None if missing or expired"""
+        store = cls._get_store()
+        if store is None:
+            return None
+        try:
+            blob = store.get(key)
+            if blob is None:
+                return None
+            entry = json.loads(blob.decode("utf-8"))
+            return CachedAnalysis(result=entry['result'], created_at=entry['created_at'])
+        except Exception as e:
+            logger.error(f"Failed to read cached analysis: {str(e)}")
+            return None
+
+    @classmethod
+    def set(cls, key: str, collection_name: Optional[str], result: Dict[str, Any]) -> None:
+        """Store a result, tagged with its collection"""
+        store = cls._get_store()
+        if store is None:
+            return
+        try:
+            blob = json.dumps({'result': result, 'created_at': time.time()}).encode("utf-8")
+            tag = cls.collection_tag(collection_name) if collection_name else None
+            store.set(key, blob, tag=tag)
+        except Exception as e:
+            logger.error(f"Failed to cache analysis: {str(e)}")
+
+    @classmethod
+    def invalidate(cls, collection_name: str) -> int:
+        """Drop every cached analysis of a collection"""
+        store = cls._get_store()
+        if store is None:
+            return 0
+        try:
+            removed = store.delete_tag(cls.collection_tag(collection_name))
+        except Exception as e:
+            logger.error(f"Failed to invalidate cached analyses: {str(e)}")
+            return 0
+        if removed:
+            logger.info(f"Invalidated {removed} cached analyses of {collection_name}")
+        return removed
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        store = cls._get_store()
+        return store.stats() if store is not None else {'entries': 0, 'size_bytes': 0}
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """Close the store; it is reopened on next use"""
+        with cls._lock:
+            if cls._store is not None:
+                cls._store.close()
+                cls._store = None
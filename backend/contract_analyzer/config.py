@@ -7,6 +7,7 @@ import datetime
 from typing import Dict, List, Optional, Any, Set
 import gc
 import logging
+import os
 
 
 @dataclass
@@ -51,11 +52,25 @@ class ProcessorConfig:
     ocr_enabled: bool = True
     language: str = "en"
     dpi: int = 300
+    parallel_ocr: bool = False
+    ocr_workers: int = 2
+    ocr_queue_size: int = 4
+    # Parallel OCR workers run on the CPU; with the GPU there is one worker
+    parallel_ocr_use_gpu: bool = False
+    ocr_engine_cache_size: int = 2
+    warm_up_ocr: bool = True
     extract_images: bool = True
     max_workers: int = 4
     batch_size: int = 100
-    chunk_size: int = 2048
-    chunk_overlap: int = 50
+    # Tokens per vector DB chunk; all-MiniLM-L6-v2 only embeds the first 256
+    chunk_size: int = 256
+    chunk_overlap: int = 32
+    extraction_cache_enabled: bool = True
+    extraction_cache_dir: Path = Path("./extraction_cache")
+    extraction_cache_max_mb: int = 512
+    # Uploads are streamed to a per-request directory here in chunks of this size
+    upload_spool_dir: Path = Path("./upload_spool")
+    upload_chunk_size: int = 1024 * 1024
     save_processed_files: bool = True
     save_processed_files_dir: Path = Path(
         r"/home/ajay/LLM-Agents/server/python/processed_files"
@@ -84,11 +99,36 @@ class DatabaseConfig:
     cache_ttl_minutes: int = 30
 
 
+@dataclass
+class JobConfig:
+    """Configuration for background jobs"""
+
+    max_workers: int = 4
+    job_ttl_minutes: int = 60
+    stage_limits: Dict[str, int] = field(
+        default_factory=lambda: {
+            "ocr": 1,
+            "embedding": 2,
+            "llm": int(os.environ.get("OLLAMA_NUM_PARALLEL", 4)),
+        }
+    )
+
+
 class Config:
     """Central configuration management"""
 
     # Database configuration
     CHROMA_DB_PATH = Path("./chroma_db")
+    # Resolved collection handles kept per process (one per contract)
+    COLLECTION_HANDLE_CACHE_SIZE = 4096
+    # Version texts and metadata, one directory per contract
+    VERSION_STORE_DIR = Path("./version_store")
+    # Version comparisons kept per process, keyed by (version id, version id)
+    VERSION_DIFF_CACHE_SIZE = 256
+    # Shared collection holding one fingerprint vector per contract
+    FINGERPRINT_COLLECTION = "contract_fingerprints"
+    # Fingerprint collections without one in the background at startup
+    FINGERPRINT_BACKFILL_ON_STARTUP = True
     COLLECTION_NAME = f"legal_docs_{datetime.datetime.now().timestamp()}"
 
     # Embedding configuration
@@ -96,6 +136,63 @@ class Config:
     # EMBEDDING_MODEL = r"billatsectorflow/stella_en_400M_v5"
     ENCODING_NAME = "cl100k_base"
 
+    # Model used to embed vector DB chunks and queries
+    VECTOR_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+    EMBEDDING_BATCH_SIZE = 64
+    # None lets sentence-transformers pick cuda when available
+    EMBEDDING_DEVICE: Optional[str] = os.environ.get("EMBEDDING_DEVICE")
+
+    # Query embedding cache shared by all VectorDB instances; set the path
+    # to also persist embeddings across restarts
+    QUERY_EMBEDDING_CACHE_MB = 64
+    QUERY_EMBEDDING_CACHE_PATH: Optional[Path] = Path("./cache/query_embeddings.sqlite")
+    QUERY_EMBEDDING_DISK_CACHE_MB = 256
+
+    # Analysis results, expiring after DATABASE_CONFIG.cache_ttl_minutes;
+    # set the path to None to disable
+    ANALYSIS_CACHE_PATH: Optional[Path] = Path("./cache/analysis_results.sqlite")
+    ANALYSIS_CACHE_MB = 64
+
+    # Agent responses memoized per model, options, instructions and prompt,
+    # only in deterministic mode; set the path to None to disable
+    LLM_RESPONSE_CACHE_PATH: Optional[Path] = Path("./cache/llm_responses.sqlite")
+    LLM_RESPONSE_CACHE_MB = 128
+    # Sampling options passed to Ollama. Deterministic mode decodes greedily
+    # with a fixed seed, so a memoized response is the one the model would
+    # give again; sampled responses are never memoized
+    LLM_TEMPERATURE = 0.9
+    LLM_DETERMINISTIC = os.environ.get("LLM_DETERMINISTIC", "false").lower() == "true"
+    LLM_SEED = 42
+
+    # Retrieval: "hybrid" fuses BM25 and vector hits, "vector" is dense only
+    RETRIEVAL_MODE = os.environ.get("RETRIEVAL_MODE", "hybrid")
+    # Per-collection BM25 indexes, defaults to <CHROMA_DB_PATH>/bm25
+    BM25_INDEX_DIR: Optional[Path] = None
+    BM25_INDEX_CACHE_SIZE = 256
+    # Candidates taken from each retriever before fusion
+    HYBRID_CANDIDATES = 20
+    RRF_K = 60
+    # Optional CPU cross-encoder applied to the fused candidates
+    RERANK_ENABLED = os.environ.get("RERANK_ENABLED", "false").lower() == "true"
+    RERANK_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    RERANK_CANDIDATES = 20
+
+    # Context window passed to Ollama as num_ctx
+    MODEL_CONTEXT_TOKENS = 4096
+    # Tokens of the context window left for the model's answer
+    RESPONSE_TOKEN_RESERVE = 1024
+    # Retrieved-context token budget per prompt template; each is further
+    # capped so template + context + response reserve fit num_ctx
+    CONTEXT_TOKEN_BUDGETS: Dict[str, int] = {
+        "default": 2048,
+        "contract_review": 1536,
+        "key_terms": 1536,
+        "obligations": 1536,
+        "parties": 1536,
+        "custom": 2048,
+        "extraction": 2048,
+    }
+
     # Model management
     _current_model: Optional[ModelConfig] = None
     _current_model_type: ModelType = ModelType.LLAMA_3_1
@@ -121,6 +218,9 @@ class Config:
     # Database configuration
     DATABASE_CONFIG = DatabaseConfig()
 
+    # Background job configuration
+    JOB_CONFIG = JobConfig()
+
     # Available models configuration
     AVAILABLE_MODELS = {
         ModelType.LLAMA_3_2_VISION: ModelConfig(
@@ -217,8 +317,19 @@ class Config:
             cls._model_instances[model_type] = cls._create_model_instance(config)
         return cls._model_instances[model_type]
 
-    @staticmethod
-    def _create_model_instance(config: ModelConfig) -> Any:
+    @classmethod
+    def model_options(cls) -> Dict[str, Any]:
+        """Ollama generation options for new model instances"""
+        options = {
+            "temperature": cls.LLM_TEMPERATURE,
+            "num_ctx": cls.MODEL_CONTEXT_TOKENS,
+        }
+        if cls.LLM_DETERMINISTIC:
+            options.update({"temperature": 0.0, "seed": cls.LLM_SEED})
+        return options
+
+    @classmethod
+    def _create_model_instance(cls, config: ModelConfig) -> Any:
         """Create new model instance using Ollama"""
         from phi.model.ollama import Ollama
 
@@ -226,10 +337,7 @@ class Config:
         
         return Ollama(
             id=config.name.lower(),
-            config={
-                "temperature": 0.9,
-                "num_ctx": 4096,
-            },
+            options=cls.model_options(),
         )
 
     @staticmethod
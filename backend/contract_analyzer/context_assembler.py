@@ -0,0 +1,146 @@
+# context_assembler.py
+from typing import List, Dict, Any, Optional, Tuple
+from dataclasses import dataclass
+import logging
+
+from .config import Config
+from .tokens import count_tokens, truncate_to_tokens
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AssembledContext:
+    """Context packed into a token budget"""
+    text: str
+    tokens: int
+    budget: int
+    chunks_used: int
+    chunks_dropped: int
+
+    @property
+    def budget_used(self) -> float:
+        return self.tokens / self.budget if self.budget else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'tokens': self.tokens,
+            'budget': self.budget,
+            'budget_used': round(self.budget_used, 3),
+            'chunks_used': self.chunks_used,
+            'chunks_dropped': self.chunks_dropped
+        }
+
+
+def context_budget(template: str, name: Optional[str] = None) -> int:
+    """
+    Tokens left for retrieved context in a prompt
+
+    Args:
+        template: The prompt rendered with empty context
+        name: Template name looked up in Config.CONTEXT_TOKEN_BUDGETS
+
+    Returns:
+        The template's configured budget, capped so template, context and the
+        response reserve fit the model context window
+    """
+    configured = Config.CONTEXT_TOKEN_BUDGETS.get(name, Config.CONTEXT_TOKEN_BUDGETS['default'])
+    available = Config.MODEL_CONTEXT_TOKENS - Config.RESPONSE_TOKEN_RESERVE - count_tokens(template)
+    return max(0, min(configured, available))
+
+
+class ContextAssembler:
+    """
+    Packs retrieved chunks into a token budget.
+
+    Chunks are taken best-scoring first while they fit, then put back in
+    document order. Neighbouring chunks that share overlap text (the
+    chunker carries a few tokens between chunks) are trimmed so the
+    overlap is only sent once.
+    """
+
+    SEPARATOR = "\n...\n"
+    # Smallest remainder worth filling with a truncated chunk
+    MIN_PARTIAL_TOKENS = 64
+
+    def __init__(self, budget: int):
+        self.budget = budget
+        self.separator_tokens = count_tokens(self.SEPARATOR)
+
+    def assemble(self, hits: List[Dict[str, Any]]) -> AssembledContext:
+        """
+        Build a context from retrieval hits
+
+        Args:
+            hits: Hits with document and metadata, best first
+
+        Returns:
+            The assembled context and its budget usage
+        """
+        selected: List[Tuple[Dict[str, Any], str]] = []
+        seen = set()
+        used = 0
+        for hit in hits:
+            text = hit['document']
+            if not text or text in seen:
+                continue
+            seen.add(text)
+            cost = count_tokens(text) + (self.separator_tokens if selected else 0)
+            remaining = self.budget - used
+            if cost > remaining:
+                # Keep looking for a smaller chunk, or fill a useful remainder
+                if remaining - self.separator_tokens < self.MIN_PARTIAL_TOKENS:
+                    continue
+                text = truncate_to_tokens(text, remaining - (self.separator_tokens if selected else 0))
+                cost = remaining
+            selected.append((hit, text))
+            used += cost
+
+        ordered = sorted(selected, key=lambda item: self._position(item[0]))
+        pieces: List[str] = []
+        previous: Optional[Tuple[Dict[str, Any], str]] = None
+        for hit, text in ordered:
+            if previous is not None and self._overlaps(previous[0], hit):
+                text = self._strip_overlap(previous[1], text)
+            if text.strip():
+                pieces.append(text)
+            previous = (hit, text)
+
+        assembled = self.SEPARATOR.join(pieces)
+        return AssembledContext(
+            text=assembled,
+            tokens=count_tokens(assembled),
+            budget=self.budget,
+            chunks_used=len(pieces),
+            chunks_dropped=len(hits) - len(pieces)
+        )
+
+    @staticmethod
+    def _position(hit: Dict[str, Any]) -> Tuple[str, int, int]:
+        metadata = hit.get('metadata') or {}
+        return (
+            str(metadata.get('version_id', '')),
+            int(metadata.get('start_char', metadata.get('chunk_index', 0)) or 0),
+            int(metadata.get('chunk_index', 0) or 0)
+        )
+
+    @staticmethod
+    def _overlaps(first: Dict[str, Any], second: Dict[str, Any]) -> bool:
+        a = first.get('metadata') or {}
+        b = second.get('metadata') or {}
+        if a.get('version_id') != b.get('version_id'):
+            return False
+        if 'end_char' not in a or 'start_char' not in b:
+            return False
+        return b['start_char'] < a['end_char']
+
+    @staticmethod
+    def _strip_overlap(previous: str, text: str, min_chars: int = 16) -> str:
+        """Remove the longest prefix of ``text`` that ends ``previous``"""
+        # Stored chunks are "content: <section> \n <text>", keep the header
+        body_start = text.find("\n") + 1 if text.startswith("content: ") else 0
+        header, body = text[:body_start], text[body_start:].lstrip()
+        for length in range(min(len(previous), len(body)), min_chars - 1, -1):
+            if previous.endswith(body[:length]):
+                return f"{header} {body[length:].lstrip()}" if header else body[length:].lstrip()
+        return text
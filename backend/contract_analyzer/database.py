@@ -1,56 +1,97 @@
-import chromadb
+import numpy as np
 import tiktoken
-from sentence_transformers import SentenceTransformer
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union, Callable, TypeVar
+import copy
 import logging
-from functools import lru_cache
+import time
+from datetime import datetime
+from threading import Lock
 import os
 import re
-from chromadb.utils import embedding_functions
+from contract_analyzer.analysis_cache import AnalysisCache
 from contract_analyzer.config import Config
-from Doc_Processor.processors.text_pre_processor import process_agreement
+from contract_analyzer.context_assembler import AssembledContext, ContextAssembler
+from contract_analyzer.disk_cache import DiskCache
+from contract_analyzer.embedding import QueryEmbeddingCache, VersionIngestStats
+from contract_analyzer.fingerprint_index import ContractFingerprintIndex
+from contract_analyzer.hybrid_search import BM25Store, CrossEncoderReranker, reciprocal_rank_fusion
+from contract_analyzer.vector_resources import NotFoundError, VectorResources
+from Doc_Processor.processors.text_chunker import ContractChunker
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 import re
 
     
 class VectorDB:
     """Core vector database operations"""
 
+    # Query embeddings are shared by every VectorDB in the process
+    _query_cache: Optional[QueryEmbeddingCache] = None
+    _query_cache_lock = Lock()
+
     def __init__(self):
         """Initialize database components"""
         self.active_collection = None
-        self._init_components()
         self.logger = logging.getLogger(__name__)
+        self._init_components()
+        self.chunker = ContractChunker(
+            chunk_size=Config.PROCESSOR_CONFIG.chunk_size,
+            chunk_overlap=Config.PROCESSOR_CONFIG.chunk_overlap,
+            encoding_name=Config.ENCODING_NAME
+        )
 
     def _init_components(self):
         """Initialize required database components"""
         try:
-            db_path = str(Config.CHROMA_DB_PATH)
-            os.makedirs(db_path, exist_ok=True)
-            
-            self.client = chromadb.PersistentClient(path=db_path)
-            self.embedding_fn = embedding_functions.SentenceTransformerEmbeddingFunction(
-        model_name="all-MiniLM-L6-v2"
-    )
+            # Client and embedding model are shared by every VectorDB in the process
+            self.client = VectorResources.get_client()
+            self.embedding_model = VectorResources.get_embedding_model()
+            # Queries go through Chroma's embedding function, ingestion through
+            # the pipeline; both share the one loaded model
+            self.embedding_fn = VectorResources.get_embedding_function()
+            self.embedding_pipeline = VectorResources.get_embedding_pipeline()
+            self.last_ingest_stats = None
+            self.last_context_stats: List[AssembledContext] = []
             
         except Exception as e:
             self.logger.error(f"VectorDB initialization failed: {str(e)}")
             raise
 
-    @lru_cache(maxsize=100)
-    def _compute_embedding(self, text: str) -> List[float]:
+    @classmethod
+    def get_query_cache(cls) -> QueryEmbeddingCache:
+        """Get the process-wide query embedding cache"""
+        with cls._query_cache_lock:
+            if cls._query_cache is None:
+                disk_cache = None
+                if Config.QUERY_EMBEDDING_CACHE_PATH:
+                    disk_cache = DiskCache(
+                        Config.QUERY_EMBEDDING_CACHE_PATH,
+                        max_size_bytes=Config.QUERY_EMBEDDING_DISK_CACHE_MB * 1024 * 1024
+                    )
+                cls._query_cache = QueryEmbeddingCache(
+                    max_bytes=Config.QUERY_EMBEDDING_CACHE_MB * 1024 * 1024,
+                    disk_cache=disk_cache
+                )
+            return cls._query_cache
+
+    def _compute_embeddings(self, texts: List[str]) -> List[List[float]]:
         """
-        Compute embedding for text with caching
+        Compute query embeddings through the shared cache
         
         Args:
-            text: Text to embed
+            texts: Texts to embed
             
         Returns:
-            List of embedding values
+            List of embeddings, one per text
         """
-        return self.model.encode([text], normalize_embeddings=True).tolist()[0]
+        return self.get_query_cache().get_or_compute(
+            Config.VECTOR_EMBEDDING_MODEL,
+            texts,
+            self.embedding_pipeline.embed
+        )
 
 
     def create_collection(self, collection_name: str) -> bool:
@@ -66,24 +107,48 @@ class VectorDB:
         try:
             safe_name = self._sanitize_collection_name(collection_name)
             # print("creating collection ", safe_name)
-            if not self._collection_exists(safe_name):
-                logging.info(f"Creating new collection: {safe_name}")
-                self.active_collection = self.client.create_collection(
-                    name=safe_name,
-                    embedding_function= self.embedding_fn,
-                    metadata={"name": safe_name}
-                    )
-                logging.info(f"Created new collection: {safe_name}")
-                self.logger.info(f"Created new collection: {safe_name}")
-            else:
-                self.active_collection = self.client.get_collection(name=safe_name)
-                self.logger.info(f"Using existing collection: {safe_name}")
+            self.active_collection = self._get_or_create_handle(safe_name)
             return True
             
         except Exception as e:
             self.logger.error(f"Collection creation failed: {str(e)}")
             return False
 
+    def scoped(self, collection_name: str, create: bool = False) -> Optional["VectorDB"]:
+        """
+        Get a view of the database bound to one collection
+        
+        The view shares the client, model and chunker with this instance but
+        has its own active collection, so concurrent requests can each hold a
+        view without switching each other's collection.
+        
+        Args:
+            collection_name: Name of the collection
+            create: Create the collection if it doesn't exist
+            
+        Returns:
+            Bound VectorDB view, or None if the collection doesn't exist
+        """
+        try:
+            safe_name = self._sanitize_collection_name(collection_name)
+            if create:
+                collection = self._get_or_create_handle(safe_name)
+            else:
+                collection = self._get_collection_handle(safe_name)
+            if collection is None:
+                self.logger.error(f"Collection not found: {safe_name}")
+                return None
+            
+            view = copy.copy(self)
+            view.active_collection = collection
+            view.last_ingest_stats = None
+            view.last_context_stats = []
+            return view
+            
+        except Exception as e:
+            self.logger.error(f"Failed to scope collection: {str(e)}")
+            return None
+
     def set_active_collection(self, collection_name: str) -> bool:
         """
         Set the active collection for operations
@@ -96,14 +161,12 @@ class VectorDB:
         """
         try:
             safe_name = self._sanitize_collection_name(collection_name)
-            if not self._collection_exists(safe_name):
+            collection = self._get_collection_handle(safe_name)
+            if collection is None:
                 self.logger.error(f"Collection not found: {safe_name}")
                 return False
                 
-            self.active_collection = self.client.get_collection(
-                name=safe_name,
-                embedding_function= self.embedding_fn
-                )
+            self.active_collection = collection
             self.logger.info(f"Set active collection to: {safe_name}")
             return True
             
@@ -114,14 +177,15 @@ class VectorDB:
     
     def add_documents(
         self, 
-        texts: str,
+        texts: Union[str, List[str]],
+        metadatas: Optional[List[Dict[str, Any]]] = None
     ) -> bool:
         """
-        Add documents to the active collection
+        Chunk documents and add them to the active collection
         
         Args:
-            docs: List of documents to add
-            metadatas: Optional metadata for each document
+            texts: Document text, or list of document texts
+            metadatas: Optional metadata for each document, copied onto its chunks
             
         Returns:
             Success status
@@ -132,23 +196,56 @@ class VectorDB:
             return False
             
         try:
-            # creating documents
-            
-            docs = process_agreement(texts)
-        
-            # create ids
-            
-            
-            print(f"********Adding {len(docs)} documents to collection")
+            if isinstance(texts, str):
+                texts = [texts]
+
+            ids, documents, chunk_metadatas, token_counts = [], [], [], []
+            for doc_index, text in enumerate(texts):
+                base_metadata = metadatas[doc_index] if metadatas and doc_index < len(metadatas) else {}
+                for chunk in self.chunker.chunk(text):
+                    # Chunk ids are content hashes, prefix them when several documents share a call
+                    ids.append(chunk.chunk_id if len(texts) == 1 else f"{doc_index}_{chunk.chunk_id}")
+                    documents.append(chunk.to_document())
+                    token_counts.append(chunk.tokens)
+                    chunk_metadatas.append(self._clean_metadata({
+                        **base_metadata,
+                        'section': chunk.section,
+                        'section_number': chunk.section_number,
+                        'start_char': chunk.start_char,
+                        'end_char': chunk.end_char,
+                        'content_hash': chunk.content_hash
+                    }))
+
+            if not ids:
+                self.logger.error("No content to add")
+                return False
             
-            documents = ["content: " + key + " \n " + str(value) for key, value in docs.items()]
-            # adding documents to collection
-            self.active_collection.add(
-                ids = list(docs.keys()),
+            print(f"********Adding {len(ids)} documents to collection")
+
+            timestamp = datetime.now().isoformat()
+            self.last_ingest_stats = self.embedding_pipeline.ingest(
+                self.active_collection,
+                ids=ids,
                 documents=documents,
+                metadatas=chunk_metadatas,
+                prepare_metadata=lambda batch_start, batch_metadatas: self._prepare_batch_metadata(
+                    batch_start=batch_start,
+                    batch_size=len(batch_metadatas),
+                    token_counts=token_counts[batch_start:batch_start + len(batch_metadatas)],
+                    timestamp=timestamp,
+                    total_chunks=len(ids),
+                    metadatas=batch_metadatas
+                )
             )
             
-            self.logger.info(f"Added {len(docs)} documents to collection")
+            BM25Store.update(self.active_collection.name, ids, documents)
+            # Analyses of the collection no longer reflect its contents
+            AnalysisCache.invalidate(self.active_collection.name)
+            
+            self.logger.info(
+                f"Added {len(ids)} documents to collection "
+                f"({self.last_ingest_stats.docs_per_second:.1f} docs/sec)"
+            )
             
             print("********Documents added")
             
@@ -158,6 +255,168 @@ class VectorDB:
             self.logger.error(f"Document addition failed: {str(e)}")
             return False
 
+    @staticmethod
+    def version_tag(version: int) -> str:
+        """Chunk metadata key marking membership in a document version"""
+        return f"v_{version}"
+
+    def latest_version(self) -> int:
+        """Latest version ingested into the active collection, 0 if none"""
+        if not self.active_collection:
+            return 0
+        return int((self.active_collection.metadata or {}).get('latest_version', 0))
+
+    def _latest_version_filter(self) -> Optional[Dict[str, Any]]:
+        """Chunk filter selecting the latest version of a versioned collection"""
+        version = self.latest_version()
+        return {self.version_tag(version): True} if version else None
+
+    def add_document_version(
+        self,
+        text: str,
+        version: int,
+        version_id: Optional[str] = None,
+        update_bm25: bool = True
+    ) -> Optional[VersionIngestStats]:
+        """
+        Diff-aware ingest of one version of a document
+        
+        Chunk ids are content hashes, so a chunk whose id is already in the
+        collection is unchanged text from an earlier version: it only gets
+        this version's tag and positions in a metadata update. Only new
+        chunks are embedded and written, so ingest time follows the size of
+        the change. Chunks of a version are selected with
+        ``where={version_tag(version): True}``.
+        
+        Args:
+            text: Full text of the version
+            version: Version number
+            version_id: Optional version identifier stored on the chunks
+            update_bm25: Add new chunks to the collection's BM25 index
+            
+        Returns:
+            Ingest statistics, or None on failure
+        """
+        if not self.active_collection:
+            self.logger.error("No active collection")
+            return None
+        
+        try:
+            start = time.perf_counter()
+            chunks = self.chunker.chunk(text)
+            stats = VersionIngestStats(version=version, chunks=len(chunks))
+            if not chunks:
+                self.logger.error("No content to add")
+                return None
+            
+            tag = self.version_tag(version)
+            ids = [chunk.chunk_id for chunk in chunks]
+            
+            # A failed earlier attempt at this version may have tagged chunks
+            # that aren't part of it; untag them so the version matches the text
+            chunk_ids = set(ids)
+            tagged = self.active_collection.get(where={tag: True}, include=[])
+            stale_ids = [chunk_id for chunk_id in tagged['ids'] if chunk_id not in chunk_ids]
+            if stale_ids:
+                self.active_collection.update(ids=stale_ids, metadatas=[{tag: False} for _ in stale_ids])
+            existing = self.active_collection.get(ids=ids, include=['embeddings'])
+            existing_ids = set(existing['ids'])
+            embedding_sum = np.zeros(0, dtype=np.float32)
+            if existing_ids:
+                embedding_sum = np.asarray(existing['embeddings'], dtype=np.float32).sum(axis=0)
+            
+            timestamp = datetime.now().isoformat()
+            new_ids, new_documents, new_metadatas = [], [], []
+            reused_ids, reused_metadatas = [], []
+            for chunk in chunks:
+                metadata = self._clean_metadata({
+                    'section': chunk.section,
+                    'section_number': chunk.section_number,
+                    'start_char': chunk.start_char,
+                    'end_char': chunk.end_char,
+                    'chunk_index': chunk.chunk_index,
+                    'total_chunks': len(chunks),
+                    'tokens': chunk.tokens,
+                    'content_hash': chunk.content_hash,
+                    'version_id': version_id,
+                    'last_version': version,
+                    'timestamp': timestamp,
+                    tag: True
+                })
+                if chunk.chunk_id in existing_ids:
+                    reused_ids.append(chunk.chunk_id)
+                    reused_metadatas.append(metadata)
+                else:
+                    new_ids.append(chunk.chunk_id)
+                    new_documents.append(chunk.to_document())
+                    new_metadatas.append({**metadata, 'first_version': version})
+            
+            if reused_ids:
+                # Metadata updates merge, earlier version tags are kept
+                batch_size = self.embedding_pipeline.batch_size * 16
+                for batch_start in range(0, len(reused_ids), batch_size):
+                    self.active_collection.update(
+                        ids=reused_ids[batch_start:batch_start + batch_size],
+                        metadatas=reused_metadatas[batch_start:batch_start + batch_size]
+                    )
+            
+            if new_ids:
+                ingest_stats = self.embedding_pipeline.ingest(
+                    self.active_collection,
+                    ids=new_ids,
+                    documents=new_documents,
+                    metadatas=new_metadatas
+                )
+                if ingest_stats.embedding_sum is not None:
+                    embedding_sum = (
+                        ingest_stats.embedding_sum if not embedding_sum.size
+                        else embedding_sum + ingest_stats.embedding_sum
+                    )
+                if update_bm25:
+                    BM25Store.update(self.active_collection.name, new_ids, new_documents)
+            
+            if version > 1:
+                previous = self.active_collection.get(
+                    where={self.version_tag(version - 1): True}, include=[]
+                )
+                stats.removed = len(set(previous['ids']) - set(ids))
+            
+            if version > self.latest_version():
+                # Chroma rejects the distance setting in modify(), even unchanged
+                self.active_collection.modify(metadata={
+                    **{
+                        key: value for key, value in (self.active_collection.metadata or {}).items()
+                        if not key.startswith('hnsw:')
+                    },
+                    'latest_version': version
+                })
+            
+            AnalysisCache.invalidate(self.active_collection.name)
+            
+            stats.embedded = len(new_ids)
+            stats.reused = len(reused_ids)
+            stats.total_seconds = time.perf_counter() - start
+            if embedding_sum.size:
+                stats.mean_embedding = (embedding_sum / len(chunks)).tolist()
+            self.logger.info(
+                f"Ingested version {version}: {stats.embedded} chunks embedded, "
+                f"{stats.reused} reused, {stats.removed} removed "
+                f"in {stats.total_seconds:.2f}s"
+            )
+            return stats
+            
+        except Exception as e:
+            self.logger.error(f"Version ingestion failed: {str(e)}")
+            return None
+
+    @staticmethod
+    def _clean_metadata(metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """Drop values Chroma can't store as metadata"""
+        return {
+            key: value for key, value in metadata.items()
+            if isinstance(value, (str, int, float, bool))
+        }
+
     def get_documents(
         self, 
         ids: Optional[List[str]] = None
@@ -177,15 +436,41 @@ class VectorDB:
             return None
             
         try:
-            return self.active_collection.get(ids=ids)
+            return self._with_fresh_handle(lambda: self.active_collection.get(ids=ids))
         except Exception as e:
             self.logger.error(f"Document retrieval failed: {str(e)}")
             return None
 
+    def count_documents(self) -> int:
+        """Number of documents in the active collection"""
+        if not self.active_collection:
+            return 0
+        try:
+            return self._with_fresh_handle(lambda: self.active_collection.count())
+        except Exception as e:
+            self.logger.error(f"Document count failed: {str(e)}")
+            return 0
+
+    def compute_fingerprint(self, text: str) -> Optional[List[float]]:
+        """
+        Fingerprint text the same way ingested contracts are fingerprinted
+        
+        Args:
+            text: Contract text
+            
+        Returns:
+            Normalized mean of the chunk embeddings
+        """
+        documents = [chunk.to_document() for chunk in self.chunker.chunk(text)]
+        if not documents:
+            return None
+        return ContractFingerprintIndex.compute_fingerprint(self.embedding_pipeline.embed(documents))
+
     def get_context(
         self, 
         query: str, 
-        num_results: int = 3
+        num_results: int = 3,
+        max_tokens: Optional[int] = None
     ) -> Optional[str]:
         """
         Get relevant context for a query
@@ -193,37 +478,170 @@ class VectorDB:
         Args:
             query: Search query
             num_results: Number of results to return
+            max_tokens: Token budget for the context
             
         Returns:
             Combined context string
         """
+        contexts = self.get_contexts([query], n_results=num_results, max_tokens=max_tokens)
+        return contexts[0] if contexts else None
+
+    def get_contexts(
+        self,
+        queries: List[str],
+        n_results: int = 3,
+        max_tokens: Optional[Union[int, List[int]]] = None
+    ) -> List[Optional[str]]:
+        """
+        Get relevant context for several queries with one embedding batch
+        and one collection query
         
+        Each query's chunks are packed best first into its token budget and
+        joined in document order; budget usage of the last call is kept in
+        ``last_context_stats``. Versioned collections only return chunks of
+        their latest version.
+        
+        Args:
+            queries: Search queries
+            n_results: Number of candidate chunks per query
+            max_tokens: Token budget, one for all queries or one per query;
+                defaults to Config.CONTEXT_TOKEN_BUDGETS["default"]
+            
+        Returns:
+            One combined context string (or None) per query, in order
+        """
+        self.last_context_stats = []
         if not self.active_collection:
             print("********No active collection while getting context")
             self.logger.error("No active collection")
-            return None
+            return [None] * len(queries)
+        if not queries:
+            return []
+        
+        if max_tokens is None:
+            max_tokens = Config.CONTEXT_TOKEN_BUDGETS['default']
+        budgets = max_tokens if isinstance(max_tokens, list) else [max_tokens] * len(queries)
             
         try:
-            
-            results = self.active_collection.query(
-                query_texts=[query],
-                n_results=num_results,
-            )
-            
-            if not results['documents'] or not results['documents'][0]:
-                return None
-            
-            chunks = results['documents'][0]
-            metadatas = results['metadatas'][0]
-            
-            sorted_results = sorted(
-                zip(chunks, metadatas))
-            
-            return "\n...\n".join(chunk for chunk, _ in sorted_results)
+            contexts = []
+            retrieved = self._with_fresh_handle(lambda: self._retrieve(queries, n_results))
+            for hits, budget in zip(retrieved, budgets):
+                assembled = ContextAssembler(budget).assemble(hits)
+                self.last_context_stats.append(assembled)
+                contexts.append(assembled.text or None)
+            return contexts
             
         except Exception as e:
             self.logger.error(f"Context retrieval failed: {str(e)}")
-            return None
+            return [None] * len(queries)
+
+    def _retrieve(self, queries: List[str], n_results: int) -> List[List[Dict[str, Any]]]:
+        """
+        Retrieve the best chunks for each query
+        
+        In hybrid mode the vector hits and the collection's BM25 hits are
+        fused with reciprocal-rank fusion, then optionally reranked by a
+        cross-encoder.
+        
+        Args:
+            queries: Search queries
+            n_results: Number of chunks per query
+            
+        Returns:
+            Per query, hits with id, document, metadata and score, best first
+        """
+        hybrid = Config.RETRIEVAL_MODE == "hybrid"
+        n_candidates = max(n_results, Config.HYBRID_CANDIDATES) if hybrid else n_results
+        # Versioned collections keep superseded chunks; search the latest version only
+        where = self._latest_version_filter()
+        
+        results = self.active_collection.query(
+            query_embeddings=self._compute_embeddings(queries),
+            n_results=n_candidates,
+            where=where,
+            include=['documents', 'metadatas', 'distances'],
+        )
+        space = self._distance_space(self.active_collection)
+        vector_hits = [
+            [
+                {
+                    'id': doc_id, 'document': document, 'metadata': metadata or {},
+                    'score': self._similarity(distance, space)
+                }
+                for doc_id, document, metadata, distance in zip(ids, documents, metadatas, distances)
+            ]
+            for ids, documents, metadatas, distances in zip(
+                results['ids'], results['documents'], results['metadatas'], results['distances']
+            )
+        ]
+        
+        bm25 = self._get_bm25_index() if hybrid else None
+        if bm25 is None:
+            return [hits[:n_results] for hits in vector_hits]
+        
+        # The BM25 index covers every version, restrict it like the vector query
+        allowed_ids = None
+        if where:
+            allowed_ids = set(self.active_collection.get(where=where, include=[])['ids'])
+        
+        fused_ids = []
+        for query, hits in zip(queries, vector_hits):
+            keyword_ids = [
+                doc_id for doc_id, _ in bm25.search(query, top_k=n_candidates, allowed_ids=allowed_ids)
+            ]
+            fused = reciprocal_rank_fusion([[hit['id'] for hit in hits], keyword_ids], k=Config.RRF_K)
+            fused_ids.append(fused[:Config.RERANK_CANDIDATES if Config.RERANK_ENABLED else n_results])
+        
+        # Keyword-only hits aren't in the vector results, fetch them in one call
+        known = {hit['id']: hit for hits in vector_hits for hit in hits}
+        missing = list({doc_id for fused in fused_ids for doc_id, _ in fused if doc_id not in known})
+        if missing:
+            fetched = self.active_collection.get(ids=missing, include=['documents', 'metadatas'])
+            for doc_id, document, metadata in zip(fetched['ids'], fetched['documents'], fetched['metadatas']):
+                known[doc_id] = {'id': doc_id, 'document': document, 'metadata': metadata or {}}
+        
+        retrieved = []
+        for query, fused in zip(queries, fused_ids):
+            hits = [{**known[doc_id], 'score': score} for doc_id, score in fused if doc_id in known]
+            if Config.RERANK_ENABLED and hits:
+                scores = CrossEncoderReranker.rerank(query, [hit['document'] for hit in hits])
+                hits = [
+                    {**hit, 'score': score}
+                    for hit, score in sorted(zip(hits, scores), key=lambda pair: pair[1], reverse=True)
+                ]
+            retrieved.append(hits[:n_results])
+        return retrieved
+
+    @staticmethod
+    def _distance_space(collection) -> str:
+        """Distance function of a collection: "l2" (Chroma's default), "cosine" or "ip" """
+        try:
+            configuration = collection.configuration
+        except Exception:
+            configuration = None
+        space = None
+        if isinstance(configuration, dict):
+            space = (configuration.get('hnsw') or {}).get('space')
+        return space or (collection.metadata or {}).get('hnsw:space', 'l2')
+
+    @staticmethod
+    def _similarity(distance: float, space: str) -> float:
+        """Cosine similarity of unit-length embeddings from a Chroma distance"""
+        if space == 'l2':
+            # Squared L2 distance between unit vectors is 2 - 2cos
+            return 1.0 - distance / 2.0
+        # Cosine distance is 1 - cos, inner-product distance 1 - dot
+        return 1.0 - distance
+
+    def _get_bm25_index(self):
+        """Get the active collection's BM25 index, building it for collections ingested before hybrid search"""
+        name = self.active_collection.name
+        index = BM25Store.get(name)
+        if index is None and self.active_collection.count() > 0:
+            self.logger.info(f"Building BM25 index for collection: {name}")
+            existing = self.active_collection.get(include=['documents'])
+            index = BM25Store.update(name, existing['ids'], existing['documents'])
+        return index
 
     def delete_collection(self, collection_name: str) -> bool:
         """
@@ -242,7 +660,13 @@ class VectorDB:
                 self.logger.warning(f"Collection not found: {safe_name}")
                 return False
                 
-            self.client.delete_collection(name=safe_name)
+            try:
+                self.client.delete_collection(name=safe_name)
+            finally:
+                VectorResources.invalidate_collection(safe_name)
+                BM25Store.delete(safe_name)
+                AnalysisCache.invalidate(safe_name)
+            ContractFingerprintIndex().remove_collection(safe_name)
             if self.active_collection and self.active_collection.name == safe_name:
                 self.active_collection = None
                 
@@ -255,9 +679,51 @@ class VectorDB:
 
     def _collection_exists(self, collection_name: str) -> bool:
         """Check if a collection exists"""
-        # print("*********Checking if collection exists")
-        # print(collection_name in self.client.list_collections())
-        return collection_name in self.client.list_collections()
+        return self._get_collection_handle(collection_name) is not None
+
+    def _get_collection_handle(self, safe_name: str):
+        """Resolve a collection through the process-wide handle cache"""
+        return VectorResources.get_collection(safe_name, embedding_function=self.embedding_fn)
+
+    def _get_or_create_handle(self, safe_name: str):
+        """Resolve a collection, creating it if needed"""
+        collection = self._get_collection_handle(safe_name)
+        if collection is None:
+            logging.info(f"Creating new collection: {safe_name}")
+            # get_or_create tolerates another worker creating it first
+            collection = self.client.get_or_create_collection(
+                name=safe_name,
+                embedding_function= self.embedding_fn,
+                metadata={"name": safe_name, "hnsw:space": "cosine"}
+                )
+            VectorResources.cache_collection(collection)
+            self.logger.info(f"Created new collection: {safe_name}")
+        else:
+            self.logger.info(f"Using existing collection: {safe_name}")
+        return collection
+
+    def _with_fresh_handle(self, operation: Callable[[], T]) -> T:
+        """
+        Run an operation on the active collection, re-resolving the handle
+        once if the collection was deleted or recreated by another process
+
+        Args:
+            operation: Callable reading ``self.active_collection``
+
+        Returns:
+            The operation's result
+        """
+        try:
+            return operation()
+        except NotFoundError:
+            safe_name = self.active_collection.name
+            VectorResources.invalidate_collection(safe_name)
+            collection = self._get_collection_handle(safe_name)
+            if collection is None:
+                raise
+            self.logger.info(f"Re-resolved stale collection handle: {safe_name}")
+            self.active_collection = collection
+            return operation()
 
     def _sanitize_collection_name(self, name: str) -> str:
         """Sanitize collection name for database use"""
@@ -272,10 +738,20 @@ class VectorDB:
         total_chunks: int,
         metadatas: Optional[List[Dict[str, Any]]] = None
     ) -> List[Dict[str, Any]]:
-        """Prepare metadata for batch processing"""
+        """
+        Prepare metadata for batch processing
+        
+        Args:
+            batch_start: Index of the batch's first chunk in the whole document
+            batch_size: Number of chunks in the batch
+            token_counts: Token count of each chunk in the batch
+            timestamp: Ingestion timestamp
+            total_chunks: Number of chunks in the whole document
+            metadatas: Optional existing metadata of each chunk in the batch
+        """
         if metadatas:
             return [{
-                **metadatas[batch_start//batch_size].copy(),
+                **metadatas[j].copy(),
                 'tokens': count,
                 'timestamp': timestamp,
                 'chunk_index': batch_start + j,
@@ -294,7 +770,6 @@ class VectorDB:
         try:
             print("Cleaning up database")
             self.active_collection = None
-            self._compute_embedding.cache_clear()
             self.logger.info("Database cleanup completed")
         except Exception as e:
             self.logger.error(f"Cleanup failed: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,398 @@
+# diff_engine.py
+from typing import List, Dict, Any, Optional, Tuple, Callable, Sequence, Hashable
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from threading import Lock
+import hashlib
+import logging
+
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+# (index in a, index in b, length) of an equal run, as in difflib
+MatchingBlock = Tuple[int, int, int]
+
+
+def _intern(a: Sequence[Hashable], b: Sequence[Hashable]) -> Tuple[List[int], List[int]]:
+    """Map elements to ints so the diff loops compare small integers"""
+    ids: Dict[Hashable, int] = {}
+    return (
+        [ids.setdefault(item, len(ids)) for item in a],
+        [ids.setdefault(item, len(ids)) for item in b]
+    )
+
+
+def _bisect(a: List[int], alo: int, ahi: int, b: List[int], blo: int, bhi: int) -> Optional[Tuple[int, int]]:
+    """
+    Find a point on a shortest edit path with Myers' middle-snake search
+
+    Runs the forward and reverse searches together in O(N + M) space.
+
+    Returns:
+        (x, y) offsets to split both ranges at, or None if they share nothing
+    """
+    n = ahi - alo
+    m = bhi - blo
+    max_d = (n + m + 1) // 2
+    v_offset = max_d
+    v_length = 2 * max_d + 2
+    v1 = [-1] * v_length
+    v2 = [-1] * v_length
+    v1[v_offset + 1] = 0
+    v2[v_offset + 1] = 0
+    delta = n - m
+    # With an odd delta the forward path is the one that meets the reverse path
+    front = delta % 2 != 0
+    k1start = k1end = k2start = k2end = 0
+
+    for d in range(max_d):
+        for k1 in range(-d + k1start, d + 1 - k1end, 2):
+            k1_offset = v_offset + k1
+            if k1 == -d or (k1 != d and v1[k1_offset - 1] < v1[k1_offset + 1]):
+                x1 = v1[k1_offset + 1]
+            else:
+                x1 = v1[k1_offset - 1] + 1
+            y1 = x1 - k1
+            while x1 < n and y1 < m and a[alo + x1] == b[blo + y1]:
+                x1 += 1
+                y1 += 1
+            v1[k1_offset] = x1
+            if x1 > n:
+                k1end += 2
+            elif y1 > m:
+                k1start += 2
+            elif front:
+                k2_offset = v_offset + delta - k1
+                if 0 <= k2_offset < v_length and v2[k2_offset] != -1:
+                    if x1 >= n - v2[k2_offset]:
+                        return x1, y1
+
+        for k2 in range(-d + k2start, d + 1 - k2end, 2):
+            k2_offset = v_offset + k2
+            if k2 == -d or (k2 != d and v2[k2_offset - 1] < v2[k2_offset + 1]):
+                x2 = v2[k2_offset + 1]
+            else:
+                x2 = v2[k2_offset - 1] + 1
+            y2 = x2 - k2
+            while x2 < n and y2 < m and a[ahi - 1 - x2] == b[bhi - 1 - y2]:
+                x2 += 1
+                y2 += 1
+            v2[k2_offset] = x2
+            if x2 > n:
+                k2end += 2
+            elif y2 > m:
+                k2start += 2
+            elif not front:
+                k1_offset = v_offset + delta - k2
+                if 0 <= k1_offset < v_length and v1[k1_offset] != -1:
+                    x1 = v1[k1_offset]
+                    if x1 >= n - x2:
+                        return x1, x1 - (k1_offset - v_offset)
+    return None
+
+
+def myers_matching_blocks(a: Sequence[Hashable], b: Sequence[Hashable]) -> List[MatchingBlock]:
+    """
+    Equal runs of a shortest edit script between two sequences
+
+    Myers' O((N + M) D) algorithm, where D is the number of edits, so the
+    cost grows with how much changed rather than with the square of the
+    length. Common prefixes and suffixes are stripped before each search.
+
+    Returns:
+        Matching blocks in order, without difflib's terminating sentinel
+    """
+    a, b = _intern(a, b)
+    blocks: List[MatchingBlock] = []
+    stack = [(0, len(a), 0, len(b))]
+    while stack:
+        alo, ahi, blo, bhi = stack.pop()
+        start = alo
+        while alo < ahi and blo < bhi and a[alo] == b[blo]:
+            alo += 1
+            blo += 1
+        if alo > start:
+            blocks.append((start, blo - (alo - start), alo - start))
+        end = ahi
+        while ahi > alo and bhi > blo and a[ahi - 1] == b[bhi - 1]:
+            ahi -= 1
+            bhi -= 1
+        if end > ahi:
+            blocks.append((ahi, bhi, end - ahi))
+        if alo == ahi or blo == bhi:
+            continue
+
+        split = _bisect(a, alo, ahi, b, blo, bhi)
+        if split is None:
+            continue
+        x, y = split
+        if (x, y) in ((0, 0), (ahi - alo, bhi - blo)):
+            continue
+        stack.append((alo + x, ahi, blo + y, bhi))
+        stack.append((alo, alo + x, blo, blo + y))
+
+    blocks.sort()
+    merged: List[MatchingBlock] = []
+    for i, j, size in blocks:
+        if merged and merged[-1][0] + merged[-1][2] == i and merged[-1][1] + merged[-1][2] == j:
+            merged[-1] = (merged[-1][0], merged[-1][1], merged[-1][2] + size)
+        else:
+            merged.append((i, j, size))
+    return merged
+
+
+def myers_opcodes(a: Sequence[Hashable], b: Sequence[Hashable]) -> List[Tuple[str, int, int, int, int]]:
+    """difflib-style opcodes ('equal', 'replace', 'delete', 'insert') from a Myers diff"""
+    opcodes = []
+    i = j = 0
+    for ai, bj, size in myers_matching_blocks(a, b) + [(len(a), len(b), 0)]:
+        if i < ai and j < bj:
+            opcodes.append(('replace', i, ai, j, bj))
+        elif i < ai:
+            opcodes.append(('delete', i, ai, j, bj))
+        elif j < bj:
+            opcodes.append(('insert', i, ai, j, bj))
+        if size:
+            opcodes.append(('equal', ai, ai + size, bj, bj + size))
+        i, j = ai + size, bj + size
+    return opcodes
+
+
+@dataclass
+class Segment:
+    """A section of a version, or the text before the first section"""
+    key: str
+    name: str
+    content: str
+    digest: str
+
+    @property
+    def lines(self) -> List[str]:
+        return self.content.splitlines(keepends=True)
+
+
+@dataclass
+class SectionChange:
+    """How one section differs between two versions"""
+    # Section header, suffixed with its occurrence number if repeated
+    name: str
+    change_type: str  # added, removed, modified or unchanged
+    similarity: float
+    old_content: Optional[str] = None
+    new_content: Optional[str] = None
+    additions: List[str] = field(default_factory=list, repr=False)
+    deletions: List[str] = field(default_factory=list, repr=False)
+    modifications: List[Tuple[str, str]] = field(default_factory=list, repr=False)
+    matched_tokens: int = field(default=0, repr=False)
+    total_tokens: int = field(default=0, repr=False)
+
+
+@dataclass
+class VersionComparison:
+    """Section changes between two versions plus whole-document totals"""
+    sections: List[SectionChange]
+    similarity: float
+
+    @property
+    def additions(self) -> List[str]:
+        return [line for change in self.sections for line in change.additions]
+
+    @property
+    def deletions(self) -> List[str]:
+        return [line for change in self.sections for line in change.deletions]
+
+    @property
+    def modifications(self) -> List[Tuple[str, str]]:
+        return [pair for change in self.sections for pair in change.modifications]
+
+    def named_sections(self) -> List[SectionChange]:
+        """Changes of headed sections, leaving out the preamble"""
+        return [change for change in self.sections if change.name]
+
+
+class SectionDiffEngine:
+    """
+    Compares contract versions section by section.
+
+    Sections with equal content hashes are skipped without diffing. Modified
+    sections get a line-level Myers diff, and only the replaced line blocks
+    are diffed again word by word to score similarity, so a small edit in a
+    long clause costs time proportional to the clause, not its square.
+    Results are cached per (version, version) pair.
+    """
+
+    def __init__(self, is_header: Callable[[str], bool], cache_size: Optional[int] = None):
+        self.is_header = is_header
+        self.cache_size = cache_size if cache_size is not None else Config.VERSION_DIFF_CACHE_SIZE
+        self._cache: "OrderedDict[Tuple[str, str], VersionComparison]" = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def digest(text: str) -> str:
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+    def segment(self, content: str) -> List[Segment]:
+        """
+        Split content at section headers
+
+        Text before the first header becomes an unnamed segment, and repeated
+        header names get an occurrence suffix in their key so every segment
+        can be matched.
+        """
+        segments: List[Segment] = []
+        seen: Dict[str, int] = {}
+        name, lines = "", []
+
+        def flush() -> None:
+            if not name and not lines:
+                return
+            count = seen.get(name, 0)
+            seen[name] = count + 1
+            text = "".join(lines)
+            segments.append(Segment(
+                key=name if not count else f"{name} ({count + 1})",
+                name=name,
+                content=text,
+                digest=self.digest(text)
+            ))
+
+        for line in content.splitlines(keepends=True):
+            if self.is_header(line.rstrip("\r\n")):
+                flush()
+                name, lines = line.strip(), []
+            else:
+                lines.append(line)
+        flush()
+        return segments
+
+    def compare(
+        self,
+        old_content: str,
+        new_content: str,
+        cache_key: Optional[Tuple[str, str]] = None
+    ) -> VersionComparison:
+        """
+        Compare two versions
+
+        Args:
+            old_content: Earlier version text
+            new_content: Later version text
+            cache_key: (old version id, new version id), cached if given
+
+        Returns:
+            Per-section changes and overall token similarity
+        """
+        if cache_key is not None:
+            with self._lock:
+                cached = self._cache.get(cache_key)
+                if cached is not None:
+                    self._cache.move_to_end(cache_key)
+                    self.hits += 1
+                    return cached
+                self.misses += 1
+
+        comparison = self.compare_segments(self.segment(old_content), self.segment(new_content))
+
+        if cache_key is not None and self.cache_size:
+            with self._lock:
+                self._cache[cache_key] = comparison
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return comparison
+
+    def compare_segments(self, old: List[Segment], new: List[Segment]) -> VersionComparison:
+        """Compare segment lists matched by key"""
+        old_by_key = {segment.key: segment for segment in old}
+        new_keys = {segment.key for segment in new}
+        changes: List[SectionChange] = []
+
+        for segment in new:
+            previous = old_by_key.get(segment.key)
+            if previous is None:
+                changes.append(self._added(segment))
+            elif previous.digest == segment.digest:
+                tokens = len(segment.content.split())
+                changes.append(SectionChange(
+                    name=segment.key,
+                    change_type='unchanged',
+                    similarity=1.0,
+                    old_content=previous.content,
+                    new_content=segment.content,
+                    matched_tokens=2 * tokens,
+                    total_tokens=2 * tokens
+                ))
+            else:
+                changes.append(self._modified(previous, segment))
+
+        changes.extend(self._removed(segment) for segment in old if segment.key not in new_keys)
+
+        matched = sum(change.matched_tokens for change in changes)
+        total = sum(change.total_tokens for change in changes)
+        return VersionComparison(
+            sections=changes,
+            similarity=matched / total if total else 1.0
+        )
+
+    def _added(self, segment: Segment) -> SectionChange:
+        return SectionChange(
+            name=segment.key,
+            change_type='added',
+            similarity=0.0,
+            new_content=segment.content,
+            additions=segment.lines,
+            total_tokens=len(segment.content.split())
+        )
+
+    def _removed(self, segment: Segment) -> SectionChange:
+        return SectionChange(
+            name=segment.key,
+            change_type='removed',
+            similarity=0.0,
+            old_content=segment.content,
+            deletions=segment.lines,
+            total_tokens=len(segment.content.split())
+        )
+
+    def _modified(self, old: Segment, new: Segment) -> SectionChange:
+        old_lines, new_lines = old.lines, new.lines
+        change = SectionChange(
+            name=new.key,
+            change_type='modified',
+            similarity=0.0,
+            old_content=old.content,
+            new_content=new.content
+        )
+        matched = 0
+        for tag, i1, i2, j1, j2 in myers_opcodes(old_lines, new_lines):
+            if tag == 'equal':
+                matched += 2 * sum(len(line.split()) for line in old_lines[i1:i2])
+                continue
+            change.deletions.extend(old_lines[i1:i2])
+            change.additions.extend(new_lines[j1:j2])
+            if tag == 'replace':
+                change.modifications.extend(zip(old_lines[i1:i2], new_lines[j1:j2]))
+                old_tokens = "".join(old_lines[i1:i2]).split()
+                new_tokens = "".join(new_lines[j1:j2]).split()
+                matched += 2 * sum(size for _, _, size in myers_matching_blocks(old_tokens, new_tokens))
+
+        total = len(old.content.split()) + len(new.content.split())
+        change.matched_tokens = matched
+        change.total_tokens = total
+        change.similarity = matched / total if total else 1.0
+        return change
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._cache),
+                'max_entries': self.cache_size
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
@@ -0,0 +1,154 @@
+# disk_cache.py
+from typing import Optional, Union, Dict, Any, Iterable
+from pathlib import Path
+from threading import Lock
+import logging
+import sqlite3
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class DiskCache:
+    """
+    Small persistent key/value store backed by SQLite.
+
+    Values are bytes. The store is bounded by total value size with
+    least-recently-used eviction, and entries can carry an optional TTL.
+    Safe to share between threads of one process.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        max_size_bytes: int = 256 * 1024 * 1024,
+        default_ttl_seconds: Optional[float] = None
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_size_bytes = max_size_bytes
+        self.default_ttl_seconds = default_ttl_seconds
+        self._lock = Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS cache (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    tag TEXT,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    expires_at REAL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache(accessed_at)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_tag ON cache(tag)")
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Get a value, or None if missing or expired"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            with self._conn:
+                if expires_at is not None and expires_at <= now:
+                    self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                    return None
+                self._conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+            return bytes(value)
+
+    def set(
+        self,
+        key: str,
+        value: bytes,
+        ttl_seconds: Optional[float] = None,
+        tag: Optional[str] = None
+    ) -> None:
+        """
+        Store a value
+
+        Args:
+            key: Cache key
+            value: Bytes to store
+            ttl_seconds: Time to live, defaults to the store's default TTL
+            tag: Optional group label for bulk invalidation
+        """
+        now = time.time()
+        ttl = ttl_seconds if ttl_seconds is not None else self.default_ttl_seconds
+        expires_at = now + ttl if ttl else None
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO cache (key, value, size, tag, created_at, accessed_at, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, sqlite3.Binary(value), len(value), tag, now, now, expires_at)
+                )
+            self._evict_locked(now)
+
+    def set_many(self, items: Iterable[tuple], tag: Optional[str] = None) -> None:
+        """Store several (key, value) pairs in one transaction"""
+        now = time.time()
+        expires_at = now + self.default_ttl_seconds if self.default_ttl_seconds else None
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO cache (key, value, size, tag, created_at, accessed_at, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (key, sqlite3.Binary(value), len(value), tag, now, now, expires_at)
+                        for key, value in items
+                    ]
+                )
+            self._evict_locked(now)
+
+    def delete(self, key: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def delete_tag(self, tag: str) -> int:
+        """Delete every entry stored with the given tag"""
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM cache WHERE tag = ?", (tag,)).rowcount
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache"
+            ).fetchone()
+        return {'entries': count, 'size_bytes': size, 'max_size_bytes': self.max_size_bytes}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _evict_locked(self, now: float) -> None:
+        with self._conn:
+            self._conn.execute(
+                "DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+            )
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+            if total <= self.max_size_bytes:
+                return
+
+            evicted = 0
+            for key, size in self._conn.execute(
+                "SELECT key, size FROM cache ORDER BY accessed_at"
+            ).fetchall():
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                total -= size
+                evicted += 1
+                if total <= self.max_size_bytes:
+                    break
+            logger.info(f"Evicted {evicted} entries from {self.path.name}")
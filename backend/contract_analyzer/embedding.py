@@ -0,0 +1,308 @@
+# embedding.py
+from typing import List, Optional, Dict, Any, Callable, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass, field, fields
+from queue import Queue
+from threading import Thread, Lock
+import hashlib
+import logging
+import time
+
+import numpy as np
+from chromadb import Documents, EmbeddingFunction, Embeddings
+from sentence_transformers import SentenceTransformer
+
+from .disk_cache import DiskCache
+
+logger = logging.getLogger(__name__)
+
+
+class SentenceEmbeddingFunction(EmbeddingFunction):
+    """Chroma embedding function backed by an already loaded SentenceTransformer"""
+
+    def __init__(self, model: SentenceTransformer, batch_size: int = 64, normalize: bool = True):
+        self.model = model
+        self.batch_size = batch_size
+        self.normalize = normalize
+
+    def __call__(self, input: Documents) -> Embeddings:
+        return self.model.encode(
+            list(input),
+            batch_size=self.batch_size,
+            normalize_embeddings=self.normalize,
+            show_progress_bar=False
+        ).tolist()
+
+
+@dataclass
+class IngestStats:
+    """Throughput of one ingestion run"""
+    documents: int = 0
+    batches: int = 0
+    embed_seconds: float = 0.0
+    write_seconds: float = 0.0
+    total_seconds: float = 0.0
+    # Running sum of the embeddings written, used for contract fingerprints
+    embedding_sum: Optional[np.ndarray] = field(default=None, repr=False)
+
+    @property
+    def docs_per_second(self) -> float:
+        return self.documents / self.total_seconds if self.total_seconds else 0.0
+
+    @property
+    def mean_embedding(self) -> Optional[List[float]]:
+        if self.embedding_sum is None or not self.documents:
+            return None
+        return (self.embedding_sum / self.documents).tolist()
+
+    def to_dict(self) -> Dict[str, Any]:
+        stats = {f.name: getattr(self, f.name) for f in fields(self) if f.name != 'embedding_sum'}
+        return {**stats, 'docs_per_second': round(self.docs_per_second, 2)}
+
+
+@dataclass
+class VersionIngestStats:
+    """Outcome of ingesting one document version incrementally"""
+    version: int
+    chunks: int = 0
+    embedded: int = 0
+    reused: int = 0
+    removed: int = 0
+    total_seconds: float = 0.0
+    mean_embedding: Optional[List[float]] = field(default=None, repr=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {f.name: getattr(self, f.name) for f in fields(self) if f.name != 'mean_embedding'}
+
+
+class EmbeddingPipeline:
+    """
+    Embeds documents in explicit batches and writes them with precomputed
+    embeddings.
+
+    A writer thread stores batch N while the caller's thread embeds batch
+    N+1; the hand-off queue holds a single batch so at most two batches are
+    in memory.
+    """
+
+    def __init__(self, model: SentenceTransformer, batch_size: int = 64, normalize: bool = True):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.model = model
+        self.batch_size = batch_size
+        self.normalize = normalize
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Embed one batch of texts"""
+        return self.model.encode(
+            texts,
+            batch_size=self.batch_size,
+            normalize_embeddings=self.normalize,
+            show_progress_bar=False
+        ).tolist()
+
+    def ingest(
+        self,
+        collection,
+        ids: List[str],
+        documents: List[str],
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        prepare_metadata: Optional[Callable[[int, List[Dict[str, Any]]], List[Dict[str, Any]]]] = None
+    ) -> IngestStats:
+        """
+        Embed and upsert documents into a collection
+
+        Args:
+            collection: Chroma collection to write to
+            ids: Document ids
+            documents: Document texts
+            metadatas: Optional per-document metadata
+            prepare_metadata: Optional hook called with (batch_start, batch
+                metadatas) that returns the metadata to store for the batch
+
+        Returns:
+            Ingestion statistics
+        """
+        stats = IngestStats(documents=len(ids))
+        start = time.perf_counter()
+        batches: Queue = Queue(maxsize=1)
+        errors: List[Exception] = []
+
+        def writer() -> None:
+            while True:
+                batch = batches.get()
+                if batch is None:
+                    return
+                if errors:
+                    continue
+                try:
+                    write_start = time.perf_counter()
+                    collection.upsert(**batch)
+                    stats.write_seconds += time.perf_counter() - write_start
+                except Exception as e:
+                    errors.append(e)
+
+        writer_thread = Thread(target=writer, name="embedding-writer", daemon=True)
+        writer_thread.start()
+
+        try:
+            for batch_start in range(0, len(ids), self.batch_size):
+                if errors:
+                    break
+                batch_end = batch_start + self.batch_size
+                batch_documents = documents[batch_start:batch_end]
+
+                embed_start = time.perf_counter()
+                embeddings = self.embed(batch_documents)
+                stats.embed_seconds += time.perf_counter() - embed_start
+                batch_sum = np.asarray(embeddings, dtype=np.float32).sum(axis=0)
+                stats.embedding_sum = batch_sum if stats.embedding_sum is None else stats.embedding_sum + batch_sum
+
+                batch_metadatas = metadatas[batch_start:batch_end] if metadatas else None
+                if prepare_metadata:
+                    batch_metadatas = prepare_metadata(
+                        batch_start, batch_metadatas or [{} for _ in batch_documents]
+                    )
+
+                batch = {
+                    'ids': ids[batch_start:batch_end],
+                    'documents': batch_documents,
+                    'embeddings': embeddings
+                }
+                if batch_metadatas:
+                    batch['metadatas'] = batch_metadatas
+                batches.put(batch)
+                stats.batches += 1
+        finally:
+            batches.put(None)
+            writer_thread.join()
+
+        if errors:
+            raise errors[0]
+
+        stats.total_seconds = time.perf_counter() - start
+        logger.info(
+            f"Ingested {stats.documents} documents in {stats.batches} batches: "
+            f"{stats.docs_per_second:.1f} docs/sec "
+            f"(embed {stats.embed_seconds:.2f}s, write {stats.write_seconds:.2f}s)"
+        )
+        return stats
+
+
+class QueryEmbeddingCache:
+    """
+    Memory-bounded LRU cache of query embeddings, optionally backed by disk.
+
+    Keys are the embedding model name plus whitespace-normalized query
+    text, so the cache can be shared by every VectorDB in the process.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, disk_cache: Optional[DiskCache] = None):
+        self.max_bytes = max_bytes
+        self.disk_cache = disk_cache
+        self._entries: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self._size_bytes = 0
+        self._lock = Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(text.split())
+
+    def get_or_compute(
+        self,
+        model_name: str,
+        texts: List[str],
+        compute: Callable[[List[str]], List[List[float]]]
+    ) -> List[List[float]]:
+        """
+        Get embeddings for texts, computing only the ones not cached
+
+        Args:
+            model_name: Name of the embedding model (part of the key)
+            texts: Query texts
+            compute: Embeds a list of texts in one batch
+
+        Returns:
+            One embedding per text, in order
+        """
+        keys = [(model_name, self.normalize(text)) for text in texts]
+        found: Dict[Tuple[str, str], np.ndarray] = {}
+        missing: List[Tuple[str, str]] = []
+
+        with self._lock:
+            for key in keys:
+                if key in found:
+                    continue
+                vector = self._entries.get(key)
+                if vector is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    found[key] = vector
+                elif key not in missing:
+                    missing.append(key)
+
+        if missing and self.disk_cache:
+            still_missing = []
+            for key in missing:
+                blob = self.disk_cache.get(self._disk_key(key))
+                if blob is None:
+                    still_missing.append(key)
+                    continue
+                vector = np.frombuffer(blob, dtype=np.float32)
+                found[key] = vector
+                self._store(key, vector)
+                with self._lock:
+                    self.disk_hits += 1
+            missing = still_missing
+
+        if missing:
+            # Embed the normalized text so equal keys always map to one vector
+            vectors = compute([key[1] for key in missing])
+            with self._lock:
+                self.misses += len(missing)
+            persisted = []
+            for key, vector in zip(missing, vectors):
+                vector = np.asarray(vector, dtype=np.float32)
+                found[key] = vector
+                self._store(key, vector)
+                persisted.append((self._disk_key(key), vector.tobytes()))
+            if self.disk_cache:
+                self.disk_cache.set_many(persisted)
+
+        return [found[key].tolist() for key in keys]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': round((self.hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+                'entries': len(self._entries),
+                'size_bytes': self._size_bytes,
+                'max_bytes': self.max_bytes
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size_bytes = 0
+
+    def _store(self, key: Tuple[str, str], vector: np.ndarray) -> None:
+        size = vector.nbytes + len(key[1])
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = vector
+            self._size_bytes += size
+            while self._size_bytes > self.max_bytes and self._entries:
+                old_key, old_vector = self._entries.popitem(last=False)
+                self._size_bytes -= old_vector.nbytes + len(old_key[1])
+
+    @staticmethod
+    def _disk_key(key: Tuple[str, str]) -> str:
+        return hashlib.sha256(f"{key[0]}\n{key[1]}".encode("utf-8")).hexdigest()
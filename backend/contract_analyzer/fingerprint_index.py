@@ -0,0 +1,287 @@
+# fingerprint_index.py
+from typing import List, Dict, Any, Optional, Iterable
+from datetime import datetime
+import logging
+
+import numpy as np
+
+from .config import Config
+from .vector_resources import VectorResources
+
+logger = logging.getLogger(__name__)
+
+
+class ContractFingerprintIndex:
+    """
+    Corpus-wide similarity index with one vector per contract.
+
+    A contract's fingerprint is the normalized mean of its chunk embeddings.
+    All fingerprints live in a single cosine-space collection, so finding
+    similar contracts is one ANN query regardless of how many contract
+    collections exist.
+
+    Entries are keyed by the name of the collection holding the contract,
+    so an uploaded document and a versioned contract (``contract_<id>``)
+    each have exactly one entry whichever path ingested them. ``backfill``
+    fingerprints collections ingested before the index existed.
+    """
+
+    def __init__(self, collection_name: Optional[str] = None):
+        self.collection_name = collection_name or Config.FINGERPRINT_COLLECTION
+        self.logger = logging.getLogger(__name__)
+        self._collection = None
+
+    @property
+    def collection(self):
+        if self._collection is None:
+            collection = VectorResources.get_collection(self.collection_name)
+            if collection is None:
+                collection = VectorResources.get_client().get_or_create_collection(
+                    name=self.collection_name,
+                    metadata={"hnsw:space": "cosine"}
+                )
+                VectorResources.cache_collection(collection)
+            self._collection = collection
+        return self._collection
+
+    @staticmethod
+    def compute_fingerprint(embeddings: Iterable[List[float]]) -> Optional[List[float]]:
+        """
+        Build a fingerprint from chunk embeddings
+
+        Args:
+            embeddings: Embedding of each chunk
+
+        Returns:
+            Unit-length mean embedding, or None if there are no embeddings
+        """
+        matrix = np.asarray(list(embeddings), dtype=np.float32)
+        if matrix.size == 0:
+            return None
+        return ContractFingerprintIndex._normalize(matrix.mean(axis=0))
+
+    @staticmethod
+    def _normalize(vector) -> Optional[List[float]]:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if not norm:
+            return None
+        return (vector / norm).tolist()
+
+    @staticmethod
+    def _entry_metadata(collection_name: str, metadata: Optional[Dict[str, Any]], updated_at: str) -> Dict[str, Any]:
+        entry = {
+            key: value for key, value in (metadata or {}).items()
+            if isinstance(value, (str, int, float, bool))
+        }
+        entry.setdefault('contract_id', collection_name)
+        entry.update({'collection_name': collection_name, 'updated_at': updated_at})
+        return entry
+
+    def upsert(
+        self,
+        collection_name: str,
+        fingerprint: List[float],
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """
+        Store or replace a contract's fingerprint
+
+        Args:
+            collection_name: Collection holding the contract (the entry's key)
+            fingerprint: Mean chunk embedding (normalized here)
+            metadata: Extra metadata, e.g. contract_id or version_number
+
+        Returns:
+            Success status
+        """
+        vector = self._normalize(fingerprint) if fingerprint is not None else None
+        if vector is None:
+            self.logger.warning(f"Empty fingerprint for contract: {collection_name}")
+            return False
+        try:
+            self.collection.upsert(
+                ids=[collection_name],
+                embeddings=[vector],
+                metadatas=[self._entry_metadata(collection_name, metadata, datetime.now().isoformat())]
+            )
+            return True
+        except Exception as e:
+            self.logger.error(f"Fingerprint update failed: {str(e)}")
+            return False
+
+    def upsert_many(
+        self,
+        collection_names: List[str],
+        fingerprints: List[List[float]],
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        batch_size: int = 5000
+    ) -> int:
+        """Store many fingerprints keyed by collection name, returns the number written"""
+        updated_at = datetime.now().isoformat()
+        metadatas = metadatas or [{} for _ in collection_names]
+        written = 0
+        for start in range(0, len(collection_names), batch_size):
+            ids = collection_names[start:start + batch_size]
+            self.collection.upsert(
+                ids=ids,
+                embeddings=[self._normalize(v) for v in fingerprints[start:start + batch_size]],
+                metadatas=[
+                    self._entry_metadata(name, metadata, updated_at)
+                    for name, metadata in zip(ids, metadatas[start:start + batch_size])
+                ]
+            )
+            written += len(ids)
+        return written
+
+    def collection_fingerprint(self, collection_name: str, page_size: int = 5000) -> Optional[List[float]]:
+        """
+        Compute a contract collection's fingerprint from its stored embeddings
+
+        Versioned collections use the chunks of their latest version only,
+        like the fingerprint written when that version was ingested.
+
+        Args:
+            collection_name: Contract collection
+            page_size: Embeddings read per request
+
+        Returns:
+            The fingerprint, or None if the collection is missing or empty
+        """
+        # Imported here, database imports this module
+        from .database import VectorDB
+
+        collection = VectorResources.get_collection(collection_name)
+        if collection is None:
+            return None
+        latest = int((collection.metadata or {}).get('latest_version', 0))
+        where = {VectorDB.version_tag(latest): True} if latest else None
+
+        total, count, offset = None, 0, 0
+        while True:
+            page = collection.get(where=where, include=['embeddings'], limit=page_size, offset=offset)
+            embeddings = page['embeddings']
+            if embeddings is None or not len(embeddings):
+                break
+            matrix = np.asarray(embeddings, dtype=np.float32)
+            total = matrix.sum(axis=0) if total is None else total + matrix.sum(axis=0)
+            count += len(matrix)
+            offset += len(matrix)
+            if len(matrix) < page_size:
+                break
+        return self._normalize(total / count) if count else None
+
+    def backfill(self, rebuild: bool = False) -> Dict[str, int]:
+        """
+        Fingerprint contract collections that have no entry
+
+        Also removes entries whose key is not an existing collection:
+        deleted contracts, and versioned contracts keyed by contract id
+        before entries were keyed by collection name.
+
+        Args:
+            rebuild: Recompute every collection's fingerprint
+
+        Returns:
+            Counts of written, skipped, removed and failed entries
+        """
+        stats = {'written': 0, 'skipped': 0, 'removed': 0, 'failed': 0}
+        names = [
+            getattr(collection, 'name', collection)
+            for collection in VectorResources.get_client().list_collections()
+        ]
+        names = [name for name in names if name != self.collection_name]
+        existing = set(self.collection.get(include=[])['ids'])
+
+        orphaned = list(existing - set(names))
+        if orphaned:
+            self.collection.delete(ids=orphaned)
+            stats['removed'] = len(orphaned)
+
+        for name in names:
+            if name in existing and not rebuild:
+                stats['skipped'] += 1
+                continue
+            try:
+                fingerprint = self.collection_fingerprint(name)
+            except Exception as e:
+                self.logger.error(f"Fingerprint backfill failed for {name}: {str(e)}")
+                stats['failed'] += 1
+                continue
+            if fingerprint is None:
+                stats['skipped'] += 1
+            elif self.upsert(name, fingerprint, {'source': 'backfill'}):
+                stats['written'] += 1
+            else:
+                stats['failed'] += 1
+
+        self.logger.info(f"Fingerprint backfill: {stats}")
+        return stats
+
+    def remove(self, collection_name: str) -> None:
+        try:
+            self.collection.delete(ids=[collection_name])
+        except Exception as e:
+            self.logger.error(f"Fingerprint removal failed: {str(e)}")
+
+    def remove_collection(self, collection_name: str) -> None:
+        """Remove fingerprints of contracts stored in a collection"""
+        try:
+            self.collection.delete(where={'collection_name': collection_name})
+        except Exception as e:
+            self.logger.error(f"Fingerprint removal failed: {str(e)}")
+
+    def count(self) -> int:
+        return self.collection.count()
+
+    def query(
+        self,
+        fingerprint: List[float],
+        top_k: int = 5,
+        min_similarity: float = 0.0,
+        exclude_ids: Optional[Iterable[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Find the contracts most similar to a fingerprint
+
+        Args:
+            fingerprint: Query fingerprint
+            top_k: Maximum number of contracts to return
+            min_similarity: Minimum cosine similarity
+            exclude_ids: Collection names to leave out (e.g. the query contract)
+
+        Returns:
+            Matches ordered by descending similarity
+        """
+        vector = self._normalize(fingerprint) if fingerprint is not None else None
+        total = self.count()
+        if vector is None or not total:
+            return []
+
+        exclude = set(exclude_ids or [])
+        results = self.collection.query(
+            query_embeddings=[vector],
+            n_results=min(top_k + len(exclude), total),
+            include=['distances', 'metadatas']
+        )
+
+        matches = []
+        for collection_name, distance, metadata in zip(
+            results['ids'][0], results['distances'][0], results['metadatas'][0]
+        ):
+            if collection_name in exclude:
+                continue
+            # Cosine space distance is 1 - cosine similarity
+            similarity = 1.0 - float(distance)
+            if similarity < min_similarity:
+                break
+            metadata = metadata or {}
+            matches.append({
+                'collection_name': collection_name,
+                'contract_id': metadata.get('contract_id', collection_name),
+                'similarity_score': round(similarity, 4),
+                'metadata': metadata
+            })
+            if len(matches) >= top_k:
+                break
+        return matches
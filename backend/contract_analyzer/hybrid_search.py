@@ -0,0 +1,276 @@
+# hybrid_search.py
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Set
+from collections import Counter, OrderedDict
+from pathlib import Path
+from threading import Lock
+import json
+import logging
+import math
+import os
+import re
+
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+
+# Keeps section numbers like "12.3" together with the words around them
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:\.[0-9]+)*")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or shall "
+    "that the this to under was were will with which any all such".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word and section-number tokens without stopwords"""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Okapi BM25 inverted index over the chunks of one collection.
+
+    Holds term frequencies per chunk id, so chunks can be added, replaced
+    and removed incrementally as documents are ingested.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.doc_lengths: Dict[str, int] = {}
+        self.total_length = 0
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def add(self, ids: List[str], texts: List[str]) -> None:
+        """Add or replace chunks"""
+        tokenized = [(doc_id, tokenize(text)) for doc_id, text in zip(ids, texts)]
+        with self._lock:
+            self._remove_locked(ids)
+            for doc_id, tokens in tokenized:
+                self.doc_lengths[doc_id] = len(tokens)
+                self.total_length += len(tokens)
+                for term, freq in Counter(tokens).items():
+                    self.postings.setdefault(term, {})[doc_id] = freq
+
+    def remove(self, ids: Iterable[str]) -> None:
+        """Remove chunks"""
+        with self._lock:
+            self._remove_locked(ids)
+
+    def _remove_locked(self, ids: Iterable[str]) -> None:
+        ids = {doc_id for doc_id in ids if doc_id in self.doc_lengths}
+        if not ids:
+            return
+        for term in list(self.postings):
+            docs = self.postings[term]
+            for doc_id in ids & docs.keys():
+                del docs[doc_id]
+            if not docs:
+                del self.postings[term]
+        for doc_id in ids:
+            self.total_length -= self.doc_lengths.pop(doc_id)
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 10,
+        allowed_ids: Optional[Set[str]] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Score chunks against a query
+
+        Args:
+            query: Query text
+            top_k: Number of hits to return
+            allowed_ids: Only score these chunks, e.g. one document version
+
+        Returns:
+            (chunk id, BM25 score) pairs, best first
+        """
+        terms = set(tokenize(query))
+        scores: Dict[str, float] = {}
+        with self._lock:
+            if not self.doc_lengths:
+                return []
+            n_docs = len(self.doc_lengths)
+            avg_length = self.total_length / n_docs or 1.0
+
+            for term in terms:
+                docs = self.postings.get(term)
+                if not docs:
+                    continue
+                idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+                for doc_id, freq in docs.items():
+                    if allowed_ids is not None and doc_id not in allowed_ids:
+                        continue
+                    norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avg_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * freq * (self.k1 + 1) / (freq + norm)
+
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'k1': self.k1,
+                'b': self.b,
+                'postings': {term: dict(docs) for term, docs in self.postings.items()},
+                'doc_lengths': dict(self.doc_lengths)
+            }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BM25Index":
+        index = cls(k1=data.get('k1', 1.5), b=data.get('b', 0.75))
+        index.postings = data.get('postings', {})
+        index.doc_lengths = data.get('doc_lengths', {})
+        index.total_length = sum(index.doc_lengths.values())
+        return index
+
+
+class BM25Store:
+    """
+    Process-wide store of per-collection BM25 indexes.
+
+    Indexes are persisted as JSON files in ``Config.BM25_INDEX_DIR``
+    (``<CHROMA_DB_PATH>/bm25`` by default, next to the Chroma data) and kept
+    in a small LRU of loaded indexes.
+    """
+
+    _lock = Lock()
+    _indexes: "OrderedDict[str, BM25Index]" = OrderedDict()
+    _collection_locks: Dict[str, Lock] = {}
+
+    @classmethod
+    def _path(cls, collection_name: str) -> Path:
+        index_dir = Config.BM25_INDEX_DIR or Path(Config.CHROMA_DB_PATH) / "bm25"
+        return Path(index_dir) / f"{collection_name}.json"
+
+    @classmethod
+    def _collection_lock(cls, collection_name: str) -> Lock:
+        with cls._lock:
+            return cls._collection_locks.setdefault(collection_name, Lock())
+
+    @classmethod
+    def get(cls, collection_name: str) -> Optional[BM25Index]:
+        """Get a collection's index, or None if it was never built"""
+        with cls._lock:
+            index = cls._indexes.get(collection_name)
+            if index is not None:
+                cls._indexes.move_to_end(collection_name)
+                return index
+
+        with cls._collection_lock(collection_name):
+            return cls._load_locked(collection_name)
+
+    @classmethod
+    def update(cls, collection_name: str, ids: List[str], texts: List[str]) -> BM25Index:
+        """Add chunks to a collection's index and persist it"""
+        with cls._collection_lock(collection_name):
+            index = cls._load_locked(collection_name)
+            if index is None:
+                index = BM25Index()
+                cls._remember(collection_name, index)
+            index.add(ids, texts)
+            cls._save(collection_name, index)
+        return index
+
+    @classmethod
+    def remove(cls, collection_name: str, ids: List[str]) -> None:
+        """Remove chunks from a collection's index and persist it"""
+        with cls._collection_lock(collection_name):
+            index = cls._load_locked(collection_name)
+            if index is None:
+                return
+            index.remove(ids)
+            cls._save(collection_name, index)
+
+    @classmethod
+    def _load_locked(cls, collection_name: str) -> Optional[BM25Index]:
+        """Load an index; the caller holds the collection's lock"""
+        with cls._lock:
+            if collection_name in cls._indexes:
+                return cls._indexes[collection_name]
+        path = cls._path(collection_name)
+        if not path.exists():
+            return None
+        try:
+            index = BM25Index.from_dict(json.loads(path.read_text(encoding="utf-8")))
+        except Exception as e:
+            logger.error(f"Failed to load BM25 index {path}: {str(e)}")
+            return None
+        cls._remember(collection_name, index)
+        return index
+
+    @classmethod
+    def delete(cls, collection_name: str) -> None:
+        """Drop a collection's index"""
+        with cls._collection_lock(collection_name):
+            with cls._lock:
+                cls._indexes.pop(collection_name, None)
+            cls._path(collection_name).unlink(missing_ok=True)
+
+    @classmethod
+    def _remember(cls, collection_name: str, index: BM25Index) -> None:
+        with cls._lock:
+            cls._indexes[collection_name] = index
+            cls._indexes.move_to_end(collection_name)
+            while len(cls._indexes) > Config.BM25_INDEX_CACHE_SIZE:
+                cls._indexes.popitem(last=False)
+
+    @classmethod
+    def _save(cls, collection_name: str, index: BM25Index) -> None:
+        path = cls._path(collection_name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(index.to_dict()), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """
+    Fuse ranked id lists with reciprocal-rank fusion
+
+    Args:
+        rankings: Id lists, each ordered best first
+        k: RRF damping constant
+
+    Returns:
+        (id, fused score) pairs, best first
+    """
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class CrossEncoderReranker:
+    """Lazily loaded CPU cross-encoder shared by the process"""
+
+    _lock = Lock()
+    _model = None
+
+    @classmethod
+    def get_model(cls):
+        with cls._lock:
+            if cls._model is None:
+                from sentence_transformers import CrossEncoder
+                cls._model = CrossEncoder(Config.RERANK_MODEL, device="cpu")
+                logger.info(f"Loaded reranker: {Config.RERANK_MODEL}")
+            return cls._model
+
+    @classmethod
+    def rerank(cls, query: str, documents: List[str]) -> List[float]:
+        """Relevance score of each document for the query"""
+        if not documents:
+            return []
+        scores = cls.get_model().predict(
+            [(query, document) for document in documents],
+            batch_size=Config.EMBEDDING_BATCH_SIZE,
+            show_progress_bar=False
+        )
+        return [float(score) for score in scores]
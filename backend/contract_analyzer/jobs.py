@@ -0,0 +1,281 @@
+# jobs.py
+from typing import Dict, Any, Optional, Callable, List
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, Future
+from contextlib import contextmanager
+from threading import BoundedSemaphore, Lock
+from enum import Enum
+import logging
+import time
+import uuid
+
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class JobStatus(Enum):
+    """Background job states"""
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+@dataclass
+class Job:
+    """Background job record"""
+    job_id: str
+    job_type: str
+    status: JobStatus = JobStatus.PENDING
+    stage: Optional[str] = None
+    progress: float = 0.0
+    message: str = ""
+    result: Any = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    future: Optional[Future] = field(default=None, repr=False)
+    # Every progress update in order, for streaming to clients
+    events: List[Dict[str, Any]] = field(default_factory=list, repr=False)
+    _readers: int = field(default=0, repr=False)
+    _events_compacted: bool = field(default=False, repr=False)
+    _events_lock: Lock = field(default_factory=Lock, repr=False)
+
+    def update_progress(
+        self,
+        stage: Optional[str] = None,
+        progress: Optional[float] = None,
+        message: Optional[str] = None,
+        **details: Any
+    ) -> None:
+        """
+        Record progress reported by the running task
+
+        Args:
+            stage: Current stage, e.g. "ocr" or "embedding"
+            progress: Overall progress between 0 and 1
+            message: Human-readable status
+            details: Extra event fields, e.g. per-page OCR results with
+                ``type="page"``. Events that don't set stage, progress or
+                message (such as streamed tokens) carry only their details.
+        """
+        event = {'type': details.pop('type', 'progress')}
+        if stage is not None or progress is not None or message is not None:
+            if stage is not None:
+                self.stage = stage
+            if progress is not None:
+                self.progress = max(0.0, min(1.0, progress))
+            if message is not None:
+                self.message = message
+            event.update({
+                'stage': self.stage,
+                'progress': round(self.progress, 3),
+                'message': self.message
+            })
+        event.update(details)
+        self.events.append(event)
+
+    def events_since(self, cursor: int) -> List[Dict[str, Any]]:
+        """Events recorded after the first ``cursor`` ones"""
+        return self.events[cursor:]
+
+    def add_reader(self) -> None:
+        """Keep the full event history until ``release_reader``"""
+        with self._events_lock:
+            self._readers += 1
+
+    def release_reader(self) -> None:
+        with self._events_lock:
+            self._readers -= 1
+        self.compact_events()
+
+    @contextmanager
+    def reading_events(self, registered: bool = False):
+        """
+        Keep the full event history while a stream reads it by cursor
+
+        Args:
+            registered: The reader was added when the job was submitted
+                (see ``JobManager.submit_streamed``); it is released here
+        """
+        if not registered:
+            self.add_reader()
+        try:
+            yield
+        finally:
+            self.release_reader()
+
+    def compact_events(self) -> None:
+        """
+        Shrink the history of a finished job nobody is streaming
+
+        Streamed tokens and page text are dropped: the result holds both,
+        and the job is kept for the whole TTL. Later replays get the
+        progress and page events without ``text``.
+        """
+        with self._events_lock:
+            if not self.done or self._readers or self._events_compacted:
+                return
+            self.events = [
+                {k: v for k, v in event.items() if k != 'text'}
+                for event in self.events
+                if event.get('type') != 'token'
+            ]
+            self._events_compacted = True
+
+    @property
+    def done(self) -> bool:
+        return self.status in (JobStatus.COMPLETED, JobStatus.FAILED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Status view of the job (without the result payload)"""
+        return {
+            'job_id': self.job_id,
+            'job_type': self.job_type,
+            'status': self.status.value,
+            'stage': self.stage,
+            'progress': round(self.progress, 3),
+            'message': self.message,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+
+
+class StageLimiter:
+    """Per-stage concurrency limits shared by every job in the process"""
+
+    _semaphores: Dict[str, BoundedSemaphore] = {}
+    _lock = Lock()
+
+    @classmethod
+    def _get_semaphore(cls, stage: str) -> BoundedSemaphore:
+        with cls._lock:
+            if stage not in cls._semaphores:
+                limit = Config.JOB_CONFIG.stage_limits.get(stage, 1)
+                cls._semaphores[stage] = BoundedSemaphore(max(1, limit))
+            return cls._semaphores[stage]
+
+    @classmethod
+    @contextmanager
+    def limit(cls, stage: str):
+        """Hold one slot of the given stage (e.g. "ocr", "embedding", "llm")"""
+        semaphore = cls._get_semaphore(stage)
+        semaphore.acquire()
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+
+class JobManager:
+    """Runs blocking work on a bounded executor and tracks its progress"""
+
+    def __init__(self, max_workers: Optional[int] = None, job_ttl_minutes: Optional[int] = None):
+        self.max_workers = max_workers or Config.JOB_CONFIG.max_workers
+        self.job_ttl_seconds = 60 * (job_ttl_minutes or Config.JOB_CONFIG.job_ttl_minutes)
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="job"
+        )
+        self._jobs: Dict[str, Job] = {}
+        self._lock = Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def submit(
+        self,
+        job_type: str,
+        func: Callable[..., Any],
+        *args: Any,
+        **kwargs: Any
+    ) -> Job:
+        """
+        Submit a job for background execution
+
+        Args:
+            job_type: Label for the kind of work (e.g. "upload", "analysis")
+            func: Callable to run. It receives the job's progress callback as
+                ``progress_callback`` keyword argument.
+
+        Returns:
+            The created job
+        """
+        return self._submit(job_type, func, args, kwargs, readers=0)
+
+    def submit_streamed(
+        self,
+        job_type: str,
+        func: Callable[..., Any],
+        *args: Any,
+        **kwargs: Any
+    ) -> Job:
+        """
+        Submit a job whose events a stream will read from the start
+
+        The stream's reader is registered before the job runs, so a job that
+        finishes before the stream starts keeps its full event history. The
+        stream releases it with ``job.reading_events(registered=True)``.
+        """
+        return self._submit(job_type, func, args, kwargs, readers=1)
+
+    def _submit(
+        self,
+        job_type: str,
+        func: Callable[..., Any],
+        args: tuple,
+        kwargs: Dict[str, Any],
+        readers: int
+    ) -> Job:
+        self._purge_expired()
+
+        job = Job(job_id=uuid.uuid4().hex, job_type=job_type, _readers=readers)
+        with self._lock:
+            self._jobs[job.job_id] = job
+
+        job.future = self._executor.submit(self._run, job, func, args, kwargs)
+        self.logger.info(f"Submitted {job_type} job: {job.job_id}")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Get job by ID"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self) -> Dict[str, Dict[str, Any]]:
+        """Status of all tracked jobs"""
+        with self._lock:
+            return {job_id: job.to_dict() for job_id, job in self._jobs.items()}
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting jobs and optionally wait for running ones"""
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, job: Job, func: Callable[..., Any], args: tuple, kwargs: Dict[str, Any]) -> Any:
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time()
+        try:
+            job.result = func(*args, progress_callback=job.update_progress, **kwargs)
+            job.status = JobStatus.COMPLETED
+            job.progress = 1.0
+            return job.result
+        except Exception as e:
+            self.logger.error(f"Job {job.job_id} failed: {str(e)}")
+            job.error = str(e)
+            job.status = JobStatus.FAILED
+            raise
+        finally:
+            job.finished_at = time.time()
+            job.compact_events()
+
+    def _purge_expired(self) -> None:
+        cutoff = time.time() - self.job_ttl_seconds
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job.done and job.finished_at and job.finished_at < cutoff
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
@@ -1,18 +1,18 @@
 from pathlib import Path
-from typing import Dict, Any, Optional, List, Union
+from typing import Dict, Any, Optional, List, Union, BinaryIO
 import logging
 from dataclasses import dataclass
 from enum import Enum
-import os
 import time
 from concurrent.futures import ThreadPoolExecutor
-import tempfile
 
 from Doc_Processor.document_handler import DocumentHandler
 from Doc_Processor.config_validator import validate_config
 from .config import Config, ProcessorConfig
 from .error_handler import handle_errors, DocumentProcessError
 from .database import VectorDB
+from .version_manager import VersionDatabaseManager
+from .upload_spool import UploadSpool
 
 logger = logging.getLogger(__name__)
 
@@ -49,6 +49,7 @@ class ContractProcessor:
         self.config = config or Config.PROCESSOR_CONFIG
         self.vector_db = vector_db
         self.doc_handler = self._initialize_handler()
+        self.upload_spool = UploadSpool(self.config.upload_spool_dir, self.config.upload_chunk_size)
         self.logger = logging.getLogger(__name__)
 
     @handle_errors(error_type=DocumentProcessError, default_return=None)
@@ -59,7 +60,11 @@ class ContractProcessor:
                 'pdf': {
                     'ocr_enabled': self.config.ocr_enabled,
                     'language': self.config.language,
-                    'dpi': self.config.dpi
+                    'dpi': self.config.dpi,
+                    'parallel_ocr': self.config.parallel_ocr,
+                    'ocr_workers': self.config.ocr_workers,
+                    'ocr_queue_size': self.config.ocr_queue_size,
+                    'parallel_ocr_use_gpu': self.config.parallel_ocr_use_gpu
                 },
                 'image': {
                     'ocr_language': self.config.language,
@@ -79,23 +84,25 @@ class ContractProcessor:
 
     def process_contract(
         self, 
-        file_data: bytes, 
+        file_data: Union[bytes, BinaryIO], 
         filename: str,
-        stage: ContractStage = ContractStage.DRAFT
+        stage: ContractStage = ContractStage.DRAFT,
+        contract_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Process contract document with metadata tracking.
         
         Args:
-            file_data: Raw file bytes
+            file_data: Raw file bytes, or a binary file object read in chunks
             filename: Original filename
             stage: Current contract stage
+            contract_id: Existing contract to add the document to as a new
+                version; only chunks changed since its last version are embedded
             
         Returns:
             Dictionary containing processed content and metadata
         """
-        tmp_file = None
-        tmp_path = None
+        upload = None
 
         try:
             # Validate file extension
@@ -103,15 +110,11 @@ class ContractProcessor:
             if not self._validate_extension(file_path):
                 raise DocumentProcessError(f"Unsupported file type: {file_path.suffix}")
 
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix=file_path.suffix) as tmp_file:
-                tmp_path = Path(tmp_file.name)
-                tmp_file.write(file_data)
-                tmp_file.flush()
-                os.fsync(tmp_file.fileno())
+            # Spool to a unique file; the hash is computed while writing
+            upload = self.upload_spool.spool(file_data, filename)
 
             # Process document using Doc_Processor
-            result = self.doc_handler.process_document(tmp_path)
+            result = self.doc_handler.process_document(upload.path, file_hash=upload.sha256)
             
             if not self._validate_result(result):
                 raise DocumentProcessError("Invalid processing result")
@@ -120,17 +123,35 @@ class ContractProcessor:
             processed_data = self._extract_content(result)
             
             # Store in vector database
-            collection_name = f"contract_{time.time()}"
-            logging.info(f"saving to collection {collection_name}")
-            if self.vector_db.create_collection(collection_name):
-                if not self.vector_db.add_documents([processed_data['content']]):
-                    self.logger.warning("Failed to add document to vector database")
+            version = 1
+            if contract_id:
+                # Numbered and recorded in the version manifest like any other version
+                versions = VersionDatabaseManager(self.vector_db)
+                created = versions.create_new_version(
+                    contract_id,
+                    processed_data['content'],
+                    author="contract_processor",
+                    comments=f"Uploaded {filename}",
+                    status=stage.value
+                )
+                if created is None:
+                    raise DocumentProcessError(f"Failed to store new version of contract {contract_id}")
+                version = created.version_number
+                processed_data['ingest_stats'] = versions.last_ingest_stats.to_dict()
+            else:
+                collection_name = f"contract_{time.time()}"
+                logging.info(f"saving to collection {collection_name}")
+                if self.vector_db.create_collection(collection_name):
+                    if not self.vector_db.add_documents([processed_data['content']]):
+                        self.logger.warning("Failed to add document to vector database")
 
             # Add metadata
             processed_data['metadata'] = self._create_metadata(
                 filename=filename,
                 stage=stage,
-                file_info=processed_data['file_info']
+                file_info=processed_data['file_info'],
+                contract_id=contract_id,
+                version=version
             )
 
             return processed_data
@@ -140,12 +161,9 @@ class ContractProcessor:
             raise DocumentProcessError(str(e))
 
         finally:
-            # Cleanup temporary file
-            if tmp_path and tmp_path.exists():
-                try:
-                    tmp_path.unlink()
-                except Exception as e:
-                    self.logger.warning(f"Failed to cleanup temporary file: {str(e)}")
+            # Cleanup spooled file
+            if upload is not None:
+                upload.cleanup()
 
     def process_batch(
         self, 
@@ -211,13 +229,10 @@ class ContractProcessor:
         try:
             # If new file provided, process it
             if file_data and filename:
-                result = self.process_contract(file_data, filename, new_stage)
-                
-                # Update metadata
-                result['metadata']['contract_id'] = contract_id
-                result['metadata']['version'] += 1
-                
-                return result
+                # Re-ingests only the chunks that changed since the last version
+                return self.process_contract(
+                    file_data, filename, new_stage, contract_id=contract_id
+                )
             
             # Otherwise just update stage in metadata
             collection = self.vector_db.active_collection
@@ -294,14 +309,16 @@ class ContractProcessor:
         self, 
         filename: str,
         stage: ContractStage,
-        file_info: Dict[str, Any]
+        file_info: Dict[str, Any],
+        contract_id: Optional[str] = None,
+        version: int = 1
     ) -> ContractMetadata:
         """Create metadata for processed contract"""
         timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
         return ContractMetadata(
-            contract_id=f"contract_{time.time()}",
+            contract_id=contract_id or f"contract_{time.time()}",
             stage=stage,
-            version=1,
+            version=version,
             created_at=timestamp,
             modified_at=timestamp,
             processed_by=["contract_processor"],
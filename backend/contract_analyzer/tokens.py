@@ -0,0 +1,30 @@
+# tokens.py
+from functools import lru_cache
+from typing import Optional
+import tiktoken
+
+from .config import Config
+
+
+@lru_cache(maxsize=4)
+def get_encoding(encoding_name: Optional[str] = None) -> tiktoken.Encoding:
+    """Get (and cache) the tiktoken encoding used for prompt budgeting"""
+    return tiktoken.get_encoding(encoding_name or Config.ENCODING_NAME)
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens in text"""
+    if not text:
+        return 0
+    return len(get_encoding().encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Truncate text to at most ``max_tokens`` tokens"""
+    if not text or max_tokens <= 0:
+        return ""
+    encoding = get_encoding()
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
@@ -0,0 +1,136 @@
+# upload_spool.py
+from typing import Optional, Union, BinaryIO
+from dataclasses import dataclass
+from pathlib import Path
+import hashlib
+import logging
+import re
+import shutil
+import tempfile
+
+from .config import Config
+from .error_handler import DocumentProcessError
+
+logger = logging.getLogger(__name__)
+
+
+class UploadTooLargeError(DocumentProcessError):
+    """Upload exceeded the size limit while it was being spooled"""
+    def __init__(self, limit: int):
+        self.limit = limit
+        super().__init__(f"File size exceeds the {limit // (1024 * 1024)}MB limit")
+
+
+@dataclass
+class SpooledUpload:
+    """An upload written to its own spool directory"""
+    path: Path
+    size: int
+    sha256: str
+
+    @property
+    def directory(self) -> Path:
+        return self.path.parent
+
+    def cleanup(self) -> None:
+        """Remove the upload's spool directory"""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class UploadSpool:
+    """
+    Streams uploads to disk in fixed-size chunks.
+
+    Each upload gets a unique directory under the spool root and keeps its
+    original (sanitized) file name, so concurrent uploads of the same file
+    never collide. The SHA-256 is computed while writing, which saves the
+    extraction cache from hashing the file again, and the size limit is
+    enforced as bytes arrive, so memory use is one chunk per upload.
+    """
+
+    def __init__(
+        self,
+        root: Optional[Union[str, Path]] = None,
+        chunk_size: Optional[int] = None,
+        max_bytes: Optional[int] = None
+    ):
+        self.root = Path(root or Config.PROCESSOR_CONFIG.upload_spool_dir)
+        self.chunk_size = chunk_size or Config.PROCESSOR_CONFIG.upload_chunk_size
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def safe_filename(filename: str) -> str:
+        """File name without directories or characters unsafe on disk"""
+        name = Path(filename or "").name
+        name = re.sub(r"[^A-Za-z0-9._-]", "_", name).lstrip(".")
+        return name or "upload"
+
+    def _open(self, filename: str):
+        self.root.mkdir(parents=True, exist_ok=True)
+        directory = Path(tempfile.mkdtemp(prefix="upload_", dir=self.root))
+        path = directory / self.safe_filename(filename)
+        return path, open(path, "wb")
+
+    def _check_size(self, size: int) -> None:
+        if self.max_bytes is not None and size > self.max_bytes:
+            raise UploadTooLargeError(self.max_bytes)
+
+    def spool(self, source: Union[bytes, BinaryIO], filename: str) -> SpooledUpload:
+        """
+        Write bytes or a readable binary stream to the spool
+
+        Args:
+            source: File bytes, or a file object read in chunks
+            filename: Original file name
+
+        Returns:
+            The spooled upload; call cleanup() when done with it
+        """
+        path, out = self._open(filename)
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with out:
+                if isinstance(source, (bytes, bytearray, memoryview)):
+                    view = memoryview(source)
+                    chunks = (view[i:i + self.chunk_size] for i in range(0, len(view), self.chunk_size))
+                else:
+                    chunks = iter(lambda: source.read(self.chunk_size), b"")
+                for chunk in chunks:
+                    size += len(chunk)
+                    self._check_size(size)
+                    digest.update(chunk)
+                    out.write(chunk)
+        except BaseException:
+            shutil.rmtree(path.parent, ignore_errors=True)
+            raise
+        return SpooledUpload(path=path, size=size, sha256=digest.hexdigest())
+
+    async def spool_async(self, source, filename: str) -> SpooledUpload:
+        """
+        Write an async readable (e.g. a Starlette UploadFile) to the spool
+
+        Args:
+            source: Object with an async read(size) method
+            filename: Original file name
+
+        Returns:
+            The spooled upload; call cleanup() when done with it
+        """
+        path, out = self._open(filename)
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with out:
+                while True:
+                    chunk = await source.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    self._check_size(size)
+                    digest.update(chunk)
+                    out.write(chunk)
+        except BaseException:
+            shutil.rmtree(path.parent, ignore_errors=True)
+            raise
+        return SpooledUpload(path=path, size=size, sha256=digest.hexdigest())
@@ -0,0 +1,183 @@
+# vector_resources.py
+from typing import Optional, Dict, Any
+from collections import OrderedDict
+from threading import Lock
+import gc
+import logging
+import os
+import time
+
+import chromadb
+try:
+    from chromadb.errors import NotFoundError
+except ImportError:  # chromadb < 1.0 raises ValueError for missing collections
+    NotFoundError = ValueError
+from sentence_transformers import SentenceTransformer
+
+from .config import Config
+from .embedding import EmbeddingPipeline, SentenceEmbeddingFunction
+
+logger = logging.getLogger(__name__)
+
+
+class VectorResources:
+    """
+    Process-wide Chroma client and embedding model.
+
+    Every VectorDB in a worker process shares one PersistentClient and one
+    loaded SentenceTransformer. Both are created lazily on first use, or
+    eagerly with ``prewarm`` at startup, and released with ``shutdown``.
+
+    Resolved collection handles are cached by name, so checking whether a
+    collection exists doesn't list every collection in the database.
+    Creating or deleting a collection through VectorDB keeps the cache in
+    step. A handle goes stale when another process deletes or recreates its
+    collection; VectorDB's read paths then drop it with
+    ``invalidate_collection`` and retry once on a freshly resolved handle.
+    """
+
+    _lock = Lock()
+    _client: Optional[Any] = None
+    _client_path: Optional[str] = None
+    _model: Optional[SentenceTransformer] = None
+    _embedding_fn: Optional[SentenceEmbeddingFunction] = None
+    _pipeline: Optional[EmbeddingPipeline] = None
+    _load_times: Dict[str, float] = {}
+    _collections: "OrderedDict[str, Any]" = OrderedDict()
+    _collections_lock = Lock()
+
+    @classmethod
+    def get_client(cls):
+        """Get the shared Chroma client"""
+        with cls._lock:
+            db_path = str(Config.CHROMA_DB_PATH)
+            if cls._client is None or cls._client_path != db_path:
+                start = time.perf_counter()
+                os.makedirs(db_path, exist_ok=True)
+                cls._client = chromadb.PersistentClient(path=db_path)
+                cls._client_path = db_path
+                cls._load_times['client'] = time.perf_counter() - start
+                logger.info(f"Opened Chroma client at {db_path}")
+            return cls._client
+
+    @classmethod
+    def get_embedding_model(cls) -> SentenceTransformer:
+        """Get the shared embedding model"""
+        with cls._lock:
+            if cls._model is None:
+                start = time.perf_counter()
+                cls._model = SentenceTransformer(
+                    Config.VECTOR_EMBEDDING_MODEL,
+                    device=Config.EMBEDDING_DEVICE
+                )
+                cls._embedding_fn = SentenceEmbeddingFunction(
+                    cls._model,
+                    batch_size=Config.EMBEDDING_BATCH_SIZE
+                )
+                cls._pipeline = EmbeddingPipeline(
+                    cls._model,
+                    batch_size=Config.EMBEDDING_BATCH_SIZE
+                )
+                cls._load_times['embedding_model'] = time.perf_counter() - start
+                logger.info(f"Loaded embedding model: {Config.VECTOR_EMBEDDING_MODEL}")
+            return cls._model
+
+    @classmethod
+    def get_embedding_function(cls) -> SentenceEmbeddingFunction:
+        """Get the Chroma embedding function wrapping the shared model"""
+        cls.get_embedding_model()
+        return cls._embedding_fn
+
+    @classmethod
+    def get_embedding_pipeline(cls) -> EmbeddingPipeline:
+        """Get the batched ingestion pipeline using the shared model"""
+        cls.get_embedding_model()
+        return cls._pipeline
+
+    @classmethod
+    def get_collection(cls, name: str, embedding_function=None):
+        """
+        Resolve a collection handle by name
+
+        Args:
+            name: Sanitized collection name
+            embedding_function: Embedding function to attach on a cache miss
+
+        Returns:
+            The collection, or None if it doesn't exist
+        """
+        with cls._collections_lock:
+            collection = cls._collections.get(name)
+            if collection is not None:
+                cls._collections.move_to_end(name)
+                return collection
+
+        try:
+            # Indexed lookup by name, unlike list_collections()
+            if embedding_function is not None:
+                collection = cls.get_client().get_collection(
+                    name=name, embedding_function=embedding_function
+                )
+            else:
+                collection = cls.get_client().get_collection(name=name)
+        except (NotFoundError, ValueError):
+            return None
+
+        cls.cache_collection(collection)
+        return collection
+
+    @classmethod
+    def cache_collection(cls, collection) -> None:
+        """Remember a collection handle, evicting the least recently used"""
+        with cls._collections_lock:
+            cls._collections[collection.name] = collection
+            cls._collections.move_to_end(collection.name)
+            while len(cls._collections) > Config.COLLECTION_HANDLE_CACHE_SIZE:
+                cls._collections.popitem(last=False)
+
+    @classmethod
+    def invalidate_collection(cls, name: Optional[str] = None) -> None:
+        """Forget one cached collection handle, or all of them"""
+        with cls._collections_lock:
+            if name is None:
+                cls._collections.clear()
+            else:
+                cls._collections.pop(name, None)
+
+    @classmethod
+    def prewarm(cls) -> Dict[str, float]:
+        """
+        Open the client, load the model and run one embedding so the first
+        request doesn't pay for it
+
+        Returns:
+            Load times in seconds
+        """
+        start = time.perf_counter()
+        cls.get_client().heartbeat()
+        cls.get_embedding_pipeline().embed(["warm up"])
+        with cls._lock:
+            cls._load_times['prewarm'] = time.perf_counter() - start
+            return dict(cls._load_times)
+
+    @classmethod
+    def is_loaded(cls) -> bool:
+        return cls._client is not None and cls._model is not None
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """Release the shared client and model"""
+        with cls._lock:
+            cls._client = None
+            cls._client_path = None
+            cls._model = None
+            cls._embedding_fn = None
+            cls._pipeline = None
+            cls._load_times = {}
+            cls.invalidate_collection()
+            # PersistentClient instances are cached per path by chromadb
+            system_client = getattr(chromadb.api.client, 'SharedSystemClient', None)
+            if system_client and hasattr(system_client, 'clear_system_cache'):
+                system_client.clear_system_cache()
+        gc.collect()
+        logger.info("Released vector DB resources")
@@ -1,12 +1,13 @@
 # version_control.py
 from dataclasses import dataclass
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Callable
 from datetime import datetime
-import difflib
 import json
 import logging
 from enum import Enum
 
+from .diff_engine import SectionDiffEngine, SectionChange, Segment
+
 class VersionStatus(Enum):
     """Contract version status"""
     DRAFT = "draft"
@@ -22,6 +23,9 @@ class ContractSection:
     content: str
     order: int
     metadata: Dict[str, Any]
+    # Character range of the section body in the version content
+    start: Optional[int] = None
+    end: Optional[int] = None
 
 @dataclass
 class ContractVersion:
@@ -37,6 +41,46 @@ class ContractVersion:
     previous_version: Optional[str]
     sections: Optional[List[ContractSection]] = None
 
+class StoredContractVersion(ContractVersion):
+    """
+    Version built from a version manifest entry.
+
+    The content is read from the store on first access, and sections are
+    built from it only when asked for.
+    """
+
+    def __init__(
+        self,
+        content_loader: Callable[[], Optional[str]],
+        sections_loader: Callable[[str], List[ContractSection]],
+        **fields
+    ):
+        self._content_loader = content_loader
+        self._sections_loader = sections_loader
+        self._content: Optional[str] = None
+        self._sections: Optional[List[ContractSection]] = None
+        super().__init__(content=None, sections=None, **fields)
+
+    @property
+    def content(self) -> str:
+        if self._content is None:
+            self._content = self._content_loader() or ""
+        return self._content
+
+    @content.setter
+    def content(self, value: Optional[str]) -> None:
+        self._content = value
+
+    @property
+    def sections(self) -> List[ContractSection]:
+        if self._sections is None:
+            self._sections = self._sections_loader(self.content)
+        return self._sections
+
+    @sections.setter
+    def sections(self, value: Optional[List[ContractSection]]) -> None:
+        self._sections = value
+
 @dataclass
 class ContractDiff:
     """Contract version differences"""
@@ -51,6 +95,7 @@ class ContractVersionManager:
     
     def __init__(self, vector_db):
         self.vector_db = vector_db
+        self.diff_engine = SectionDiffEngine(self._is_section_header)
         self.logger = logging.getLogger(__name__)
 
     def create_version(
@@ -75,53 +120,75 @@ class ContractVersionManager:
             ContractVersion if successful, None otherwise
         """
         try:
-            # Get existing versions
-            versions = self.get_version_history(contract_id)
-            version_number = len(versions) + 1
-            previous_version = versions[-1].version_id if versions else None
+            # Numbering reads the latest version; hold the contract's lock
+            # until the new one is stored so concurrent creates don't collide
+            with self.vector_db.version_lock(contract_id):
+                # Only the latest manifest entry and its text are needed
+                latest = self.vector_db.get_latest_version(contract_id)
+                version_number = latest['version_number'] + 1 if latest else 1
+                previous_version = latest['version_id'] if latest else None
+                previous_content = (
+                    self.vector_db.get_version_content(contract_id, latest['version_number']) or ""
+                    if latest else ""
+                )
             
-            # Process sections
-            sections = self._extract_sections(content)
+                # Process sections
+                sections = self._extract_sections(content)
             
-            # Create version metadata
-            version = ContractVersion(
-                version_id=f"{contract_id}_v{version_number}",
-                content=content,
-                version_number=version_number,
-                timestamp=datetime.now().isoformat(),
-                author=author,
-                changes=self._compute_changes(content, versions[-1].content if versions else ""),
-                comments=comments,
-                status=status,
-                previous_version=previous_version,
-                sections=sections
-            )
+                # Create version metadata
+                version = ContractVersion(
+                    version_id=f"{contract_id}_v{version_number}",
+                    content=content,
+                    version_number=version_number,
+                    timestamp=datetime.now().isoformat(),
+                    author=author,
+                    changes=self._compute_changes(content, previous_content),
+                    comments=comments,
+                    status=status,
+                    previous_version=previous_version,
+                    sections=sections
+                )
             
-            # Store in database
-            success = self.vector_db.store_contract_version(
-                contract_id,
-                content,
-                self._version_to_metadata(version)
-            )
+                # Store in database
+                success = self.vector_db.store_contract_version(
+                    contract_id,
+                    content,
+                    self._version_to_metadata(version)
+                )
             
-            return version if success else None
+                return version if success else None
             
         except Exception as e:
             self.logger.error(f"Failed to create version: {str(e)}")
             return None
 
     def get_version_history(self, contract_id: str) -> List[ContractVersion]:
-        """Get complete version history"""
+        """
+        Get complete version history
+
+        Built from the contract's version manifest; each version's content
+        is only read when accessed.
+        """
         try:
-            versions = self.vector_db.get_contract_versions(contract_id)
             return [
-                self._metadata_to_version(v['metadata'], v['content'])
-                for v in versions
+                self._manifest_entry_to_version(contract_id, entry)
+                for entry in self.vector_db.get_version_manifest(contract_id)
             ]
         except Exception as e:
             self.logger.error(f"Failed to get version history: {str(e)}")
             return []
 
+    def get_version(self, contract_id: str, version_number: int) -> Optional[ContractVersion]:
+        """Get one version by number"""
+        try:
+            version = self.vector_db.get_contract_version(contract_id, version_number)
+            if not version:
+                return None
+            return self._metadata_to_version(version['metadata'], version['content'])
+        except Exception as e:
+            self.logger.error(f"Failed to get version {version_number}: {str(e)}")
+            return None
+
     def compare_versions(
         self,
         contract_id: str,
@@ -130,49 +197,24 @@ class ContractVersionManager:
     ) -> Optional[ContractDiff]:
         """Compare two versions of a contract"""
         try:
-            versions = self.get_version_history(contract_id)
-            
-            v1 = next((v for v in versions if v.version_number == version1), None)
-            v2 = next((v for v in versions if v.version_number == version2), None)
+            v1 = self.get_version(contract_id, version1)
+            v2 = self.get_version(contract_id, version2)
             
             if not v1 or not v2:
                 raise ValueError("Specified versions not found")
             
-            # Compare full content
-            diff = difflib.ndiff(
-                v1.content.splitlines(keepends=True),
-                v2.content.splitlines(keepends=True)
+            comparison = self.diff_engine.compare(
+                v1.content,
+                v2.content,
+                cache_key=(v1.version_id, v2.version_id)
             )
             
-            additions = []
-            deletions = []
-            modifications = []
-            
-            for line in diff:
-                if line.startswith('+ '):
-                    additions.append(line[2:])
-                elif line.startswith('- '):
-                    deletions.append(line[2:])
-                elif line.startswith('? '):
-                    continue
-            
-            # Compare sections
-            section_changes = self._compare_sections(
-                v1.sections or [],
-                v2.sections or []
-            )
-            
-            # Calculate similarity
-            similarity = difflib.SequenceMatcher(
-                None, v1.content, v2.content
-            ).ratio()
-            
             return ContractDiff(
-                additions=additions,
-                deletions=deletions,
-                modifications=modifications,
-                similarity_score=similarity,
-                section_changes=section_changes
+                additions=comparison.additions,
+                deletions=comparison.deletions,
+                modifications=comparison.modifications,
+                similarity_score=comparison.similarity,
+                section_changes=self._section_changes(comparison.named_sections())
             )
             
         except Exception as e:
@@ -186,19 +228,22 @@ class ContractVersionManager:
     ) -> Dict[str, Any]:
         """Analyze changes in a specific version"""
         try:
-            versions = self.get_version_history(contract_id)
-            current = next(
-                (v for v in versions if v.version_number == version_number), 
-                None
-            )
+            current = self.get_version(contract_id, version_number)
             
             if not current:
                 raise ValueError(f"Version {version_number} not found")
             
-            previous = next(
-                (v for v in versions if v.version_number == version_number - 1),
-                None
-            )
+            previous = self.get_version(contract_id, version_number - 1) if version_number > 1 else None
+            if previous:
+                # Shares the cached comparison with compare_versions
+                comparison = self.diff_engine.compare(
+                    previous.content,
+                    current.content,
+                    cache_key=(previous.version_id, current.version_id)
+                )
+                section_analysis = self._section_analysis(comparison.named_sections())
+            else:
+                section_analysis = self._analyze_section_changes([], current.sections or [])
             
             analysis = {
                 'version_info': {
@@ -208,10 +253,7 @@ class ContractVersionManager:
                     'status': current.status
                 },
                 'changes': current.changes,
-                'section_analysis': self._analyze_section_changes(
-                    previous.sections if previous else [],
-                    current.sections or []
-                ),
+                'section_analysis': section_analysis,
                 'risk_factors': self._identify_risk_factors(current.content)
             }
             
@@ -221,6 +263,19 @@ class ContractVersionManager:
             self.logger.error(f"Failed to analyze changes: {str(e)}")
             return {}
 
+    def _compute_changes(self, new_content: str, old_content: str) -> Dict[str, Any]:
+        """Summarize line-level changes against the previous version"""
+        comparison = self.diff_engine.compare(old_content, new_content)
+        return {
+            'lines_added': len(comparison.additions),
+            'lines_removed': len(comparison.deletions),
+            'sections_changed': sum(
+                1 for change in comparison.named_sections() if change.change_type != 'unchanged'
+            ),
+            'similarity': round(comparison.similarity, 4),
+            'initial_version': not old_content
+        }
+
     def _extract_sections(self, content: str) -> List[ContractSection]:
         """Extract sections from contract content"""
         try:
@@ -228,28 +283,38 @@ class ContractVersionManager:
             current_section = None
             current_content = []
             order = 0
+            position = 0
+            body_start = 0
             
-            for line in content.splitlines():
+            for raw_line in content.splitlines(keepends=True):
+                line = (raw_line.splitlines() or [""])[0]
                 if self._is_section_header(line):
                     if current_section:
                         sections.append(ContractSection(
                             name=current_section,
                             content='\n'.join(current_content),
                             order=order,
-                            metadata={'type': 'standard'}
+                            metadata={'type': 'standard'},
+                            start=body_start,
+                            end=position
                         ))
                         order += 1
-                        current_content = []
+                    # Text before the first header doesn't belong to a section
+                    current_content = []
                     current_section = line.strip()
+                    body_start = position + len(raw_line)
                 else:
                     current_content.append(line)
+                position += len(raw_line)
             
             if current_section and current_content:
                 sections.append(ContractSection(
                     name=current_section,
                     content='\n'.join(current_content),
                     order=order,
-                    metadata={'type': 'standard'}
+                    metadata={'type': 'standard'},
+                    start=body_start,
+                    end=position
                 ))
             
             return sections
@@ -258,6 +323,30 @@ class ContractVersionManager:
             self.logger.error(f"Failed to extract sections: {str(e)}")
             return []
 
+    def _sections_from_metadata(
+        self,
+        section_index: List[Dict[str, Any]],
+        content: str
+    ) -> List[ContractSection]:
+        """Cut sections at their stored offsets, re-extracting only if offsets are missing"""
+        if any(s.get('start') is None for s in section_index):
+            sections = self._extract_sections(content)
+            for section, section_meta in zip(sections, section_index):
+                section.metadata = section_meta['metadata']
+            return sections
+        
+        return [
+            ContractSection(
+                name=s['name'],
+                content='\n'.join(content[s['start']:s['end']].splitlines()),
+                order=s['order'],
+                metadata=s['metadata'],
+                start=s['start'],
+                end=s['end']
+            )
+            for s in section_index
+        ]
+
     def _is_section_header(self, line: str) -> bool:
         """Check if line is a section header"""
         return (
@@ -273,37 +362,11 @@ class ContractVersionManager:
     ) -> Dict[str, Dict[str, Any]]:
         """Compare sections between versions"""
         try:
-            changes = {}
-            sections1_dict = {s.name: s for s in sections1}
-            sections2_dict = {s.name: s for s in sections2}
-            
-            for name in set(sections1_dict.keys()) | set(sections2_dict.keys()):
-                if name not in sections1_dict:
-                    changes[name] = {
-                        'type': 'added',
-                        'content': sections2_dict[name].content
-                    }
-                elif name not in sections2_dict:
-                    changes[name] = {
-                        'type': 'removed',
-                        'content': sections1_dict[name].content
-                    }
-                else:
-                    similarity = difflib.SequenceMatcher(
-                        None,
-                        sections1_dict[name].content,
-                        sections2_dict[name].content
-                    ).ratio()
-                    
-                    if similarity < 1.0:
-                        changes[name] = {
-                            'type': 'modified',
-                            'similarity': similarity,
-                            'old_content': sections1_dict[name].content,
-                            'new_content': sections2_dict[name].content
-                        }
-            
-            return changes
+            comparison = self.diff_engine.compare_segments(
+                self._segments(sections1),
+                self._segments(sections2)
+            )
+            return self._section_changes(comparison.sections)
             
         except Exception as e:
             self.logger.error(f"Failed to compare sections: {str(e)}")
@@ -316,42 +379,65 @@ class ContractVersionManager:
     ) -> Dict[str, Any]:
         """Analyze changes between sections"""
         try:
-            analysis = {
-                'added': [],
-                'removed': [],
-                'modified': [],
-                'unchanged': []
-            }
-            
-            old_dict = {s.name: s for s in old_sections}
-            new_dict = {s.name: s for s in new_sections}
-            
-            for name in set(old_dict.keys()) | set(new_dict.keys()):
-                if name not in old_dict:
-                    analysis['added'].append(name)
-                elif name not in new_dict:
-                    analysis['removed'].append(name)
-                else:
-                    similarity = difflib.SequenceMatcher(
-                        None,
-                        old_dict[name].content,
-                        new_dict[name].content
-                    ).ratio()
-                    
-                    if similarity == 1.0:
-                        analysis['unchanged'].append(name)
-                    else:
-                        analysis['modified'].append({
-                            'name': name,
-                            'similarity': similarity
-                        })
-            
-            return analysis
+            comparison = self.diff_engine.compare_segments(
+                self._segments(old_sections),
+                self._segments(new_sections)
+            )
+            return self._section_analysis(comparison.sections)
             
         except Exception as e:
             self.logger.error(f"Failed to analyze section changes: {str(e)}")
             return {}
 
+    def _segments(self, sections: List[ContractSection]) -> List[Segment]:
+        """Diff engine segments for extracted sections"""
+        return [
+            Segment(
+                key=section.name,
+                name=section.name,
+                content=section.content,
+                digest=self.diff_engine.digest(section.content)
+            )
+            for section in sections
+        ]
+
+    @staticmethod
+    def _section_changes(changes: List[SectionChange]) -> Dict[str, Dict[str, Any]]:
+        """Changed sections in the section_changes format of ContractDiff"""
+        result = {}
+        for change in changes:
+            if change.change_type == 'added':
+                result[change.name] = {'type': 'added', 'content': change.new_content}
+            elif change.change_type == 'removed':
+                result[change.name] = {'type': 'removed', 'content': change.old_content}
+            elif change.change_type == 'modified':
+                result[change.name] = {
+                    'type': 'modified',
+                    'similarity': change.similarity,
+                    'old_content': change.old_content,
+                    'new_content': change.new_content
+                }
+        return result
+
+    @staticmethod
+    def _section_analysis(changes: List[SectionChange]) -> Dict[str, Any]:
+        """Section names grouped by change type"""
+        analysis = {
+            'added': [],
+            'removed': [],
+            'modified': [],
+            'unchanged': []
+        }
+        for change in changes:
+            if change.change_type == 'modified':
+                analysis['modified'].append({
+                    'name': change.name,
+                    'similarity': change.similarity
+                })
+            else:
+                analysis[change.change_type].append(change.name)
+        return analysis
+
     def _identify_risk_factors(self, content: str) -> List[Dict[str, Any]]:
         """Identify potential risk factors in content"""
         risk_factors = []
@@ -377,7 +463,9 @@ class ContractVersionManager:
             'sections': json.dumps([{
                 'name': s.name,
                 'order': s.order,
-                'metadata': s.metadata
+                'metadata': s.metadata,
+                'start': s.start,
+                'end': s.end
             } for s in (version.sections or [])])
         }
 
@@ -387,11 +475,10 @@ class ContractVersionManager:
         content: str
     ) -> ContractVersion:
         """Convert metadata to version"""
-        sections = json.loads(metadata.get('sections', '[]'))
-        section_objects = self._extract_sections(content)
-        
-        for section, section_meta in zip(section_objects, sections):
-            section.metadata = section_meta['metadata']
+        section_objects = self._sections_from_metadata(
+            json.loads(metadata.get('sections', '[]')),
+            content
+        )
         
         return ContractVersion(
             version_id=metadata['version_id'],
@@ -404,4 +491,26 @@ class ContractVersionManager:
             status=metadata['status'],
             previous_version=metadata.get('previous_version'),
             sections=section_objects
-        )
\ No newline at end of file
+        )
+
+    def _manifest_entry_to_version(
+        self,
+        contract_id: str,
+        metadata: Dict[str, Any]
+    ) -> StoredContractVersion:
+        """Convert a manifest entry to a version that loads its content lazily"""
+        version_number = metadata['version_number']
+        section_index = json.loads(metadata.get('sections', '[]'))
+        
+        return StoredContractVersion(
+            content_loader=lambda: self.vector_db.get_version_content(contract_id, version_number),
+            sections_loader=lambda content: self._sections_from_metadata(section_index, content),
+            version_id=metadata['version_id'],
+            version_number=version_number,
+            timestamp=metadata['timestamp'],
+            author=metadata['author'],
+            changes=json.loads(metadata['changes']),
+            comments=metadata['comments'],
+            status=metadata['status'],
+            previous_version=metadata.get('previous_version')
+        )
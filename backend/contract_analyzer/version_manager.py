@@ -3,13 +3,20 @@ from typing import List, Dict, Any, Optional
 import logging
 from datetime import datetime
 from .version_control import ContractVersion, ContractVersionManager
+from .fingerprint_index import ContractFingerprintIndex
+from .version_store import VersionStore
 
 class VersionDatabaseManager:
     """Manages version control database operations"""
 
     def __init__(self, vector_db):
         self.vector_db = vector_db
-        self.version_manager = ContractVersionManager(vector_db)
+        # The version manager stores and reads versions through this class
+        self.version_manager = ContractVersionManager(self)
+        self.fingerprint_index = ContractFingerprintIndex()
+        self.version_store = VersionStore()
+        # Ingest stats of the last version stored through this instance
+        self.last_ingest_stats = None
         self.logger = logging.getLogger(__name__)
 
     def store_contract_version(
@@ -18,83 +25,156 @@ class VersionDatabaseManager:
         content: str, 
         metadata: Dict[str, Any]
     ) -> bool:
-        """Store contract version in database"""
+        """
+        Store contract version in database
+
+        Version numbers come from the contract's manifest in the version
+        store: the next version is the manifest's latest plus one, and a
+        ``version_number`` in the metadata must match it. The contract's
+        lock is held from numbering until the manifest is saved.
+        """
+        self.last_ingest_stats = None
         try:
-            collection_name = f"contract_{self._sanitize_name(contract_id)}"
-            
-            # Create or get collection
-            if not self.vector_db._collection_exists(collection_name):
-                if not self.vector_db.create_collection(collection_name):
-                    return False
-            
-            if not self.vector_db.set_active_collection(collection_name):
-                return False
-            
-            # Add document with metadata
-            return self.vector_db.add_documents([content], [metadata])
-            
+            with self.version_lock(contract_id):
+                return self._store_contract_version(contract_id, content, metadata)
         except Exception as e:
             self.logger.error(f"Version storage failed: {str(e)}")
             return False
 
+    def version_lock(self, contract_id: str):
+        """Lock serializing version numbering and storage of one contract"""
+        return self.version_store.contract_lock(contract_id)
+
+    def _store_contract_version(
+        self,
+        contract_id: str,
+        content: str,
+        metadata: Dict[str, Any]
+    ) -> bool:
+        latest = self.version_store.latest(contract_id)
+        version_number = latest['version_number'] + 1 if latest else 1
+        requested = metadata.get('version_number')
+        if requested is not None and requested != version_number:
+            self.logger.error(
+                f"Version {requested} of {contract_id} doesn't follow the manifest "
+                f"(next version is {version_number})"
+            )
+            return False
+        metadata = {**metadata, 'version_number': version_number}
+
+        collection_name = f"contract_{self._sanitize_name(contract_id)}"
+        
+        # Create or get collection
+        vec = self.vector_db.scoped(collection_name, create=True)
+        if vec is None:
+            return False
+        
+        # Only chunks that changed since earlier versions are embedded
+        stats = vec.add_document_version(
+            content,
+            version=version_number,
+            version_id=metadata.get('version_id')
+        )
+        if stats is None:
+            return False
+        self.version_store.save(contract_id, stats.version, content, metadata)
+        self.last_ingest_stats = stats
+
+        # Latest version represents the contract in the similarity index
+        if stats.mean_embedding is not None:
+            self.fingerprint_index.upsert(
+                collection_name,
+                stats.mean_embedding,
+                {
+                    'contract_id': contract_id,
+                    'version_number': stats.version,
+                    'source': 'version'
+                }
+            )
+        return True
+
     def get_contract_versions(
         self, 
         contract_id: str
     ) -> List[Dict[str, Any]]:
         """Get all versions of a contract"""
         try:
-            collection_name = f"contract_{self._sanitize_name(contract_id)}"
-            if not self.vector_db.set_active_collection(collection_name):
-                return []
-            
-            # Get all documents from collection
-            results = self.vector_db.active_collection.get()
-            versions = []
-            
-            for doc, metadata in zip(results['documents'], results['metadatas']):
-                versions.append({
-                    'content': doc,
-                    'metadata': metadata
-                })
-            
-            return sorted(versions, key=lambda x: x['metadata']['version_number'])
+            return self.version_store.list_versions(contract_id)
             
         except Exception as e:
             self.logger.error(f"Version retrieval failed: {str(e)}")
             return []
 
+    def get_contract_version(
+        self,
+        contract_id: str,
+        version_number: int
+    ) -> Optional[Dict[str, Any]]:
+        """Get one version of a contract without reading the others"""
+        try:
+            return self.version_store.load(contract_id, version_number)
+        except Exception as e:
+            self.logger.error(f"Version retrieval failed: {str(e)}")
+            return None
+
+    def get_version_manifest(self, contract_id: str) -> List[Dict[str, Any]]:
+        """Metadata of all versions of a contract, without their content"""
+        try:
+            return self.version_store.manifest(contract_id)
+        except Exception as e:
+            self.logger.error(f"Version manifest retrieval failed: {str(e)}")
+            return []
+
+    def get_latest_version(self, contract_id: str) -> Optional[Dict[str, Any]]:
+        """Metadata of the newest version of a contract"""
+        try:
+            return self.version_store.latest(contract_id)
+        except Exception as e:
+            self.logger.error(f"Version manifest retrieval failed: {str(e)}")
+            return None
+
+    def get_version_content(self, contract_id: str, version_number: int) -> Optional[str]:
+        """Text of one version of a contract"""
+        try:
+            return self.version_store.load_content(contract_id, version_number)
+        except Exception as e:
+            self.logger.error(f"Version retrieval failed: {str(e)}")
+            return None
+
     def find_similar_contracts(
         self, 
         content: str, 
         min_similarity: float = 0.7, 
         max_results: int = 5
     ) -> List[Dict[str, Any]]:
-        """Find similar contracts in database"""
+        """
+        Find contracts similar to the given content
+
+        Args:
+            content: Contract text to compare against the corpus
+            min_similarity: Minimum cosine similarity of the fingerprints
+            max_results: Maximum number of contracts to return
+
+        Returns:
+            Similar contracts ordered by similarity score
+        """
         try:
-            # Get all contract collections
-            contract_collections = [
-                name for name in self.vector_db.client.list_collections()
-                if name.startswith('contract_')
-            ]
-            
-            similar_contracts = []
-            for collection_name in contract_collections:
-                if self.vector_db.set_active_collection(collection_name):
-                    context = self.vector_db.get_context(content, num_results=1)
-                    if context:
-                        similar_contracts.append({
-                            'contract_id': collection_name.split('_')[1],
-                            'content': context,
-                            'similarity_score': 0.0  # To be calculated by version manager
-                        })
-            
-            # Use version manager to enhance results
-            return self.version_manager.find_similar_contracts(
-                content,
-                similar_contracts,
-                min_similarity,
-                max_results
+            fingerprint = self.vector_db.compute_fingerprint(content)
+            if fingerprint is None:
+                return []
+
+            # One query against the fingerprint index, not one per contract collection
+            matches = self.fingerprint_index.query(
+                fingerprint,
+                top_k=max_results,
+                min_similarity=min_similarity
             )
+            return [{
+                'contract_id': match['contract_id'],
+                'collection_name': match['collection_name'],
+                'similarity_score': match['similarity_score'],
+                'metadata': match['metadata']
+            } for match in matches]
             
         except Exception as e:
             self.logger.error(f"Similarity search failed: {str(e)}")
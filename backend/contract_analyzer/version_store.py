@@ -0,0 +1,132 @@
+# version_store.py
+from typing import List, Dict, Any, Optional, Union
+from pathlib import Path
+from threading import Lock, RLock
+import hashlib
+import json
+import logging
+import os
+
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class VersionStore:
+    """
+    File store of contract version texts and their metadata.
+
+    The vector collection of a contract shares unchanged chunks between
+    versions, so the full text of each version is kept here as a plain text
+    file. A per-contract ``manifest.json`` holds every version's metadata
+    (number, id, parent, section offsets), so listing history or finding
+    the latest version reads the manifest only, never the version texts.
+
+    Writers that number a new version from ``latest`` hold
+    ``contract_lock`` until the version is saved, so concurrent writers of
+    one contract can't allocate the same number.
+    """
+
+    MANIFEST = "manifest.json"
+
+    _lock = Lock()
+    _contract_locks: Dict[str, RLock] = {}
+
+    def __init__(self, root: Optional[Union[str, Path]] = None):
+        self.root = Path(root or Config.VERSION_STORE_DIR)
+        self.logger = logging.getLogger(__name__)
+
+    def _contract_dir(self, contract_id: str) -> Path:
+        safe_id = "".join(c if c.isalnum() else "_" for c in contract_id)
+        return self.root / safe_id
+
+    def contract_lock(self, contract_id: str) -> RLock:
+        """Process-wide lock of one contract's manifest, reentrant for save()"""
+        key = str(self._contract_dir(contract_id).resolve())
+        with self._lock:
+            return self._contract_locks.setdefault(key, RLock())
+
+    @staticmethod
+    def _write_atomic(path: Path, text: str) -> None:
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_text(text, encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def save(
+        self,
+        contract_id: str,
+        version_number: int,
+        content: str,
+        metadata: Dict[str, Any]
+    ) -> None:
+        """Write a version's text and add its metadata to the manifest"""
+        contract_dir = self._contract_dir(contract_id)
+        contract_dir.mkdir(parents=True, exist_ok=True)
+        content_file = f"v{version_number}.txt"
+        self._write_atomic(contract_dir / content_file, content)
+
+        entry = {
+            **metadata,
+            'version_number': version_number,
+            'content_file': content_file,
+            'content_length': len(content),
+            'content_digest': hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+        }
+        with self.contract_lock(contract_id):
+            manifest = [
+                existing for existing in self.manifest(contract_id)
+                if existing['version_number'] != version_number
+            ]
+            manifest.append(entry)
+            manifest.sort(key=lambda item: item['version_number'])
+            self._write_atomic(contract_dir / self.MANIFEST, json.dumps({'versions': manifest}))
+
+    def manifest(self, contract_id: str) -> List[Dict[str, Any]]:
+        """Metadata of every version, oldest first"""
+        path = self._contract_dir(contract_id) / self.MANIFEST
+        if not path.exists():
+            return []
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))['versions']
+        except Exception as e:
+            self.logger.error(f"Failed to read manifest {path}: {str(e)}")
+            return []
+
+    def latest(self, contract_id: str) -> Optional[Dict[str, Any]]:
+        """Metadata of the newest version, or None if there are none"""
+        manifest = self.manifest(contract_id)
+        return manifest[-1] if manifest else None
+
+    def entry(self, contract_id: str, version_number: int) -> Optional[Dict[str, Any]]:
+        """Metadata of one version"""
+        return next(
+            (item for item in self.manifest(contract_id) if item['version_number'] == version_number),
+            None
+        )
+
+    def load_content(self, contract_id: str, version_number: int) -> Optional[str]:
+        """Text of one version, or None if it doesn't exist"""
+        path = self._contract_dir(contract_id) / f"v{version_number}.txt"
+        if not path.exists():
+            return None
+        return path.read_text(encoding="utf-8")
+
+    def load(self, contract_id: str, version_number: int) -> Optional[Dict[str, Any]]:
+        """One version as {'content', 'metadata'}, or None if it doesn't exist"""
+        metadata = self.entry(contract_id, version_number)
+        if metadata is None:
+            return None
+        content = self.load_content(contract_id, version_number)
+        if content is None:
+            self.logger.error(f"Missing text of {contract_id} version {version_number}")
+            return None
+        return {'content': content, 'metadata': metadata}
+
+    def list_versions(self, contract_id: str) -> List[Dict[str, Any]]:
+        """All versions of a contract as {'content', 'metadata'}, oldest first"""
+        versions = []
+        for metadata in self.manifest(contract_id):
+            content = self.load_content(contract_id, metadata['version_number'])
+            if content is not None:
+                versions.append({'content': content, 'metadata': metadata})
+        return versions
@@ -1,16 +1,28 @@
 from fastapi import FastAPI, UploadFile, File, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, Response
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable
+import asyncio
 import json
 import os
-from analyze import perform_analysis as analyze_func
+from analyze import perform_analysis as analyze_func, get_cached_analysis
 from process_document import process_document as process_func
+from contract_analyzer.analysis_cache import AnalysisCache, CachedAnalysis
+from contract_analyzer.agents.response_cache import LLMResponseCache
 from contract_analyzer.config import Config, ModelType
+from contract_analyzer.database import VectorDB
+from contract_analyzer.fingerprint_index import ContractFingerprintIndex
+from contract_analyzer.vector_resources import VectorResources
+from contract_analyzer.jobs import JobManager, Job, JobStatus
+from contract_analyzer.upload_spool import UploadSpool, SpooledUpload, UploadTooLargeError
+from Doc_Processor.processors.ocr_registry import OCREngineRegistry
 
 app = FastAPI()
 
+# Blocking OCR, embedding and LLM work runs here, off the event loop
+job_manager = JobManager()
+
 # Configure CORS
 origins = [
     "http://localhost:4200",
@@ -35,6 +47,8 @@ class AnalysisRequest(BaseModel):
     type: str
     collection_name: Optional[str] = None
     custom_query: Optional[str] = None
+    # Run the analysis again instead of returning a cached result
+    refresh: bool = False
 
 class AnalysisResponse(BaseModel):
     content: str
@@ -43,9 +57,16 @@ class AnalysisResponse(BaseModel):
 class ErrorResponse(BaseModel):
     detail: str
 
+class JobSubmittedResponse(BaseModel):
+    job_id: str
+    status: str
+
 # File size limit (10MB)
 MAX_FILE_SIZE = 10 * 1024 * 1024
 
+# Uploads are streamed to disk in chunks, never held in memory whole
+upload_spool = UploadSpool(max_bytes=MAX_FILE_SIZE)
+
 # Allowed file types
 ALLOWED_FILE_TYPES = {
     '.txt': 'text/plain',
@@ -54,109 +75,249 @@ ALLOWED_FILE_TYPES = {
     '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
 }
 
-async def save_upload_file(file: UploadFile) -> str:
-    """Save uploaded file and return the file path."""
-    # Check file size
-    contents = await file.read()
-    if len(contents) > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=413,
-            detail="File size exceeds the 10MB limit"
-        )
-    
+# Frontend analysis type -> backend analysis type
+ANALYSIS_TYPE_MAPPING = {
+    'contract_review': 'Contract Review',
+    'information_extraction': 'Information Extraction',
+    'legal_research': 'Legal Research',
+    'risk_assessment': 'Risk Assessment',
+    'contract_summary': 'Contract Summary',
+    'custom_analysis': 'Custom Analysis'
+}
+
+async def save_upload_file(file: UploadFile) -> SpooledUpload:
+    """Stream an uploaded file to its own spool directory and return it."""
     # Check file type
-    file_ext = os.path.splitext(file.filename)[1].lower()
+    file_ext = os.path.splitext(file.filename or "")[1].lower()
     if file_ext not in ALLOWED_FILE_TYPES:
         raise HTTPException(
             status_code=415,
             detail=f"Unsupported file type. Allowed types: {', '.join(ALLOWED_FILE_TYPES.keys())}"
         )
 
-    temp_path = f"temp_{file.filename}"
+    # Reject before reading when the size is already known
+    if getattr(file, "size", None) is not None and file.size > MAX_FILE_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail="File size exceeds the 10MB limit"
+        )
+
     try:
-        with open(temp_path, "wb") as buffer:
-            buffer.write(contents)
-        return temp_path
+        return await upload_spool.spool_async(file, file.filename)
+    except UploadTooLargeError:
+        raise HTTPException(
+            status_code=413,
+            detail="File size exceeds the 10MB limit"
+        )
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Failed to save uploaded file: {str(e)}"
         )
 
-@app.post("/api/upload", response_model=AnalysisResponse)
-async def upload_file(file: UploadFile = File(...)):
-    temp_path = None
+def run_upload(upload: SpooledUpload, progress_callback: Optional[Callable[..., None]] = None) -> Dict[str, Any]:
+    """Process a spooled upload and remove its spool directory afterwards."""
     try:
-        # Save and validate file
-        temp_path = await save_upload_file(file)
-        
-        # Process document
-        content, collection_name = process_func(temp_path)
-        
+        content, collection_name = process_func(
+            upload.path,
+            file_hash=upload.sha256,
+            progress_callback=progress_callback
+        )
+
         if not content or not collection_name:
-            raise HTTPException(
-                status_code=500,
-                detail="Failed to process document"
-            )
-        
+            raise RuntimeError("Failed to process document")
+
         return {
             "content": content,
             "collection_name": collection_name
         }
-        
-    except HTTPException as he:
-        raise he
+    finally:
+        upload.cleanup()
+
+async def stream_job_events(job: Job, registered: bool = False, poll_interval: float = 0.1):
+    """NDJSON lines: the job id, each progress event, then the result or error."""
+    yield json.dumps({"type": "job", "job_id": job.job_id}) + "\n"
+    cursor = 0
+    with job.reading_events(registered=registered):
+        while True:
+            # Read the status first so events recorded before completion are sent
+            done = job.done
+            events = job.events_since(cursor)
+            cursor += len(events)
+            for event in events:
+                yield json.dumps(event, default=str) + "\n"
+            if done:
+                break
+            await asyncio.sleep(poll_interval)
+
+    if job.status is JobStatus.FAILED:
+        yield json.dumps({"type": "error", "detail": job.error}) + "\n"
+    else:
+        yield json.dumps({"type": "result", **job.result}, default=str) + "\n"
+
+def job_event_response(
+    job: Job,
+    headers: Optional[Dict[str, str]] = None,
+    registered: bool = False
+) -> StreamingResponse:
+    """Stream a job's events; ``registered`` for jobs from submit_streamed"""
+    return StreamingResponse(
+        stream_job_events(job, registered=registered),
+        media_type="application/x-ndjson",
+        headers={
+            **(headers or {}),
+            "X-Job-Id": job.job_id,
+            "Cache-Control": "no-cache",
+            # Stop reverse proxies from buffering the stream
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+def submit_upload(upload: SpooledUpload, streamed: bool = False) -> Job:
+    """Submit an upload job; the spool is removed if the job can't be submitted."""
+    submit = job_manager.submit_streamed if streamed else job_manager.submit
+    try:
+        return submit("upload", run_upload, upload)
+    except Exception:
+        upload.cleanup()
+        raise
+
+def resolve_analysis_type(request_type: str) -> str:
+    analysis_type = ANALYSIS_TYPE_MAPPING.get(request_type)
+    if not analysis_type:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid analysis type: {request_type}"
+        )
+    return analysis_type
+
+def cached_analysis(request: AnalysisRequest, analysis_type: str) -> Optional[CachedAnalysis]:
+    if request.refresh:
+        return None
+    return get_cached_analysis(
+        content=request.content,
+        analysis_type=analysis_type,
+        custom_query=request.custom_query,
+        collection_name=request.collection_name
+    )
+
+def analysis_cache_headers(cached: Optional[CachedAnalysis]) -> Dict[str, str]:
+    if cached is None:
+        return {"X-Analysis-Cache": "MISS"}
+    return {
+        "X-Analysis-Cache": "HIT",
+        "X-Analysis-Cache-Age": str(int(cached.age_seconds))
+    }
+
+def run_analysis(
+    request: AnalysisRequest,
+    analysis_type: str,
+    progress_callback: Optional[Callable[..., None]] = None,
+    stream_tokens: bool = False
+) -> Dict[str, Any]:
+    result = analyze_func(
+        content=request.content,
+        analysis_type=analysis_type,
+        collection_name=request.collection_name,
+        custom_query=request.custom_query,
+        progress_callback=progress_callback,
+        stream_tokens=stream_tokens,
+        use_cache=not request.refresh
+    )
+
+    if not result:
+        raise RuntimeError("Analysis failed to produce results")
+
+    return result
+
+@app.post("/api/upload", response_model=AnalysisResponse)
+async def upload_file(file: UploadFile = File(...)):
+    # Save and validate file
+    upload = await save_upload_file(file)
+
+    try:
+        job = submit_upload(upload)
+        return await asyncio.wrap_future(job.future)
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Document processing failed: {str(e)}"
         )
-    finally:
-        if temp_path and os.path.exists(temp_path):
-            os.remove(temp_path)
+
+@app.post("/api/upload/stream")
+async def upload_file_stream(file: UploadFile = File(...)):
+    """Upload a document and stream per-page extraction progress as NDJSON."""
+    upload = await save_upload_file(file)
+    job = submit_upload(upload, streamed=True)
+    return job_event_response(job, registered=True)
 
 @app.post("/api/analyze")
-async def analyze_document(request: AnalysisRequest) -> Dict[str, Any]:
+async def analyze_document(request: AnalysisRequest, response: Response) -> Dict[str, Any]:
+    analysis_type = resolve_analysis_type(request.type)
+
+    cached = cached_analysis(request, analysis_type)
+    response.headers.update(analysis_cache_headers(cached))
+    if cached is not None:
+        return cached.result
+
     try:
-        # Convert frontend analysis type to backend format
-        analysis_type_mapping = {
-            'contract_review': 'Contract Review',
-            'information_extraction': 'Information Extraction',
-            'legal_research': 'Legal Research',
-            'risk_assessment': 'Risk Assessment',
-            'contract_summary': 'Contract Summary',
-            'custom_analysis': 'Custom Analysis'
-        }
-        
-        analysis_type = analysis_type_mapping.get(request.type)
-        if not analysis_type:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid analysis type: {request.type}"
-            )
-        
-        # Perform analysis
-        result = analyze_func(
-            content=request.content,
-            analysis_type=analysis_type,
-            collection_name=request.collection_name,
-            custom_query=request.custom_query
-        )
-        
-        if not result:
-            raise HTTPException(
-                status_code=500,
-                detail="Analysis failed to produce results"
-            )
-            
-        return result
-        
+        job = job_manager.submit("analysis", run_analysis, request, analysis_type)
+        return await asyncio.wrap_future(job.future)
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Analysis failed: {str(e)}"
         )
 
+@app.post("/api/analyze/stream")
+async def analyze_document_stream(request: AnalysisRequest):
+    """Run an analysis and stream the model output, tagged by sub-task, as NDJSON."""
+    analysis_type = resolve_analysis_type(request.type)
+    # A cached result is served by the job straight away, without tokens
+    headers = analysis_cache_headers(cached_analysis(request, analysis_type))
+    job = job_manager.submit_streamed(
+        "analysis", run_analysis, request, analysis_type, stream_tokens=True
+    )
+    return job_event_response(job, headers=headers, registered=True)
+
+@app.post("/api/jobs/upload", response_model=JobSubmittedResponse, status_code=202)
+async def submit_upload_job(file: UploadFile = File(...)):
+    upload = await save_upload_file(file)
+    job = submit_upload(upload)
+    return {"job_id": job.job_id, "status": job.status.value}
+
+@app.post("/api/jobs/analyze", response_model=JobSubmittedResponse, status_code=202)
+async def submit_analysis_job(request: AnalysisRequest):
+    analysis_type = resolve_analysis_type(request.type)
+    job = job_manager.submit("analysis", run_analysis, request, analysis_type)
+    return {"job_id": job.job_id, "status": job.status.value}
+
+@app.get("/api/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job.to_dict()
+
+@app.get("/api/jobs/{job_id}/events")
+async def get_job_events(job_id: str):
+    """Stream a job's progress events from the start as NDJSON."""
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job_event_response(job)
+
+@app.get("/api/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    if not job.done:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status.value}")
+    if job.status is JobStatus.FAILED:
+        raise HTTPException(status_code=500, detail=job.error)
+    return job.result
+
 @app.post("/api/set_model_type")
 async def set_model_type(request: SetModelTypeRequest):
     try:
@@ -175,6 +336,65 @@ async def set_model_type(request: SetModelTypeRequest):
             detail=f"Failed to set model type: {str(e)}"
         )
 
+@app.on_event("startup")
+async def warm_up_ocr():
+    OCREngineRegistry.configure(max_size=Config.PROCESSOR_CONFIG.ocr_engine_cache_size)
+    if Config.PROCESSOR_CONFIG.warm_up_ocr:
+        try:
+            elapsed = OCREngineRegistry.warm_up(Config.PROCESSOR_CONFIG.language)
+            print(f"OCR engine warmed up in {elapsed:.2f}s")
+        except Exception as e:
+            print(f"OCR warm-up failed: {str(e)}")
+
+@app.on_event("startup")
+async def warm_up_vector_db():
+    try:
+        load_times = VectorResources.prewarm()
+        print(f"Vector DB warmed up: {load_times}")
+    except Exception as e:
+        print(f"Vector DB warm-up failed: {str(e)}")
+
+def run_fingerprint_backfill(
+    rebuild: bool = False,
+    progress_callback: Optional[Callable[..., None]] = None
+) -> Dict[str, Any]:
+    return ContractFingerprintIndex().backfill(rebuild=rebuild)
+
+@app.on_event("startup")
+async def backfill_fingerprints():
+    # Collections ingested before the fingerprint index need an entry
+    if Config.FINGERPRINT_BACKFILL_ON_STARTUP:
+        job_manager.submit("fingerprint_backfill", run_fingerprint_backfill)
+
+@app.post("/api/fingerprints/rebuild", response_model=JobSubmittedResponse, status_code=202)
+async def rebuild_fingerprints():
+    """Recompute every contract's fingerprint in the background."""
+    job = job_manager.submit("fingerprint_backfill", run_fingerprint_backfill, rebuild=True)
+    return {"job_id": job.job_id, "status": job.status.value}
+
+@app.on_event("shutdown")
+async def shutdown_jobs():
+    job_manager.shutdown(wait=False)
+    VectorResources.shutdown()
+    AnalysisCache.shutdown()
+    LLMResponseCache.shutdown()
+
+@app.get("/api/ocr/metrics")
+async def ocr_metrics():
+    return OCREngineRegistry.get_metrics()
+
+@app.get("/api/cache/query_embeddings")
+async def query_embedding_cache_stats():
+    return VectorDB.get_query_cache().stats()
+
+@app.get("/api/cache/analysis")
+async def analysis_cache_stats():
+    return AnalysisCache.stats()
+
+@app.get("/api/cache/llm_responses")
+async def llm_response_cache_stats():
+    return LLMResponseCache.stats()
+
 # Error handler for generic exceptions
 @app.exception_handler(Exception)
 async def generic_exception_handler(request, exc):
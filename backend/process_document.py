@@ -2,26 +2,40 @@
 import sys
 import json
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable
 import logging
 from contract_analyzer.database import VectorDB
+from contract_analyzer.fingerprint_index import ContractFingerprintIndex
 from Doc_Processor.document_handler import DocumentHandler
 from Doc_Processor.config_validator import validate_config
 from contract_analyzer.config import Config
+from contract_analyzer.jobs import StageLimiter
+from Doc_Processor.processors.pdf_processor import page_progress_event
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Share of overall progress reported while pages are extracted
+OCR_PROGRESS_SHARE = 0.6
+
 
 def create_collection_name(file_path: Path) -> str:
     # Create a collection name based on the file name and size
     collection_name = file_path.stem
     collection_name = collection_name.replace("-", "_").lower()
     collection_name = f"{collection_name}_{file_path.stat().st_size}"
+    # Chroma collection names must start with a letter or digit
+    if not collection_name[0].isalnum():
+        collection_name = f"doc{collection_name}"
     
     return collection_name
 
-def process_document(file_path: Path) -> tuple[Optional[str], Optional[str]]:
+def process_document(
+    file_path: Path,
+    file_hash: Optional[str] = None,
+    progress_callback: Optional[Callable[..., None]] = None,
+) -> tuple[Optional[str], Optional[str]]:
+    report = progress_callback or (lambda *args, **kwargs: None)
     try:
         
         if isinstance(file_path, str):
@@ -34,16 +48,36 @@ def process_document(file_path: Path) -> tuple[Optional[str], Optional[str]]:
                 "ocr_enabled": Config.PROCESSOR_CONFIG.ocr_enabled,
                 "language": Config.PROCESSOR_CONFIG.language,
                 "dpi": Config.PROCESSOR_CONFIG.dpi,
+                "parallel_ocr": Config.PROCESSOR_CONFIG.parallel_ocr,
+                "ocr_workers": Config.PROCESSOR_CONFIG.ocr_workers,
+                "ocr_queue_size": Config.PROCESSOR_CONFIG.ocr_queue_size,
+                "parallel_ocr_use_gpu": Config.PROCESSOR_CONFIG.parallel_ocr_use_gpu,
             },
             "image": {
                 "ocr_language": Config.PROCESSOR_CONFIG.language,
                 "preprocessing_steps": ["denoise", "deskew", "contrast"],
             },
             "structured": {"schema_validation": True},
+            "cache": {
+                "enabled": Config.PROCESSOR_CONFIG.extraction_cache_enabled,
+                "cache_dir": str(Config.PROCESSOR_CONFIG.extraction_cache_dir),
+                "max_size_mb": Config.PROCESSOR_CONFIG.extraction_cache_max_mb,
+            },
         }
 
-        doc_handler = DocumentHandler(processor_config)
-        result = doc_handler.process_document(file_path)
+        # Only OCR work is throttled; cache hits and text documents skip the slot
+        doc_handler = DocumentHandler(processor_config, ocr_slot=lambda: StageLimiter.limit("ocr"))
+        report(stage="ocr", progress=0.0, message="Extracting text")
+
+        def report_page(event: Dict[str, Any]) -> None:
+            report(
+                stage="ocr",
+                progress=OCR_PROGRESS_SHARE * event["pages_done"] / max(event["total_pages"], 1),
+                message=f"Extracted page {event['page']} of {event['total_pages']}",
+                **event
+            )
+
+        result = doc_handler.process_document(file_path, file_hash=file_hash, page_callback=report_page)
         
         logger.info(f"Document processing result: {result}")
 
@@ -52,6 +86,12 @@ def process_document(file_path: Path) -> tuple[Optional[str], Optional[str]]:
             return None, None
 
         content = result.get("result", {}).get("content", [])
+
+        # Cached extractions skip the PDF processor, replay their pages
+        if result.get("cache_hit") and isinstance(content, list):
+            pages = [page for page in content if isinstance(page, dict) and "page" in page]
+            for pages_done, page in enumerate(pages, 1):
+                report_page(page_progress_event(page, len(pages), pages_done, 0.0))
         text_content = process_content(content)  # Extract this to a function
         
         if not text_content:
@@ -59,17 +99,42 @@ def process_document(file_path: Path) -> tuple[Optional[str], Optional[str]]:
             return None, None
 
         vector_client = VectorDB()
+
+        # Identical bytes were already extracted and ingested, reuse that collection
+        if result.get("cache_hit"):
+            cached_collection = result.get("annotations", {}).get("collection_name")
+            if cached_collection and vector_client.set_active_collection(cached_collection) \
+                    and vector_client.count_documents() > 0:
+                logger.info(f"Reusing ingested collection: {cached_collection}")
+                return text_content.strip(), cached_collection
+
         collection_name = create_collection_name(file_path)
         
         vector_client.create_collection(collection_name)
         
         logger.info(f"Adding to collection: {collection_name}")
         
-        added_docs = vector_client.add_documents(text_content)
+        report(stage="embedding", progress=OCR_PROGRESS_SHARE, message="Indexing document")
+        with StageLimiter.limit("embedding"):
+            added_docs = vector_client.add_documents(text_content)
         if not added_docs:
             logger.error("Failed to add documents to vector DB")
             return None, None
 
+        # The ingest succeeded; a missing fingerprint is filled in by the backfill
+        if vector_client.last_ingest_stats is not None:
+            try:
+                ContractFingerprintIndex().upsert(
+                    collection_name,
+                    vector_client.last_ingest_stats.mean_embedding,
+                    {"file_name": file_path.name, "source": "upload"}
+                )
+            except Exception as e:
+                logger.error(f"Fingerprint update failed: {str(e)}")
+
+        if doc_handler.cache and result.get("cache_key"):
+            doc_handler.cache.annotate(result["cache_key"], collection_name=collection_name)
+
         logger.info("Successfully processed document")
         return text_content.strip(), collection_name
 
@@ -44,6 +44,17 @@ export interface AnalysisType {
         </div>
       }
 
+      <div class="form-group checkbox-group">
+        <label for="refreshAnalysis">
+          <input
+            id="refreshAnalysis"
+            type="checkbox"
+            [(ngModel)]="refresh"
+            [attr.aria-label]="'Re-run the analysis instead of using a cached result'">
+          Re-run analysis (ignore cached results)
+        </label>
+      </div>
+
       <button 
         (click)="startAnalysis()"
         [disabled]="!canStartAnalysis"
@@ -102,6 +113,14 @@ export interface AnalysisType {
       }
     }
 
+    .checkbox-group label {
+      display: flex;
+      align-items: center;
+      gap: 0.5rem;
+      font-weight: 400;
+      cursor: pointer;
+    }
+
     select.form-control {
       background-image: url("data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' width='24' height='24' viewBox='0 0 24 24'%3E%3Cpath fill='%23455a64' d='M7 10l5 5 5-5z'/%3E%3C/svg%3E");
       background-repeat: no-repeat;
@@ -171,6 +190,7 @@ export class AnalysisFormComponent {
 
   selectedType = 'contract_review';
   customQuery = '';
+  refresh = false;
   errorMessage?: string;
 
   constructor(private contractService: ContractService) {}
@@ -221,7 +241,8 @@ export class AnalysisFormComponent {
       this.documentContent,
       analysisType.id,
       this.collectionName,
-      this.customQuery || undefined
+      this.customQuery || undefined,
+      this.refresh
     ).subscribe({
       next: (result) => {
         if (result.error || result.status === 'failed') {
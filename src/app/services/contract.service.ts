@@ -14,17 +14,53 @@ export interface UploadProgress {
   collection_name?: string;
 }
 
+export interface UploadPageEvent {
+  type: 'page';
+  stage: string;
+  progress: number;
+  message: string;
+  page: number;
+  total_pages: number;
+  pages_done: number;
+  source: 'native' | 'ocr' | 'none' | 'error' | null;
+  confidence: number | null;
+  elapsed_seconds: number;
+  // Absent when replaying the events of a finished job
+  text?: string;
+  error?: string | null;
+}
+
+export type UploadStreamEvent =
+  | { type: 'job'; job_id: string }
+  | { type: 'progress'; stage: string; progress: number; message: string }
+  | UploadPageEvent
+  | ({ type: 'result' } & UploadResponse)
+  | { type: 'error'; detail: string };
+
 export interface AnalysisRequest {
   content: string;
   type: string;
   collection_name?: string;
   custom_query?: string;
+  // Skip cached analyses and model answers, and cache the new result
+  refresh?: boolean;
 }
 
+export type AnalysisStreamEvent =
+  | { type: 'job'; job_id: string }
+  | { type: 'progress'; stage: string; progress: number; message: string }
+  | { type: 'cache'; stage: string; progress: number; message: string; age_seconds: number }
+  | { type: 'token'; task: string; attempt: number; delta: string }
+  | { type: 'partial'; task: string; fields: { [field: string]: string } }
+  | ({ type: 'result' } & { [key: string]: any })
+  | { type: 'error'; detail: string };
+
 export interface AnalysisResult {
   status: string;
   result?: any;
   error?: string;
+  // Sub-tasks that produced no answer; such results aren't cached
+  failed_tasks?: string[];
 }
 
 @Injectable({
@@ -36,17 +72,9 @@ export class ContractService {
   constructor(private http: HttpClient) {}
 
   uploadDocument(file: File): Observable<UploadProgress> {
-    // Validate file size (10MB limit)
-    const maxSize = 10 * 1024 * 1024;
-    if (file.size > maxSize) {
-      return throwError(() => new Error('File size exceeds 10MB limit'));
-    }
-
-    // Validate file type
-    const allowedTypes = ['.txt', '.pdf', '.doc', '.docx'];
-    const fileExt = file.name.split('.').pop()?.toLowerCase();
-    if (!fileExt || !allowedTypes.includes(`.${fileExt}`)) {
-      return throwError(() => new Error('Invalid file type. Allowed types: txt, pdf, doc, docx'));
+    const invalid = this.validateFile(file);
+    if (invalid) {
+      return throwError(() => new Error(invalid));
     }
 
     const formData = new FormData();
@@ -65,17 +93,40 @@ export class ContractService {
     );
   }
 
+  /**
+   * Upload a document and emit server-side progress as it happens: one
+   * 'page' event per extracted page (with its text, so pages can be shown
+   * as they finish), then a final 'result' event with the content and
+   * collection name. Unsubscribing aborts the request.
+   */
+  uploadDocumentStream(file: File): Observable<UploadStreamEvent> {
+    const invalid = this.validateFile(file);
+    if (invalid) {
+      return throwError(() => new Error(invalid));
+    }
+
+    const formData = new FormData();
+    formData.append('file', file);
+
+    return this.streamEvents<UploadStreamEvent>(`${this.apiUrl}/upload/stream`, {
+      method: 'POST',
+      body: formData
+    });
+  }
+
   analyzeDocument(
     content: string,
     type: string,
     collection_name?: string,
-    custom_query?: string
+    custom_query?: string,
+    refresh = false
   ): Observable<AnalysisResult> {
     const request: AnalysisRequest = {
       content,
       type,
       collection_name,
-      custom_query
+      custom_query,
+      refresh
     };
 
     return this.http.post<AnalysisResult>(
@@ -86,6 +137,37 @@ export class ContractService {
     );
   }
 
+  /**
+   * Run an analysis and emit the model output as it is generated: 'token'
+   * events carry a piece of text and the sub-task it belongs to (e.g.
+   * "Key Terms"), so each section can be rendered while it is written.
+   * A retried sub-task streams again with a higher attempt number; start
+   * that section over when the attempt changes.
+   * The final 'result' event holds the same payload as analyzeDocument.
+   * With refresh, cached results are ignored and replaced.
+   */
+  analyzeDocumentStream(
+    content: string,
+    type: string,
+    collection_name?: string,
+    custom_query?: string,
+    refresh = false
+  ): Observable<AnalysisStreamEvent> {
+    const request: AnalysisRequest = {
+      content,
+      type,
+      collection_name,
+      custom_query,
+      refresh
+    };
+
+    return this.streamEvents<AnalysisStreamEvent>(`${this.apiUrl}/analyze/stream`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(request)
+    });
+  }
+
     // Add this method to the ContractService class
   setModelType(modelType: string): Observable<ModelTypeResponse> {
     return this.http.post<ModelTypeResponse>(
@@ -96,6 +178,70 @@ export class ContractService {
     );
   }
 
+  /**
+   * POST to an NDJSON endpoint and emit one event per line. An 'error'
+   * event errors the stream; unsubscribing aborts the request.
+   */
+  private streamEvents<T extends { type: string }>(url: string, init: RequestInit): Observable<T> {
+    return new Observable<T>(subscriber => {
+      const controller = new AbortController();
+
+      (async () => {
+        const response = await fetch(url, { ...init, signal: controller.signal });
+        if (!response.ok || !response.body) {
+          const body = await response.json().catch(() => ({}));
+          throw new Error(body?.detail || `Request failed with status ${response.status}`);
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        while (true) {
+          const { done, value } = await reader.read();
+          buffer += decoder.decode(value, { stream: !done });
+          const lines = buffer.split('\n');
+          buffer = lines.pop() ?? '';
+          for (const line of lines) {
+            if (!line.trim()) {
+              continue;
+            }
+            const event = JSON.parse(line);
+            if (event.type === 'error') {
+              throw new Error(event.detail);
+            }
+            subscriber.next(event as T);
+          }
+          if (done) {
+            break;
+          }
+        }
+        subscriber.complete();
+      })().catch(error => {
+        if (!controller.signal.aborted) {
+          subscriber.error(error instanceof Error ? error : new Error(String(error)));
+        }
+      });
+
+      return () => controller.abort();
+    });
+  }
+
+  private validateFile(file: File): string | null {
+    // Validate file size (10MB limit)
+    const maxSize = 10 * 1024 * 1024;
+    if (file.size > maxSize) {
+      return 'File size exceeds 10MB limit';
+    }
+
+    // Validate file type
+    const allowedTypes = ['.txt', '.pdf', '.doc', '.docx'];
+    const fileExt = file.name.split('.').pop()?.toLowerCase();
+    if (!fileExt || !allowedTypes.includes(`.${fileExt}`)) {
+      return 'Invalid file type. Allowed types: txt, pdf, doc, docx';
+    }
+    return null;
+  }
+
   private getUploadProgress(event: HttpEvent<UploadResponse>): UploadProgress {
     switch (event.type) {
       case HttpEventType.UploadProgress: